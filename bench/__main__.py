@@ -0,0 +1,117 @@
+# bench/__main__.py
+"""Throughput and latency benchmarks for the API.
+
+    python -m bench                             # everything, both transports
+    python -m bench -s me users_page -t asgi    # a subset
+    python -m bench --save                      # write bench/results/<commit>.json
+    python -m bench --compare bench/results/abc1234.json
+
+``asgi`` drives the app in-process through httpx; ``socket`` serves it with
+uvicorn on 127.0.0.1 and adds the websocket scenarios. Both run on a
+throwaway SQLite database with fakeredis standing in for Redis.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench import harness
+from bench.load import compare, run_load
+from bench.scenarios import SCENARIOS, SEQUENTIAL
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def _run(args) -> dict:
+    results = {}
+    for transport in args.transport:
+        async with harness.running_app(transport, args.users, args.bcrypt_rounds) as target:
+            for name in args.scenarios:
+                async with AsyncExitStack() as stack:
+                    op = await SCENARIOS[name](target, stack, clients=args.clients)
+                    if op is None:
+                        continue
+                    concurrency = 1 if name in SEQUENTIAL else args.concurrency
+                    result = await run_load(name, op, concurrency, args.duration, args.warmup)
+                key = f"{transport}:{name}"
+                results[key] = {"concurrency": concurrency, **result.summary()}
+                if name in SEQUENTIAL:  # one request is one broadcast to every client
+                    results[key]["clients"] = args.clients
+                _print_row(key, results[key])
+    return results
+
+
+def _print_row(key: str, summary: dict) -> None:
+    print(
+        f"{key:<28} {summary['req_per_s']:>10.1f} req/s"
+        f"  p50 {summary['p50_ms']:>8.2f}  p90 {summary['p90_ms']:>8.2f}"
+        f"  p99 {summary['p99_ms']:>8.2f} ms  {summary['bytes_per_s'] / 1e6:>7.2f} MB/s"
+        f"  errors {summary['errors']}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("-s", "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("-t", "--transport", nargs="+", choices=["asgi", "socket"], default=["asgi", "socket"])
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="seconds measured per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds discarded before measuring")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="concurrent HTTP clients")
+    parser.add_argument("--clients", type=int, default=50, help="websocket clients for the fan-out scenarios")
+    parser.add_argument("--users", type=int, default=1000, help="users seeded into the database")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="cost factor of the seeded password hash")
+    parser.add_argument("--save", nargs="?", const="", metavar="PATH",
+                        help="write the results as JSON (default bench/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative slowdown tolerated before --compare fails (default 0.10)")
+    args = parser.parse_args(argv)
+
+    try:
+        results = asyncio.run(_run(args))
+    finally:
+        harness.cleanup()
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+        },
+        "results": results,
+    }
+    if args.save is not None:
+        path = Path(args.save) if args.save else RESULTS_DIR / f"{commit}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"saved {path}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(baseline, report, args.tolerance)
+        print(f"against {baseline['meta']['commit']}: "
+              + ("no regressions" if not regressions else f"{len(regressions)} regression(s)"))
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# bench/auth_roundtrips.py
+"""Database round trips per auth endpoint.
+
+Runs register, refresh, /auth/me and logout against a throwaway SQLite
+database and reports, per endpoint, how many statements, commits and
+rollbacks reached the database.
+
+    python -m bench.auth_roundtrips
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("REDIS_URL", "redis://localhost:1/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.routes.auth import router as auth_router
+from db.database import Base, get_db
+from db.query_log import RoundTrips, count_round_trips
+
+
+def _summary(counts: RoundTrips) -> dict[str, int]:
+    return {
+        "statements": counts.statements,
+        "commits": counts.commits,
+        "rollbacks": counts.rollbacks,
+        "total": counts.total,
+    }
+
+
+async def measure(url: str) -> dict[str, dict[str, int]]:
+    engine = create_async_engine(url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def _get_db():
+        async with sessions() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api")
+    app.dependency_overrides[get_db] = _get_db
+
+    results: dict[str, dict[str, int]] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="https://bench") as client:
+
+        async def call(name: str, method: str, path: str, **kwargs) -> httpx.Response:
+            with count_round_trips(engine) as counts:
+                response = await client.request(method, path, **kwargs)
+            response.raise_for_status()
+            results[name] = _summary(counts)
+            return response
+
+        user = (await call("register", "POST", "/api/auth/register",
+                           json={"username": "bench", "password": "bench-password", "pin": "1234"})).json()
+        client.cookies.set("refresh_token", user["refresh_token"])
+        access = (await call("refresh", "POST", "/api/auth/refresh")).json()["access_token"]
+        headers = {"Authorization": f"Bearer {access}"}
+        await call("me", "GET", "/api/auth/me", headers=headers)
+        await call("logout", "POST", "/api/auth/logout", headers=headers)
+
+        # the duplicate path is a round trip too, and used to be the cheap one
+        with count_round_trips(engine) as counts:
+            response = await client.post("/api/auth/register",
+                                         json={"username": "bench", "password": "bench-password", "pin": "1234"})
+        assert response.status_code == 400, response.text
+        results["register_duplicate"] = _summary(counts)
+
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(measure(f"sqlite+aiosqlite:///{tmp}/auth.db"))
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# bench/harness.py
+"""The app under benchmark: a throwaway SQLite database, a fakeredis
+stand-in for Redis, and the full ASGI stack (middleware and Socket.IO
+included) served in-process or on a local socket.
+
+Import this module before anything from ``core`` or ``db``; it points the
+settings at the throwaway database.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Literal
+
+_TMP = tempfile.mkdtemp(prefix="hyphae-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_TMP}/bench.db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:1/0")  # never dialled
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("RATE_LIMITS", "{}")  # measure the endpoints, not the limiter
+os.environ.setdefault("ADMIN_USERNAMES", '["bench0"]')  # the database explorer scenario
+os.environ.setdefault("EXPLORER_SQLITE_DIR", _TMP)
+
+import bcrypt
+import httpx
+from jose import jwt
+from sqlalchemy import event, insert, select
+
+from core.cache import redis_cache
+from core.config.settings import settings
+from db.database import AsyncSessionLocal, close_db, connect_db, get_engine
+from db.models import User
+
+Transport = Literal["asgi", "socket"]
+
+PASSWORD = "bench-password"
+
+
+@dataclass
+class Target:
+    """Where the scenarios send their traffic."""
+
+    transport: Transport
+    client: httpx.AsyncClient
+    base_url: str
+    user_ids: list[int] = field(default_factory=list)
+
+    @property
+    def ws_url(self) -> str | None:
+        """``ws://`` root of the server; ``None`` in-process, where there is
+        no websocket client to connect with."""
+        if self.transport != "socket":
+            return None
+        return "ws" + self.base_url[len("http"):]
+
+    def token(self, user_id: int) -> str:
+        return jwt.encode(
+            {"sub": str(user_id), "username": f"bench{user_id}",
+             "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+            settings.JWT_SECRET,
+            algorithm="HS256",
+        )
+
+
+async def _seed(users: int, bcrypt_rounds: int) -> list[int]:
+    """Insert ``users`` verified users sharing :data:`PASSWORD` (one hash,
+    so seeding stays fast whatever the cost factor)."""
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(bcrypt_rounds)).decode()
+    async with AsyncSessionLocal() as session:
+        existing = (await session.execute(select(User.id).order_by(User.id))).scalars().all()
+        if len(existing) < users:
+            await session.execute(insert(User), [
+                {
+                    "username": f"bench{i}",
+                    "hashed_password": hashed,
+                    "is_verified": True,
+                    "is_active": True,
+                }
+                for i in range(len(existing), users)
+            ])
+            await session.commit()
+            existing = (await session.execute(select(User.id).order_by(User.id))).scalars().all()
+    return list(existing)
+
+
+def _sqlite_pragmas(dbapi_connection, _) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def _tune_sqlite() -> None:
+    """WAL and a busy timeout for the throwaway database: readers stop
+    blocking the writer, and concurrent writers wait their turn instead of
+    failing with ``database is locked``."""
+    engine = get_engine().sync_engine
+    if engine.dialect.name == "sqlite" and not event.contains(engine, "connect", _sqlite_pragmas):
+        event.listen(engine, "connect", _sqlite_pragmas)
+
+
+def _stand_in_redis():
+    """Client factory for ``redis_cache``: fakeredis behind the real pool,
+    so pipelining and pool limits are part of what is measured."""
+    try:
+        from fakeredis import FakeAsyncRedis, FakeServer
+    except ImportError as exc:  # pragma: no cover - dev dependency
+        raise SystemExit("the benchmarks need fakeredis: pip install -r requirements-dev.txt") from exc
+    from core.cache.redis_client import TrackedPool
+
+    server = FakeServer()
+
+    def new_client(decode_responses: bool = True):
+        return FakeAsyncRedis(
+            server=server,
+            decode_responses=decode_responses,
+            connection_pool_class=TrackedPool,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+    return new_client
+
+
+@asynccontextmanager
+async def running_app(
+    transport: Transport,
+    users: int = 1000,
+    bcrypt_rounds: int = 12,
+) -> AsyncIterator[Target]:
+    """Start the app and yield a :class:`Target` pointing at it.
+
+    The app's lifespan is skipped: its background loops (market ticks,
+    metrics, plugin warm-up) would compete with the load being measured.
+    The database and Redis it would connect to are set up here instead.
+    """
+    from main import app
+
+    _tune_sqlite()
+    if not await connect_db(max_retries=1):
+        raise SystemExit(f"could not open {settings.DATABASE_URL}")
+    redis_cache._new_client = _stand_in_redis()
+    await redis_cache.connect_redis(max_retries=1)
+    user_ids = await _seed(users, bcrypt_rounds)
+
+    server = server_task = None
+    try:
+        if transport == "asgi":
+            base_url = "http://bench"
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=base_url)
+        else:
+            import uvicorn
+
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("127.0.0.1", 0))
+            host, port = sock.getsockname()
+            server = uvicorn.Server(uvicorn.Config(
+                app, lifespan="off", log_level="warning", access_log=False, ws="auto",
+            ))
+            server_task = asyncio.create_task(server.serve(sockets=[sock]))
+            while not server.started:
+                if server_task.done():
+                    server_task.result()  # surface the startup error
+                await asyncio.sleep(0.01)
+            base_url = f"http://{host}:{port}"
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                limits=httpx.Limits(max_connections=256, max_keepalive_connections=256),
+            )
+        async with client:
+            yield Target(transport, client, base_url, user_ids)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await server_task
+        await redis_cache.close_redis()
+        await close_db()
+
+
+def cleanup() -> None:
+    """Remove the throwaway database directory."""
+    shutil.rmtree(_TMP, ignore_errors=True)
@@ -0,0 +1,105 @@
+# bench/load.py
+"""Closed-loop load generation and the numbers we report."""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+# returns success, or the size of the response body in bytes (a success)
+Operation = Callable[[int], Awaitable[bool | int]]
+
+# (metric, True if higher is better)
+_COMPARED = (("req_per_s", True), ("p50_ms", False), ("p99_ms", False))
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+@dataclass
+class Result:
+    name: str
+    elapsed: float = 0.0
+    errors: int = 0
+    bytes: int = 0
+    latencies_ms: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies_ms)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "req_per_s": round(count / self.elapsed, 1) if self.elapsed else 0.0,
+            "bytes_per_s": round(self.bytes / self.elapsed) if self.elapsed else 0,
+            "mean_ms": round(sum(ordered) / count, 3) if count else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50), 3),
+            "p90_ms": round(percentile(ordered, 0.90), 3),
+            "p99_ms": round(percentile(ordered, 0.99), 3),
+            "max_ms": round(ordered[-1], 3) if count else 0.0,
+        }
+
+
+async def run_load(
+    name: str,
+    op: Operation,
+    concurrency: int = 16,
+    duration: float = 5.0,
+    warmup: float = 1.0,
+) -> Result:
+    """Run ``op`` from ``concurrency`` workers back to back for ``duration``
+    seconds after a ``warmup`` whose samples are thrown away.
+
+    ``op`` gets a running sequence number and returns whether the call
+    succeeded, or how many body bytes it received; failures and exceptions
+    count as errors, not samples.
+    """
+    result = Result(name)
+    counter = iter(range(1 << 62))
+    measuring = False
+    deadline = time.perf_counter() + warmup
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = await op(next(counter))
+            except Exception:
+                ok = False
+            if not measuring:
+                continue
+            if ok:
+                result.latencies_ms.append((time.perf_counter() - started) * 1000)
+                if ok is not True:
+                    result.bytes += ok
+            else:
+                result.errors += 1
+
+    if warmup > 0:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    measuring = True
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for key, now in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        for metric, higher_is_better in _COMPARED:
+            old, new = before[metric], now[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{key} {metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
@@ -0,0 +1,214 @@
+# bench/scenarios.py
+"""What the suite measures. Each scenario is prepared against a
+:class:`~bench.harness.Target` and returns the operation to run under load,
+or ``None`` when it cannot run on that transport."""
+import asyncio
+import json
+import random
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable
+
+import websockets
+
+from bench.harness import PASSWORD, Target
+from bench.load import Operation
+
+# every scenario gets the same, reproducible request mix
+_rng = random.Random(1234)
+
+
+def _body_size(response) -> int | bool:
+    """Bytes received for a 200, ``False`` otherwise."""
+    return response.status_code == 200 and len(response.content)
+
+
+async def login(target: Target, stack: AsyncExitStack, **_) -> Operation:
+    # one user would serialize every login on that user's row update
+    usernames = [f"bench{i}" for i in range(len(target.user_ids))]
+
+    async def op(seq: int) -> bool:
+        response = await target.client.post(
+            "/api/auth/login", json={"username": usernames[seq % len(usernames)], "password": PASSWORD}
+        )
+        return _body_size(response)
+    return op
+
+
+async def me(target: Target, stack: AsyncExitStack, **_) -> Operation:
+    tokens = [target.token(uid) for uid in target.user_ids[:100]]
+
+    async def op(seq: int) -> bool:
+        response = await target.client.get(
+            "/api/auth/me", headers={"Authorization": f"Bearer {tokens[seq % len(tokens)]}"}
+        )
+        return _body_size(response)
+    return op
+
+
+async def users_page(target: Target, stack: AsyncExitStack, per_page: int = 20, **_) -> Operation:
+    pages = max(1, len(target.user_ids) // per_page)
+
+    async def op(_: int) -> bool:
+        response = await target.client.get(
+            "/api/users", params={"page": _rng.randint(1, pages), "per_page": per_page}
+        )
+        return _body_size(response)
+    return op
+
+
+async def users_bulk(target: Target, stack: AsyncExitStack, **_) -> Operation:
+    """Large pages, where encoding the response dominates."""
+    return await users_page(target, stack, per_page=500)
+
+
+async def table_page(target: Target, stack: AsyncExitStack, **_) -> Operation | None:
+    """A JSON page of the users table through the database explorer."""
+    from sqlalchemy.engine import make_url
+
+    from core.config.settings import settings
+
+    url = make_url(settings.DATABASE_URL)
+    if not url.drivername.startswith("sqlite"):
+        return None
+    # the explorer is admin-only; the harness makes the first seeded user one
+    headers = {"Authorization": f"Bearer {target.token(target.user_ids[0])}"}
+    response = await target.client.post(
+        "/api/connections",
+        json={"name": "bench", "params": {"driver": "sqlite", "database": url.database}},
+        headers=headers,
+    )
+    response.raise_for_status()
+    path = f"/api/database/{response.json()['id']}/schema/main/table/users"
+
+    async def op(_: int) -> bool:
+        return _body_size(await target.client.get(path, params={"limit": 500}, headers=headers))
+    return op
+
+
+class _Deliveries:
+    """Waits until every client has seen a given message sequence number."""
+
+    def __init__(self, clients: int):
+        self.clients = clients
+        self._pending: dict[int, list] = {}
+
+    def expect(self, seq: int) -> asyncio.Event:
+        done = asyncio.Event()
+        self._pending[seq] = [self.clients, done]
+        return done
+
+    def seen(self, seq: int) -> None:
+        entry = self._pending.get(seq)
+        if entry is None:
+            return
+        entry[0] -= 1
+        if entry[0] == 0:
+            del self._pending[seq]
+            entry[1].set()
+
+
+def _fanout(
+    deliveries: _Deliveries,
+    emit: Callable[[int], Awaitable[None]],
+    timeout: float = 5.0,
+) -> Operation:
+    """One broadcast per call; done when the last client has received it."""
+    async def op(seq: int) -> bool:
+        done = deliveries.expect(seq)
+        await emit(seq)
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+    return op
+
+
+async def _reader(conn, on_message: Callable[[str], None]) -> None:
+    try:
+        async for message in conn:
+            on_message(message)
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def ws_fanout(target: Target, stack: AsyncExitStack, clients: int = 50, **_) -> Operation | None:
+    """``/api/ws/logs`` pushes to every socket a user has open."""
+    if target.ws_url is None:
+        return None
+    from core.websocket.emitter import emit_to_user
+
+    user_id = target.user_ids[0]
+    url = f"{target.ws_url}/api/ws/logs?token={target.token(user_id)}"
+    deliveries = _Deliveries(clients)
+
+    def on_message(raw: str) -> None:
+        message = json.loads(raw)
+        if message.get("type") == "bench":
+            deliveries.seen(message["payload"]["seq"])
+
+    for _ in range(clients):
+        conn = await stack.enter_async_context(websockets.connect(url, max_queue=None))
+        await conn.recv()  # the "connected" greeting
+        task = asyncio.create_task(_reader(conn, on_message))
+        stack.callback(task.cancel)
+
+    async def emit(seq: int) -> None:
+        await emit_to_user(user_id, "bench", "tick", payload={"seq": seq})
+
+    return _fanout(deliveries, emit)
+
+
+async def market_broadcast(target: Target, stack: AsyncExitStack, clients: int = 50, **_) -> Operation | None:
+    """Socket.IO ``/market`` namespace, as the market ticker emits it.
+
+    Clients speak Engine.IO v4 over a bare websocket, so no Socket.IO client
+    library is needed.
+    """
+    if target.ws_url is None:
+        return None
+    from main import get_sio
+
+    sio = get_sio()
+
+    url = f"{target.ws_url}/market/?EIO=4&transport=websocket"
+    deliveries = _Deliveries(clients)
+
+    for _ in range(clients):
+        conn = await stack.enter_async_context(websockets.connect(url, max_queue=None))
+        await conn.recv()                  # "0{...}": engine.io open
+        await conn.send("40/market,")      # join the namespace
+        joined = await conn.recv()         # "40/market,{sid}"
+        if not joined.startswith("40/market,"):
+            raise RuntimeError(f"could not join /market: {joined}")
+
+        def on_message(raw: str, conn=conn) -> None:
+            if raw == "2":                 # engine.io ping
+                asyncio.ensure_future(conn.send("3"))
+            elif raw.startswith("42/market,"):
+                event, data = json.loads(raw[len("42/market,"):])
+                if event == "quote":
+                    deliveries.seen(data["seq"])
+
+        task = asyncio.create_task(_reader(conn, on_message))
+        stack.callback(task.cancel)
+
+    async def emit(seq: int) -> None:
+        await sio.emit("quote", {"symbol": "BENCH", "price": 100.0, "seq": seq}, namespace="/market")
+
+    return _fanout(deliveries, emit)
+
+
+SCENARIOS = {
+    "login": login,
+    "me": me,
+    "users_page": users_page,
+    "users_bulk": users_bulk,
+    "table_page": table_page,
+    "ws_fanout": ws_fanout,
+    "market_broadcast": market_broadcast,
+}
+
+# broadcasts are measured one at a time: overlapping them would just
+# measure queueing in the clients
+SEQUENTIAL = {"ws_fanout", "market_broadcast"}
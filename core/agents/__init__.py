@@ -0,0 +1,25 @@
+from .scheduler import (
+    AgentScheduler,
+    AgentTimeout,
+    Priority,
+    SchedulerOverloaded,
+    open_agent_stream,
+    run_agent,
+    scheduler,
+)
+from .backend import AgentBackend, FakeBackend, get_backend, register_agent, set_backend
+
+__all__ = [
+    "AgentBackend",
+    "AgentScheduler",
+    "AgentTimeout",
+    "FakeBackend",
+    "Priority",
+    "SchedulerOverloaded",
+    "get_backend",
+    "open_agent_stream",
+    "register_agent",
+    "run_agent",
+    "scheduler",
+    "set_backend",
+]
@@ -0,0 +1,75 @@
+# core/agents/backend.py
+import asyncio
+import importlib
+from typing import AsyncIterator, Protocol
+
+from core.agents.scheduler import scheduler
+from core.config.settings import settings
+
+
+class AgentBackend(Protocol):
+    """Produces agent output. ``job`` holds ``prompt`` plus optional
+    ``context`` and ``memories``."""
+
+    def stream(self, agent: str, job: dict) -> AsyncIterator[str]:
+        ...
+
+    async def generate(self, agent: str, job: dict) -> str:
+        ...
+
+
+class FakeBackend:
+    """Deterministic local backend: echoes the prompt word by word.
+
+    Used until a model backend is configured and in tests; ``delay`` adds a
+    pause before every chunk to mimic token latency.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def _chunks(self, agent: str, job: dict) -> list[str]:
+        text = f"{agent} received: {job['prompt']}"
+        memories = job.get("memories") or []
+        if memories:
+            text += f" (using {len(memories)} memories)"
+        words = text.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    async def stream(self, agent: str, job: dict) -> AsyncIterator[str]:
+        for chunk in self._chunks(agent, job):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield chunk
+
+    async def generate(self, agent: str, job: dict) -> str:
+        return "".join([chunk async for chunk in self.stream(agent, job)])
+
+
+_backend: AgentBackend | None = None
+
+
+def get_backend() -> AgentBackend:
+    global _backend
+    if _backend is None:
+        module_name, _, class_name = settings.AGENT_BACKEND.rpartition(".")
+        _backend = getattr(importlib.import_module(module_name), class_name)()
+    return _backend
+
+
+def set_backend(backend: AgentBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+def register_agent(name: str, **lane_options) -> None:
+    """Register ``name`` with the scheduler, backed by the configured backend."""
+
+    async def generate_batch(jobs: list[dict]) -> list[str]:
+        backend = get_backend()
+        return await asyncio.gather(*(backend.generate(name, job) for job in jobs))
+
+    def stream(job: dict) -> AsyncIterator[str]:
+        return get_backend().stream(name, job)
+
+    scheduler.register(name, generate_batch, stream_handler=stream, **lane_options)
@@ -0,0 +1,428 @@
+# core/agents/scheduler.py
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Sequence
+
+from fastapi import HTTPException
+
+from core.config.settings import settings
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BatchHandler = Callable[[list[Any]], Awaitable[Sequence[Any]]]
+StreamHandler = Callable[[Any], AsyncIterator[Any]]
+
+_END = object()
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class SchedulerOverloaded(Exception):
+    """The agent's queue is full; the caller should back off."""
+
+
+class AgentTimeout(Exception):
+    """The job did not finish within its deadline."""
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    payload: Any = field(compare=False)
+    batch_key: Hashable | None = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    deadline: float = field(compare=False)
+
+
+@dataclass
+class _Stream:
+    """Payload wrapper for a streaming job; chunks are relayed via ``queue``."""
+
+    payload: Any
+    queue: asyncio.Queue
+
+
+def _percentile(samples: deque, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000, 2)
+
+
+class _Lane:
+    """Queue, workers and counters for a single agent."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: BatchHandler,
+        stream_handler: StreamHandler | None,
+        concurrency: int,
+        max_batch: int,
+        batch_window: float,
+        timeout: float,
+        max_queue: int,
+    ):
+        self.name = name
+        self.handler = handler
+        self.stream_handler = stream_handler
+        self.concurrency = concurrency
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.max_queue = max_queue
+
+        self._heap: list[_Job] = []
+        self._changed: asyncio.Condition | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._seq = itertools.count()
+
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.batches = 0
+        self._batched_jobs = 0
+        self._wait_times: deque[float] = deque(maxlen=1024)
+        self._latencies: deque[float] = deque(maxlen=1024)
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._workers and self._loop is loop:
+            return
+        self._loop = loop
+        self._changed = asyncio.Condition()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"agent-{self.name}-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def _enqueue(self, payload: Any, priority: Priority, batch_key, timeout: float) -> _Job:
+        self._start()
+        if len(self._heap) >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerOverloaded(f"{self.name} queue is full")
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        job = _Job(
+            priority=int(priority),
+            seq=next(self._seq),
+            payload=payload,
+            batch_key=batch_key,
+            future=loop.create_future(),
+            enqueued_at=now,
+            deadline=now + timeout,
+        )
+        async with self._changed:
+            heapq.heappush(self._heap, job)
+            self._changed.notify_all()
+        return job
+
+    async def submit(self, payload: Any, priority: Priority, batch_key, timeout: float | None) -> Any:
+        timeout = timeout or self.timeout
+        job = await self._enqueue(payload, priority, batch_key, timeout)
+        try:
+            return await asyncio.wait_for(job.future, timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise AgentTimeout(f"{self.name} did not respond within {timeout:.1f}s") from None
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    async def open_stream(self, payload: Any, priority: Priority, timeout: float | None) -> AsyncIterator[Any]:
+        if self.stream_handler is None:
+            raise ValueError(f"{self.name} has no stream handler")
+        queue: asyncio.Queue = asyncio.Queue()
+        job = await self._enqueue(_Stream(payload, queue), priority, None, timeout or self.timeout)
+        # whatever way the job ends, wake the reader after the last chunk
+        job.future.add_done_callback(lambda _: queue.put_nowait(_END))
+        return self._drain(job, queue)
+
+    async def _drain(self, job: _Job, queue: asyncio.Queue) -> AsyncIterator[Any]:
+        try:
+            while (chunk := await queue.get()) is not _END:
+                yield chunk
+            if not job.future.cancelled() and job.future.exception():
+                raise job.future.exception()
+        finally:
+            if not job.future.done():
+                self.cancelled += 1
+                job.future.cancel()
+
+    async def _pump(self, stream: _Stream) -> list[None]:
+        async for chunk in self.stream_handler(stream.payload):
+            stream.queue.put_nowait(chunk)
+        return [None]
+
+    # ─── Worker side ──────────────────────────────────────────────────────────
+
+    def _pop_compatible(self, first: _Job, limit: int) -> list[_Job]:
+        matches = [
+            job for job in sorted(self._heap)
+            if job.batch_key == first.batch_key and not job.future.done()
+        ][:limit]
+        if matches:
+            taken = {id(job) for job in matches}
+            self._heap = [job for job in self._heap if id(job) not in taken]
+            heapq.heapify(self._heap)
+        return matches
+
+    def _compatible_waiting(self, first: _Job) -> int:
+        return sum(1 for job in self._heap if job.batch_key == first.batch_key)
+
+    async def _take_batch(self) -> list[_Job]:
+        loop = asyncio.get_running_loop()
+        async with self._changed:
+            while True:
+                await self._changed.wait_for(lambda: bool(self._heap))
+                first = heapq.heappop(self._heap)
+                if not first.future.done():
+                    break
+            if first.batch_key is None or self.max_batch == 1:
+                return [first]
+            if self.running == 0 and not self._compatible_waiting(first):
+                # idle lane: dispatch immediately rather than pay the window
+                return [first]
+
+            # busy lane: hold the first job briefly so compatible requests can join it
+            deadline = loop.time() + self.batch_window
+            while self._compatible_waiting(first) < self.max_batch - 1:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            return [first] + self._pop_compatible(first, self.max_batch - 1)
+
+    async def _worker(self) -> None:
+        while True:
+            batch = await self._take_batch()
+            try:
+                await self._run(batch)
+            except Exception as exc:  # never let one batch kill the worker
+                logger.error(f"Agent {self.name} worker error: {exc}")
+
+    async def _run(self, batch: list[_Job]) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        live = []
+        for job in batch:
+            if job.future.done():
+                continue
+            if job.deadline <= started:
+                self.timed_out += 1
+                job.future.set_exception(AgentTimeout(f"{self.name} timed out in queue"))
+            else:
+                live.append(job)
+        if not live:
+            return
+        for job in live:
+            self._wait_times.append(started - job.enqueued_at)
+
+        self.batches += 1
+        self._batched_jobs += len(live)
+        self.running += len(live)
+        if isinstance(live[0].payload, _Stream):
+            task = asyncio.ensure_future(self._pump(live[0].payload))
+        else:
+            task = asyncio.ensure_future(self.handler([job.payload for job in live]))
+
+        # if every caller has gone away there is no point finishing the work
+        def _abandon(_):
+            if all(job.future.done() for job in live) and not task.done():
+                task.cancel()
+
+        for job in live:
+            job.future.add_done_callback(_abandon)
+        try:
+            results = await asyncio.wait_for(
+                task, max(job.deadline for job in live) - started
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if asyncio.current_task().cancelling():
+                raise
+            for job in live:
+                if not job.future.done():
+                    self.timed_out += 1
+                    job.future.set_exception(AgentTimeout(f"{self.name} timed out"))
+        except Exception as exc:
+            self.failed += len(live)
+            for job in live:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+        else:
+            finished = loop.time()
+            for job, result in zip(live, results):
+                if not job.future.done():
+                    job.future.set_result(result)
+                    self.completed += 1
+                    self._latencies.append(finished - job.enqueued_at)
+        finally:
+            self.running -= len(live)
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        for job in self._heap:
+            if not job.future.done():
+                job.future.cancel()
+        self._heap = []
+
+    def stats(self) -> dict:
+        return {
+            "queued": sum(1 for job in self._heap if not job.future.done()),
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "avg_batch_size": round(self._batched_jobs / self.batches, 2) if self.batches else 0,
+            "queue_wait_ms": {
+                "p50": _percentile(self._wait_times, 0.50),
+                "p95": _percentile(self._wait_times, 0.95),
+            },
+            "latency_ms": {
+                "p50": _percentile(self._latencies, 0.50),
+                "p95": _percentile(self._latencies, 0.95),
+                "p99": _percentile(self._latencies, 0.99),
+            },
+        }
+
+
+class AgentScheduler:
+    """Central execution scheduler for agent calls.
+
+    Every agent gets its own lane: a priority queue (interactive jobs ahead
+    of background ones), a fixed number of workers that caps how many
+    batches run at once and, while the lane is busy, a short batching
+    window during which jobs sharing a ``batch_key`` are collected and
+    handed to the handler together. Jobs carry a deadline covering queue wait plus execution;
+    when every caller in a batch has gone away the handler is cancelled.
+    """
+
+    def __init__(self):
+        self._lanes: dict[str, _Lane] = {}
+
+    def register(
+        self,
+        name: str,
+        handler: BatchHandler,
+        *,
+        stream_handler: StreamHandler | None = None,
+        concurrency: int | None = None,
+        max_batch: int | None = None,
+        batch_window: float | None = None,
+        timeout: float | None = None,
+        max_queue: int | None = None,
+    ) -> None:
+        """Register ``handler`` for ``name``.
+
+        The handler receives a list of payloads and must return one result
+        per payload, in order. The optional ``stream_handler`` takes a
+        single payload and yields chunks; streams occupy a worker like a
+        batch of one, so they count against the same concurrency cap.
+        """
+        self._lanes[name] = _Lane(
+            name,
+            handler,
+            stream_handler,
+            concurrency=concurrency or settings.AGENT_CONCURRENCY,
+            max_batch=max_batch or settings.AGENT_MAX_BATCH,
+            batch_window=(
+                batch_window if batch_window is not None
+                else settings.AGENT_BATCH_WINDOW_MS / 1000
+            ),
+            timeout=timeout or settings.AGENT_TIMEOUT,
+            max_queue=max_queue or settings.AGENT_MAX_QUEUE,
+        )
+
+    async def submit(
+        self,
+        name: str,
+        payload: Any,
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        batch_key: Hashable | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        return await self._lanes[name].submit(payload, priority, batch_key, timeout)
+
+    async def open_stream(
+        self,
+        name: str,
+        payload: Any,
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        timeout: float | None = None,
+    ) -> AsyncIterator[Any]:
+        """Queue a streaming job and return an iterator over its chunks.
+
+        Queue-full errors are raised here, before any chunk is produced;
+        timeouts and handler errors surface from the iterator.
+        """
+        return await self._lanes[name].open_stream(payload, priority, timeout)
+
+    def stats(self) -> dict:
+        return {name: lane.stats() for name, lane in self._lanes.items()}
+
+    async def close(self) -> None:
+        for lane in self._lanes.values():
+            await lane.close()
+
+
+scheduler = AgentScheduler()
+
+
+async def run_agent(
+    name: str,
+    payload: Any,
+    priority: str = "interactive",
+    batch_key: Hashable | None = None,
+) -> Any:
+    """Submit to the shared scheduler, mapping scheduler errors to HTTP ones."""
+    try:
+        return await scheduler.submit(
+            name, payload, priority=Priority[priority.upper()], batch_key=batch_key
+        )
+    except SchedulerOverloaded:
+        raise HTTPException(503, f"{name} is busy, try again shortly")
+    except AgentTimeout:
+        raise HTTPException(504, f"{name} timed out")
+
+
+async def open_agent_stream(
+    name: str,
+    payload: Any,
+    priority: str = "interactive",
+) -> AsyncIterator[Any]:
+    """Streaming counterpart of :func:`run_agent`."""
+    try:
+        return await scheduler.open_stream(name, payload, priority=Priority[priority.upper()])
+    except SchedulerOverloaded:
+        raise HTTPException(503, f"{name} is busy, try again shortly")
@@ -0,0 +1,110 @@
+# core/agents/streaming.py
+import json
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from core.agents.scheduler import AgentTimeout, Priority, SchedulerOverloaded, scheduler
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def wants_event_stream(request: Request) -> bool:
+    return "text/event-stream" in request.headers.get("accept", "")
+
+
+async def replay(text: str) -> AsyncIterator[str]:
+    """Single-chunk stream for responses that are already complete."""
+    yield text
+
+
+def _event(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def sse_response(agent: str, chunks: AsyncIterator[str], **done_fields) -> StreamingResponse:
+    """Relay ``chunks`` as Server-Sent Events as soon as each one arrives.
+
+    Every chunk is a ``data`` event carrying ``delta``; the stream ends with
+    a ``done`` event (plus ``done_fields``) or an ``error`` event.
+    """
+
+    async def events():
+        async with aclosing(chunks):
+            try:
+                async for chunk in chunks:
+                    yield _event({"delta": chunk})
+            except AgentTimeout as exc:
+                yield _event({"detail": str(exc)}, event="error")
+                return
+            except Exception:
+                # the 200 has gone out; report the failure in-band
+                logger.exception(f"{agent} stream failed")
+                yield _event({"detail": f"{agent} failed"}, event="error")
+                return
+        yield _event({"agent": agent, **done_fields}, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def serve_websocket(
+    websocket: WebSocket,
+    agent: str,
+    build_job: Callable[[dict], Awaitable[dict]],
+) -> None:
+    """Answer ``{"prompt": ...}`` messages on ``websocket`` with chunk frames.
+
+    Each prompt produces ``{"type": "chunk", "delta": ...}`` frames followed
+    by one ``{"type": "done", "response": ...}`` frame, or an ``error`` frame.
+    A bad message or a failed job gets an ``error`` frame; the socket stays
+    open for the next prompt.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "messages must be JSON"})
+                continue
+            prompt = message.get("prompt") if isinstance(message, dict) else None
+            if not prompt or not isinstance(prompt, str):
+                await websocket.send_json({"type": "error", "detail": "prompt required"})
+                continue
+            priority = Priority.__members__.get(
+                str(message.get("priority", "")).upper(), Priority.INTERACTIVE
+            )
+            try:
+                await _stream_job(websocket, agent, await build_job(message), priority)
+            except WebSocketDisconnect:
+                raise
+            except Exception:
+                logger.exception(f"{agent} stream job failed")
+                await websocket.send_json({"type": "error", "detail": f"{agent} failed"})
+    except WebSocketDisconnect:
+        logger.info(f"{agent} stream client disconnected")
+
+
+async def _stream_job(websocket: WebSocket, agent: str, job: dict, priority: Priority) -> None:
+    try:
+        chunks = await scheduler.open_stream(agent, job, priority=priority)
+    except SchedulerOverloaded:
+        await websocket.send_json({"type": "error", "detail": f"{agent} is busy"})
+        return
+
+    parts = []
+    try:
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                parts.append(chunk)
+                await websocket.send_json({"type": "chunk", "agent": agent, "delta": chunk})
+    except AgentTimeout as exc:
+        await websocket.send_json({"type": "error", "detail": str(exc)})
+        return
+    await websocket.send_json({"type": "done", "agent": agent, "response": "".join(parts)})
@@ -0,0 +1,264 @@
+# core/cache/attempts.py
+import time
+import uuid
+
+from core.cache import redis_cache
+from core.config.settings import settings
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_PREFIX = "verify"
+_COUNTERS = f"{_PREFIX}:counters"
+_LOCKED = f"{_PREFIX}:locked"  # zset of user → unlock time (ms)
+
+# KEYS: failures zset, lock key
+# ARGV: now_ms, window_ms, max_failures, member
+# Counts an attempt as failed before it is checked: {1, 0} when it may go
+# ahead, else {0, ms to wait}. Checked attempts then settle it with
+# _FAIL_LUA (same member) or _SUCCESS_LUA.
+_RESERVE_LUA = """
+local locked = redis.call('PTTL', KEYS[2])
+if locked > 0 then
+  return {0, locked}
+end
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+  return {0, 1000}  -- the remaining attempts are all in flight
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return {1, 0}
+"""
+
+# KEYS: failures zset, lock key, locked zset, counters hash
+# ARGV: now_ms, window_ms, max_failures, lockout_ms, member, user
+_FAIL_LUA = """
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+redis.call('ZADD', KEYS[1], now, ARGV[5])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+redis.call('HINCRBY', KEYS[4], 'failure', 1)
+local failures = redis.call('ZCARD', KEYS[1])
+local allowed = tonumber(ARGV[3])
+if failures >= allowed then
+  redis.call('SET', KEYS[2], '1', 'PX', ARGV[4])
+  redis.call('ZADD', KEYS[3], now + tonumber(ARGV[4]), ARGV[6])
+  redis.call('DEL', KEYS[1])
+  return {1, 0}
+end
+return {0, allowed - failures}
+"""
+
+# KEYS: failures zset, counters hash
+_SUCCESS_LUA = """
+redis.call('DEL', KEYS[1])
+redis.call('HINCRBY', KEYS[2], 'success', 1)
+return 1
+"""
+
+# KEYS: counters hash, locked zset; ARGV: now_ms
+_STATS_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+local counts = redis.call('HMGET', KEYS[1], 'success', 'failure')
+return {counts[1] or 0, counts[2] or 0, redis.call('ZCARD', KEYS[2])}
+"""
+
+
+class _LocalAttempts:
+    """Single-process stand-in used while Redis is unavailable."""
+
+    def __init__(self):
+        self.failures: dict[str, dict[str, float]] = {}  # user -> attempt -> time
+        self.locks: dict[str, float] = {}
+        self.used: dict[str, float] = {}
+        self.success = 0
+        self.failure = 0
+
+    def locked_for(self, user: str, now: float) -> float:
+        until = self.locks.get(user)
+        if until is None:
+            return 0.0
+        if until <= now:
+            del self.locks[user]
+            return 0.0
+        return until - now
+
+    def _recent(self, user: str, now: float, window: float) -> dict[str, float]:
+        failures = self.failures.get(user, {})
+        self.failures[user] = {a: at for a, at in failures.items() if at > now - window}
+        return self.failures[user]
+
+    def reserve(self, user: str, now: float, window: float, allowed: int, attempt: str) -> float:
+        locked = self.locked_for(user, now)
+        if locked:
+            return locked
+        failures = self._recent(user, now, window)
+        if len(failures) >= allowed:
+            return 1.0
+        failures[attempt] = now
+        return 0.0
+
+    def fail(self, user: str, now: float, window: float, allowed: int, lockout: float, attempt: str):
+        self.failure += 1
+        failures = self._recent(user, now, window)
+        failures[attempt] = now
+        if len(failures) >= allowed:
+            del self.failures[user]
+            self.locks[user] = now + lockout
+            return True, 0
+        return False, allowed - len(failures)
+
+    def succeed(self, user: str) -> None:
+        self.success += 1
+        self.failures.pop(user, None)
+
+    def claim(self, key: str, now: float, ttl: float) -> bool:
+        if len(self.used) > 10_000:
+            self.used = {k: exp for k, exp in self.used.items() if exp > now}
+        if self.used.get(key, 0.0) > now:
+            return False
+        self.used[key] = now + ttl
+        return True
+
+    def stats(self, now: float) -> tuple[int, int, int]:
+        self.locks = {user: until for user, until in self.locks.items() if until > now}
+        return self.success, self.failure, len(self.locks)
+
+
+class AttemptGuard:
+    """Failure counting, lockout and replay protection for code verification.
+
+    Failures are counted in a sliding window per user; reaching
+    ``max_failures`` inside it locks the user out for ``lockout`` seconds.
+    Each attempt is reserved with :meth:`reserve` -- counted as a failure --
+    before the code is checked, so concurrent guesses can't exceed the limit.
+    Every update is a single Lua script so concurrent API workers agree.
+    Success/failure totals and the set of locked users are maintained as
+    they happen, which keeps ``stats()`` independent of traffic volume.
+    Without Redis the same rules apply per process.
+    """
+
+    def __init__(self, max_failures: int, window: float, lockout: float):
+        self.max_failures = max_failures
+        self.window = window
+        self.lockout = lockout
+        self._local = _LocalAttempts()
+        self._scripts: dict[str, object] = {}
+        self._client = None
+
+    def _redis(self):
+        client = redis_cache.redis
+        if client is not None and client is not self._client:
+            self._client = client
+            self._scripts = {
+                "reserve": client.register_script(_RESERVE_LUA),
+                "fail": client.register_script(_FAIL_LUA),
+                "success": client.register_script(_SUCCESS_LUA),
+                "stats": client.register_script(_STATS_LUA),
+            }
+        return client
+
+    def _fallback(self, exc: Exception) -> None:
+        logger.warning(f"Redis unavailable for verification tracking, using local state: {exc}")
+
+    async def locked_for(self, user: str) -> float:
+        """Seconds left on the user's lockout, 0 when not locked."""
+        client = self._redis()
+        if client is not None:
+            try:
+                ttl = await client.pttl(f"{_PREFIX}:lock:{user}")
+                return max(ttl, 0) / 1000
+            except Exception as exc:
+                self._fallback(exc)
+        return self._local.locked_for(user, time.time())
+
+    async def reserve(self, user: str) -> tuple[str | None, float]:
+        """Take one of the user's attempts ahead of checking a code. Returns
+        the attempt to settle with :meth:`record_failure` (or
+        :meth:`record_success`), or ``None`` and the seconds to wait."""
+        attempt = uuid.uuid4().hex
+        client = self._redis()
+        if client is not None:
+            try:
+                allowed, wait_ms = await self._scripts["reserve"](
+                    keys=[f"{_PREFIX}:failures:{user}", f"{_PREFIX}:lock:{user}"],
+                    args=[int(time.time() * 1000), int(self.window * 1000), self.max_failures, attempt],
+                )
+                return (attempt, 0.0) if int(allowed) else (None, int(wait_ms) / 1000)
+            except Exception as exc:
+                self._fallback(exc)
+        wait = self._local.reserve(user, time.time(), self.window, self.max_failures, attempt)
+        return (None, wait) if wait else (attempt, 0.0)
+
+    async def record_failure(self, user: str, attempt: str | None = None) -> tuple[bool, int]:
+        """Count a failure, settling ``attempt`` if it was reserved; returns
+        ``(now_locked, attempts_remaining)``."""
+        attempt = attempt or uuid.uuid4().hex
+        client = self._redis()
+        if client is not None:
+            try:
+                locked, remaining = await self._scripts["fail"](
+                    keys=[
+                        f"{_PREFIX}:failures:{user}",
+                        f"{_PREFIX}:lock:{user}",
+                        _LOCKED,
+                        _COUNTERS,
+                    ],
+                    args=[
+                        int(time.time() * 1000),
+                        int(self.window * 1000),
+                        self.max_failures,
+                        int(self.lockout * 1000),
+                        attempt,
+                        user,
+                    ],
+                )
+                return bool(int(locked)), int(remaining)
+            except Exception as exc:
+                self._fallback(exc)
+        return self._local.fail(user, time.time(), self.window, self.max_failures, self.lockout, attempt)
+
+    async def record_success(self, user: str) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                await self._scripts["success"](keys=[f"{_PREFIX}:failures:{user}", _COUNTERS])
+                return
+            except Exception as exc:
+                self._fallback(exc)
+        self._local.succeed(user)
+
+    async def claim(self, user: str, counter: int, ttl: float) -> bool:
+        """Mark a code as used; False if it was already used (a replay)."""
+        key = f"{_PREFIX}:used:{user}:{counter}"
+        client = self._redis()
+        if client is not None:
+            try:
+                return bool(await client.set(key, "1", nx=True, px=int(ttl * 1000)))
+            except Exception as exc:
+                self._fallback(exc)
+        return self._local.claim(key, time.time(), ttl)
+
+    async def stats(self) -> dict:
+        client = self._redis()
+        counts = None
+        if client is not None:
+            try:
+                counts = await self._scripts["stats"](
+                    keys=[_COUNTERS, _LOCKED], args=[int(time.time() * 1000)]
+                )
+            except Exception as exc:
+                self._fallback(exc)
+        if counts is None:
+            counts = self._local.stats(time.time())
+        success, failure, locked = (int(c) for c in counts)
+        return {"success_count": success, "failure_count": failure, "locked_users": locked}
+
+
+verify_guard = AttemptGuard(
+    max_failures=settings.VERIFY_MAX_FAILURES,
+    window=settings.VERIFY_FAILURE_WINDOW,
+    lockout=settings.VERIFY_LOCKOUT_SECONDS,
+)
@@ -1,51 +1,237 @@
 # redis_cache.py
-import redis.asyncio as aioredis
+"""Shared Redis connection.
+
+``redis`` (text: values decoded to ``str``) and ``redis_bytes``
+(binary-safe) are what callers use: read them at call time, and when they
+are ``None`` take the local fallback. Commands issued in the same loop
+tick are pipelined together (see :mod:`core.cache.redis_client`). They are ``None`` until the first
+connection succeeds and again whenever the circuit breaker opens, so
+callers skip Redis instantly during an outage instead of waiting out
+socket timeouts. A background task reconnects with backoff and puts the
+client back once a probe succeeds.
+"""
+import asyncio
+import inspect
+
 from core.config.settings import settings
+from core.utils.backoff import forever, retry
+from core.utils.circuit import CircuitBreaker, CircuitOpenError
 from core.utils.logger import get_logger
-import asyncio
 
 logger = get_logger(__name__)
 
-redis = None  # Global Redis connection
+redis = None  # Global Redis connection (guarded); None while unavailable
+redis_bytes = None  # the same, without response decoding
+_client = None  # the underlying clients, kept while the circuit is open
+_binary = None
+_pipelines: dict[str, object] = {}
+_reconnect_task: asyncio.Task | None = None
+
+
+def _connection_errors() -> tuple[type[BaseException], ...]:
+    from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+    return (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError)
+
+
+class GuardedRedis:
+    """Proxy for a Redis client that reports connection failures and
+    successes to ``breaker`` and refuses calls while it is open.
+
+    Only awaitable calls are guarded. Scripts registered through the proxy
+    run through it as well.
+    """
+
+    def __init__(self, client, breaker: CircuitBreaker):
+        self._client = client
+        self._breaker = breaker
+        self._errors = _connection_errors()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return self._guard(result) if inspect.isawaitable(result) else result
+        return call
+
+    async def _guard(self, awaitable):
+        if not self._breaker.allow():
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            elif isinstance(awaitable, asyncio.Future):  # queued for a pipeline
+                awaitable.cancel()
+            raise CircuitOpenError(self._breaker.name, self._breaker.retry_after())
+        try:
+            value = await awaitable
+        except self._errors:
+            self._breaker.record_failure()
+            raise
+        self._breaker.record_success()
+        return value
+
+    def register_script(self, script):
+        from redis.commands.core import AsyncScript
+
+        return AsyncScript(self, script)
+
+
+def _wrap(kind: str, client) -> GuardedRedis:
+    if settings.REDIS_AUTO_PIPELINE:
+        from core.cache.redis_client import AutoPipeline
+
+        if kind not in _pipelines or _pipelines[kind]._client is not client:
+            _pipelines[kind] = AutoPipeline(client, settings.REDIS_PIPELINE_MAX_BATCH)
+        client = _pipelines[kind]
+    return GuardedRedis(client, breaker)
+
 
-async def connect_redis(max_retries: int = 3, delay: float = 2.0) -> bool:
+def _attach() -> None:
+    global redis, redis_bytes
+    if _client is not None and redis is None:
+        redis = _wrap("text", _client)
+        redis_bytes = _wrap("binary", _binary)
+
+
+def _detach() -> None:
+    global redis, redis_bytes
+    redis = redis_bytes = None
+    _start_reconnecting()
+
+
+breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+    on_open=_detach,
+    on_close=_attach,
+)
+
+
+def _new_client(decode_responses: bool = True):
+    # deferred: redis is a large package to import
+    from core.cache.redis_client import create_client
+
+    return create_client(
+        settings.REDIS_URL,
+        decode_responses=decode_responses,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        pool_timeout=settings.REDIS_POOL_TIMEOUT,
+        connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+
+
+async def _aclose(client) -> None:
+    await client.aclose(close_connection_pool=True)
+
+
+async def _ping(client) -> None:
+    try:
+        await client.ping()
+    except Exception:
+        await _aclose(client)
+        raise
+
+
+def stats() -> dict:
+    """Pool sizing and pipelining numbers, for /health."""
+    pools = {
+        kind: client.connection_pool.stats()
+        for kind, client in (("text", _client), ("binary", _binary))
+        if client is not None and hasattr(client.connection_pool, "stats")
+    }
+    return {
+        "pools": pools,
+        "pipelines": {kind: pipeline.stats() for kind, pipeline in _pipelines.items()},
+    }
+
+
+async def connect_redis(max_retries: int | None = None, delay: float | None = None) -> bool:
     """Establish connection to Redis.
 
     Parameters
     ----------
-    max_retries: int
-        Number of connection attempts before giving up.
-    delay: float
-        Delay between retries in seconds.
+    max_retries: int, optional
+        Number of connection attempts before giving up
+        (``STARTUP_RETRIES`` by default).
+    delay: float, optional
+        First backoff delay in seconds, doubled on every retry
+        (``STARTUP_BACKOFF_BASE`` by default).
 
     Returns
     -------
     bool
-        True if connection succeeded, False otherwise.
+        True if connection succeeded, False otherwise. On failure the app
+        carries on without Redis and keeps trying in the background.
     """
-    global redis
-    for attempt in range(1, max_retries + 1):
+    global _client, _binary
+
+    async def attempt():
+        client = _new_client()
+        await _ping(client)
+        return client
+
+    try:
+        _client = await retry(
+            "Redis connection",
+            attempt,
+            max_retries or settings.STARTUP_RETRIES,
+            settings.STARTUP_BACKOFF_BASE if delay is None else delay,
+            settings.STARTUP_BACKOFF_MAX,
+        )
+    except Exception:
+        logger.error("All Redis connection attempts failed; continuing without cache")
+        _start_reconnecting()
+        return False
+    _binary = _new_client(decode_responses=False)
+    _attach()
+    logger.info("Connected to Redis")
+    return True
+
+
+def _start_reconnecting() -> None:
+    global _reconnect_task
+    if _reconnect_task is not None and not _reconnect_task.done():
+        return
+    try:
+        _reconnect_task = asyncio.get_running_loop().create_task(_reconnect_forever())
+    except RuntimeError:  # no running loop (shutdown); nothing to reconnect for
+        _reconnect_task = None
+
+
+async def _reconnect_forever() -> None:
+    """Half-open probing: ping until Redis answers, then close the circuit."""
+    global _client, _binary
+    for pause in forever(settings.STARTUP_BACKOFF_BASE, settings.REDIS_RECONNECT_MAX):
+        await asyncio.sleep(max(pause, breaker.retry_after()))
         try:
-            redis = aioredis.from_url(
-                settings.REDIS_URL,
-                decode_responses=True,
-                max_connections=10,
-                socket_connect_timeout=5,
-            )
-            await redis.ping()
-            logger.info("Connected to Redis")
-            return True
+            if _client is None:
+                _client = _new_client()
+                _binary = _new_client(decode_responses=False)
+            await _client.ping()
         except Exception as exc:
-            logger.error(f"Redis connection attempt {attempt} failed: {exc}")
-            redis = None
-            if attempt == max_retries:
-                logger.error("All Redis connection attempts failed; continuing without cache")
-                return False
-            await asyncio.sleep(delay)
+            logger.debug(f"Redis still unavailable: {exc}")
+            breaker.record_failure()
+            continue
+        breaker.record_success()  # closes the circuit if it was open
+        _attach()  # and covers a client that never connected at boot
+        logger.info("Reconnected to Redis")
+        return
+
 
 async def close_redis():
-    global redis
-    if redis:
-        await redis.aclose()
-        redis = None
+    global redis, redis_bytes, _client, _binary, _reconnect_task
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+        _reconnect_task = None
+    redis = redis_bytes = None
+    _pipelines.clear()
+    if _client is not None:
+        clients, _client, _binary = (_client, _binary), None, None
+        for client in clients:
+            if client is not None:
+                await _aclose(client)
         logger.info("Redis connection closed")
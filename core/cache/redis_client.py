@@ -0,0 +1,196 @@
+# core/cache/redis_client.py
+"""Redis clients: a connection pool that reports how well it is sized,
+and auto-pipelining of commands issued in the same event-loop tick.
+
+Imported by :mod:`core.cache.redis_cache` when it first connects; the
+rest of the app goes through ``redis_cache.redis`` / ``redis_cache.redis_bytes``.
+"""
+import asyncio
+import time
+
+import redis.asyncio as aioredis
+from redis.asyncio.connection import BlockingConnectionPool
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.commands.core import AsyncCoreCommands
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+# Commands that block the connection or change its state; batching them
+# would hold up (or break) every command queued behind them.
+UNBATCHED = frozenset({
+    "BLPOP", "BRPOP", "BRPOPLPUSH", "BLMOVE", "BLMPOP", "BZPOPMIN", "BZPOPMAX",
+    "BZMPOP", "XREAD", "XREADGROUP", "WAIT", "WAITAOF", "MULTI", "EXEC", "WATCH",
+    "UNWATCH", "SUBSCRIBE", "PSUBSCRIBE", "SSUBSCRIBE", "MONITOR", "SELECT",
+})
+
+# command methods that only build arguments for ``execute_command``
+_COMMANDS = frozenset(name for name in dir(AsyncCoreCommands) if not name.startswith("_"))
+
+
+class TrackedPool(BlockingConnectionPool):
+    """Connection pool that waits (up to ``timeout``) for a free connection
+    instead of failing, and keeps the numbers needed to size it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.peak_in_use = 0
+
+    async def get_connection(self, *args, **kwargs):
+        full = len(self._in_use_connections) >= self.max_connections
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except RedisConnectionError as exc:
+            if isinstance(exc.__cause__, asyncio.TimeoutError):
+                self.timeouts += 1
+            raise
+        self.acquired += 1
+        if full:
+            waited = time.perf_counter() - start
+            self.waits += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.peak_in_use = max(self.peak_in_use, len(self._in_use_connections))
+        return connection
+
+    def stats(self) -> dict:
+        in_use = len(self._in_use_connections)
+        return {
+            "max_connections": self.max_connections,
+            "open": in_use + len(self._available_connections),
+            "in_use": in_use,
+            "peak_in_use": self.peak_in_use,
+            "acquired": self.acquired,
+            # acquisitions that found every connection busy; a pool that
+            # waits often (or times out) is too small
+            "waits": self.waits,
+            "mean_wait_ms": round(self.wait_seconds / self.waits * 1000, 3) if self.waits else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "timeouts": self.timeouts,
+        }
+
+
+class AutoPipeline:
+    """Batch the commands issued in one event-loop tick into a pipeline.
+
+    Every command method of the wrapped client queues its command and
+    returns a future; the first command of a tick schedules a flush that
+    sends the whole batch in one round trip (``transaction=False``: the
+    commands are not atomic, only sent together). Anything that is not a
+    command -- ``pipeline()``, ``pubsub()``, ``connection_pool`` -- goes
+    straight to the client.
+
+    Parameters
+    ----------
+    client: redis.asyncio.Redis
+        Client whose pool the batches are sent through.
+    max_batch: int
+        Most commands per pipeline; bigger ticks are sent in several.
+    """
+
+    def __init__(self, client: aioredis.Redis, max_batch: int = 256):
+        self._client = client
+        self.max_batch = max_batch
+        self._queue: list[tuple[tuple, dict, asyncio.Future]] = []
+        self._flushes: set[asyncio.Task] = set()
+        self.batches = 0
+        self.commands = 0
+        self.largest_batch = 0
+
+    def __getattr__(self, name: str):
+        if name in _COMMANDS:
+            # bound to self so the command lands in our execute_command
+            return getattr(type(self._client), name).__get__(self)
+        return getattr(self._client, name)
+
+    def execute_command(self, *args, **options):
+        if str(args[0]).upper() in UNBATCHED:
+            return self._client.execute_command(*args, **options)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((args, options, future))
+        if len(self._queue) == 1:
+            # runs on a later loop iteration, after the rest of this tick queued
+            task = asyncio.create_task(self._flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        return future
+
+    async def _flush(self) -> None:
+        queue, self._queue = self._queue, []
+        # callers that gave up (cancelled, or refused by the circuit breaker)
+        queue = [entry for entry in queue if not entry[2].done()]
+        try:
+            for start in range(0, len(queue), self.max_batch):
+                await self._send(queue[start:start + self.max_batch])
+        except asyncio.CancelledError:
+            for _, _, future in queue:
+                future.cancel()
+            raise
+
+    async def _send(self, batch: list) -> None:
+        if not batch:
+            return
+        self.batches += 1
+        self.commands += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        if len(batch) == 1:
+            args, options, _ = batch[0]
+            try:
+                results = [await self._client.execute_command(*args, **options)]
+            except Exception as exc:
+                results = [exc]
+        else:
+            pipe = self._client.pipeline(transaction=False)
+            for args, options, _ in batch:
+                pipe.execute_command(*args, **options)
+            try:
+                results = await pipe.execute(raise_on_error=False)
+            except Exception as exc:  # the round trip itself failed
+                results = [exc] * len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "commands": self.commands,
+            "mean_batch": round(self.commands / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+
+def create_client(
+    url: str,
+    *,
+    decode_responses: bool,
+    max_connections: int,
+    pool_timeout: float,
+    connect_timeout: float,
+    socket_timeout: float,
+) -> aioredis.Redis:
+    """Client over a :class:`TrackedPool` for ``url``.
+
+    ``decode_responses=False`` gives a binary-safe client: values come back
+    as the bytes that were stored.
+    """
+    pool = TrackedPool.from_url(
+        url,
+        decode_responses=decode_responses,
+        max_connections=max_connections,
+        timeout=pool_timeout,
+        socket_connect_timeout=connect_timeout,
+        socket_timeout=socket_timeout,
+        # one retry for a stale pooled connection; outages are the breaker's job
+        retry=Retry(NoBackoff(), 1),
+    )
+    return aioredis.Redis(connection_pool=pool)
@@ -0,0 +1,228 @@
+# core/cache/response_cache.py
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from core.cache import redis_cache
+from core.config.settings import settings
+from core.memory import get_embedder
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCT = " \t\n?!.,;:"
+
+
+def normalize_prompt(prompt: str) -> str:
+    return _SPACE_RE.sub(" ", prompt.lower()).strip(_EDGE_PUNCT)
+
+
+def context_hash(job: dict) -> str:
+    """Stable hash of everything in ``job`` except the prompt itself."""
+    rest = {k: v for k, v in job.items() if k != "prompt"}
+    blob = json.dumps(rest, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+    """Two-tier cache for agent responses.
+
+    Entries are keyed by agent, normalised prompt and a hash of the rest of
+    the job (context, retrieved memories), so the same question asked with
+    different context never collides. Lookups go to an in-process LRU
+    first and then to Redis when it is connected. For agents with a
+    similarity threshold, a miss also compares the prompt embedding with
+    recently cached prompts that share the same context hash.
+
+    Every entry remembers how long it took to produce; hits add that to
+    ``saved_ms`` so the stats show how much agent time the cache avoided.
+    """
+
+    def __init__(self, l1_size: int = 1024, semantic_size: int = 512):
+        self.l1_size = l1_size
+        self._l1: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._semantic: dict[str, deque] = {}
+        self._semantic_size = semantic_size
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats_counters = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "semantic_hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "saved_ms": 0.0,
+        }
+
+    # ─── Keys and policy ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def ttl_for(agent: str) -> int:
+        return settings.RESPONSE_CACHE_TTLS.get(agent, 0)
+
+    @staticmethod
+    def key_for(agent: str, job: dict) -> str:
+        digest = hashlib.sha256(
+            f"{normalize_prompt(job['prompt'])}\0{context_hash(job)}".encode()
+        ).hexdigest()
+        return f"agent_cache:{agent}:{digest}"
+
+    # ─── Tiers ────────────────────────────────────────────────────────────────
+
+    def _l1_get(self, key: str) -> dict | None:
+        item = self._l1.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return entry
+
+    def _l1_put(self, key: str, entry: dict, ttl: int) -> None:
+        self._l1[key] = (time.monotonic() + ttl, entry)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_size:
+            self._l1.popitem(last=False)
+
+    async def _l2_get(self, key: str) -> dict | None:
+        client = redis_cache.redis
+        if client is None:
+            return None
+        try:
+            raw = await client.get(key)
+        except Exception as exc:
+            logger.warning(f"Response cache read failed: {exc}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def _l2_put(self, key: str, entry: dict, ttl: int) -> None:
+        client = redis_cache.redis
+        if client is None:
+            return
+        try:
+            await client.set(key, json.dumps(entry), ex=ttl)
+        except Exception as exc:
+            logger.warning(f"Response cache write failed: {exc}")
+
+    # ─── Semantic matching ────────────────────────────────────────────────────
+
+    def _embed(self, prompt: str) -> np.ndarray:
+        return get_embedder().embed([normalize_prompt(prompt)])[0]
+
+    def _semantic_match(self, agent: str, job: dict, threshold: float) -> str | None:
+        recent = self._semantic.get(agent)
+        if not recent:
+            return None
+        ctx, now = context_hash(job), time.monotonic()
+        candidates = [(key, vec) for c, key, vec, exp in recent if c == ctx and exp > now]
+        if not candidates:
+            return None
+        scores = np.stack([vec for _, vec in candidates]) @ self._embed(job["prompt"])
+        best = int(np.argmax(scores))
+        return candidates[best][0] if scores[best] >= threshold else None
+
+    def _semantic_add(self, agent: str, job: dict, key: str, ttl: int) -> None:
+        recent = self._semantic.setdefault(agent, deque(maxlen=self._semantic_size))
+        recent.append((context_hash(job), key, self._embed(job["prompt"]), time.monotonic() + ttl))
+
+    # ─── Public API ───────────────────────────────────────────────────────────
+
+    async def get(self, agent: str, job: dict) -> str | None:
+        """Cached response for ``job`` or ``None``; counts hits, not misses."""
+        if not self.ttl_for(agent):
+            return None
+        key = self.key_for(agent, job)
+        entry = self._l1_get(key)
+        tier = "l1_hits"
+        if entry is None:
+            threshold = settings.RESPONSE_CACHE_SIMILARITY.get(agent)
+            similar = self._semantic_match(agent, job, threshold) if threshold else None
+            if similar is not None:
+                entry = self._l1_get(similar)
+                tier = "semantic_hits"
+        if entry is None:
+            entry = await self._l2_get(key)
+            tier = "l2_hits"
+            if entry is not None:
+                self._l1_put(key, entry, min(self.ttl_for(agent), settings.RESPONSE_CACHE_L1_TTL))
+        if entry is None:
+            return None
+        self.stats_counters[tier] += 1
+        self.stats_counters["saved_ms"] += entry["cost_ms"]
+        return entry["response"]
+
+    async def put(self, agent: str, job: dict, response: str, cost_ms: float) -> None:
+        ttl = self.ttl_for(agent)
+        if not ttl:
+            return
+        key = self.key_for(agent, job)
+        entry = {"response": response, "cost_ms": round(cost_ms, 2)}
+        self._l1_put(key, entry, min(ttl, settings.RESPONSE_CACHE_L1_TTL))
+        if settings.RESPONSE_CACHE_SIMILARITY.get(agent):
+            self._semantic_add(agent, job, key, ttl)
+        await self._l2_put(key, entry, ttl)
+
+    async def get_or_compute(
+        self, agent: str, job: dict, compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return a cached response or run ``compute`` once per key.
+
+        Concurrent misses for the same key share one computation.
+        """
+        cached = await self.get(agent, job)
+        if cached is not None:
+            return cached
+        if not self.ttl_for(agent):
+            return await compute()
+
+        key = self.key_for(agent, job)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats_counters["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        self.stats_counters["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        started = time.perf_counter()
+        try:
+            response = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            future.set_result(response)
+            await self.put(agent, job, response, (time.perf_counter() - started) * 1000)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._l1.clear()
+        self._semantic.clear()
+
+    def stats(self) -> dict:
+        counters = self.stats_counters
+        hits = counters["l1_hits"] + counters["l2_hits"] + counters["semantic_hits"] + counters["coalesced"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "saved_ms": round(counters["saved_ms"], 2),
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "l1_entries": len(self._l1),
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,75 @@
+# core/cache/versions.py
+import secrets
+
+from core.cache import redis_cache
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_PREFIX = "version"
+
+# KEYS[1]: version key. ARGV: fresh token, ttl in seconds (0: none).
+# Returns the current token, creating it when missing.
+_GET_LUA = """
+local v = redis.call('GET', KEYS[1])
+if v then return v end
+if tonumber(ARGV[2]) > 0 then
+  redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+else
+  redis.call('SET', KEYS[1], ARGV[1])
+end
+return ARGV[1]
+"""
+
+
+def _token() -> str:
+    return secrets.token_hex(6)
+
+
+class ResourceVersions:
+    """Opaque version tokens for resources, replaced on every write.
+
+    Tokens are random rather than counters, so a flushed Redis can never
+    hand out a token an old ETag still carries. Writers call :meth:`bump`
+    after committing; readers turn :meth:`get` into an ETag. A ``ttl``
+    retires a token after that long even without a write, for resources
+    that change in ways nobody reports (live metrics, external data).
+
+    Tokens live in Redis so every worker sees a write at once. Without
+    Redis there is no way to hear about writes made by other workers, so
+    :meth:`get` returns ``None`` and callers skip conditional responses.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._script = None
+
+    def _redis(self):
+        client = redis_cache.redis
+        if client is not None and client is not self._client:
+            self._client = client
+            self._script = client.register_script(_GET_LUA)
+        return client
+
+    async def get(self, resource: str, ttl: int = 0) -> str | None:
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            return await self._script(keys=[f"{_PREFIX}:{resource}"], args=[_token(), ttl])
+        except Exception as exc:
+            logger.warning(f"Resource versions unavailable: {exc}")
+            return None
+
+    async def bump(self, *resources: str) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            # deleting is enough: the next get() creates a fresh token
+            await client.delete(*(f"{_PREFIX}:{resource}" for resource in resources))
+        except Exception as exc:
+            logger.warning(f"Could not bump versions of {resources}: {exc}")
+
+
+versions = ResourceVersions()
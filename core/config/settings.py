@@ -12,6 +12,124 @@ class Settings(BaseSettings):
     FRONTEND_URL: str = "http://localhost:5173"
     JWT_SECRET: str = Field(..., env="JWT_SECRET")
     IS_PROD: bool = Field(False, env="IS_PROD")
+    # users allowed on admin-only routes (the database explorer)
+    ADMIN_USERNAMES: list[str] = []
+    # connection attempts at startup, with exponential backoff (seconds)
+    STARTUP_RETRIES: int = 5
+    STARTUP_BACKOFF_BASE: float = 0.25
+    STARTUP_BACKOFF_MAX: float = 4.0
+    # per client (text and binary); REDIS_POOL_TIMEOUT is how long a command
+    # waits for a free connection when all are busy
+    REDIS_MAX_CONNECTIONS: int = 10
+    REDIS_POOL_TIMEOUT: float = 2.0
+    # batch commands issued in the same event-loop tick into one pipeline
+    REDIS_AUTO_PIPELINE: bool = True
+    REDIS_PIPELINE_MAX_BATCH: int = 256
+    REDIS_CONNECT_TIMEOUT: float = 2.0
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_RECONNECT_MAX: float = 30.0
+    # consecutive connection failures that open a circuit, and how long it
+    # stays open before a trial call
+    BREAKER_FAILURE_THRESHOLD: int = 3
+    BREAKER_RESET_TIMEOUT: float = 5.0
+    HEALTH_PROBE_INTERVAL: float = 5.0
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    # responses smaller than this go out uncompressed; bodies (or stream
+    # chunks) from COMPRESSION_OFFLOAD_SIZE up are compressed in a thread
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_OFFLOAD_SIZE: int = 256 * 1024
+    # built frontend (vite build), served and precompressed when present
+    STATIC_DIR: str = "frontend/dist"
+    # websockets are pinged this often and dropped after WS_IDLE_TIMEOUT
+    # seconds without a message, or when a send stalls for WS_SEND_TIMEOUT
+    WS_HEARTBEAT_INTERVAL: float = 20.0
+    WS_IDLE_TIMEOUT: float = 60.0
+    WS_SEND_TIMEOUT: float = 5.0
+    # leader-only periodic tasks (market feed, metrics sampling) run on the
+    # worker holding this lease: "redis" (a key; a lock file in
+    # SCHEDULER_LOCK_DIR while Redis is down) or "file" (one host only).
+    # Every worker must use the same backend.
+    SCHEDULER_LEASE: str = "redis"
+    SCHEDULER_LEASE_TTL: float = 10.0
+    SCHEDULER_LOCK_DIR: str = "data/scheduler"
+    # most sub-requests one POST /api/batch may carry
+    BATCH_MAX_REQUESTS: int = 32
+    # read-only GET routes (templates as in CONDITIONAL_GET) whose batched
+    # sub-requests share one session; the rest open their own
+    BATCH_SHARED_SESSION_PATHS: list[str] = [
+        "/api/users",
+        "/api/users/{user_id}",
+        "/api/auth/me",
+        "/api/auth/status",
+        "/api/auth/password-reset/check",
+        "/api/feedback/pending",
+    ]
+    # import each router on its first request; False imports all at startup
+    LAZY_ROUTERS: bool = True
+    MEMORY_INDEX_DIR: str = "data/memory_index"
+    MEMORY_EMBEDDER: str = "core.memory.embedder.HashingEmbedder"
+    MEMORY_EMBEDDING_DIM: int = 256
+    MEMORY_INDEX_NLIST: int = 1024
+    MEMORY_INDEX_NPROBE: int = 16
+    AGENT_CONCURRENCY: int = 4
+    AGENT_MAX_BATCH: int = 8
+    AGENT_BATCH_WINDOW_MS: int = 10
+    AGENT_TIMEOUT: float = 30.0
+    AGENT_MAX_QUEUE: int = 256
+    AGENT_BACKEND: str = "core.agents.backend.FakeBackend"
+    RESPONSE_CACHE_TTLS: dict[str, int] = {"neuroweave": 300, "sporelink": 60, "rootbloom": 600}
+    RESPONSE_CACHE_SIMILARITY: dict[str, float] = {"sporelink": 0.9}
+    RESPONSE_CACHE_L1_TTL: int = 60
+    PLUGIN_PROCESS_WORKERS: int = 2
+    PLUGIN_MAX_CALLS_PER_WORKER: int = 500
+    PLUGIN_CPU_SECONDS: float = 5.0
+    PLUGIN_MEMORY_MB: int = 1024
+    PLUGIN_TIMEOUT: float = 10.0
+    # largest reply a plugin worker may send; bigger ones kill the worker
+    PLUGIN_MAX_MESSAGE_BYTES: int = 16 * 1024 * 1024
+    FEEDBACK_ANALYSIS_BATCH_SIZE: int = 256
+    TOTP_ISSUER: str = "Hyphae"
+    VERIFY_MAX_FAILURES: int = 5
+    VERIFY_FAILURE_WINDOW: float = 300.0
+    VERIFY_LOCKOUT_SECONDS: float = 900.0
+    QUERY_LOG_ENABLED: bool = True
+    QUERY_LOG_SIZE: int = 1000
+    # distinct statement shapes with their own stats; the rest are pooled
+    QUERY_LOG_MAX_SHAPES: int = 1000
+    EXPLORER_POOL_SIZE: int = 3
+    EXPLORER_POOL_TIMEOUT: float = 10.0
+    EXPLORER_IDLE_SECONDS: float = 300.0
+    EXPLORER_SCHEMA_TTL: float = 300.0
+    EXPLORER_PAGE_SIZE: int = 100
+    EXPLORER_MAX_PAGE_SIZE: int = 1000
+    EXPLORER_STREAM_BATCH_SIZE: int = 5000
+    # explorer targets: existing SQLite files under this directory, and
+    # Postgres servers on these hosts only
+    EXPLORER_SQLITE_DIR: str = "data/explorer"
+    EXPLORER_ALLOWED_HOSTS: list[str] = []
+    # path -> {"rate", "per" (seconds), "burst", "by": "ip" | "user"}
+    RATE_LIMITS: dict[str, dict] = {
+        "/api/auth/login": {"rate": 10, "per": 60, "burst": 5, "by": "ip"},
+        "/api/auth/password-reset/request": {"rate": 5, "per": 3600, "burst": 3, "by": "ip"},
+        "/api/neuroweave/ask": {"rate": 60, "per": 60, "burst": 10, "by": "user"},
+        "/api/agent/ask": {"rate": 60, "per": 60, "burst": 10, "by": "user"},
+        "/api/rootbloom/generate": {"rate": 30, "per": 60, "burst": 5, "by": "user"},
+        "/api/sporelink/analyze": {"rate": 60, "per": 60, "burst": 10, "by": "user"},
+    }
+    # GET path -> {"resource" (may use path params), "cache_control",
+    # "ttl" (seconds a version lasts without a write; 0: until one)};
+    # routes sharing a resource must give it the same ttl
+    CONDITIONAL_GET: dict[str, dict] = {
+        "/api/users/{user_id}": {"resource": "user:{user_id}", "cache_control": "private, no-cache"},
+        "/api/system/dashboard": {"resource": "system", "cache_control": "no-cache"},
+        "/api/mycocore/snapshot": {"resource": "metrics", "cache_control": "no-cache", "ttl": 5},
+        "/api/market-context/{symbol}": {
+            "resource": "market-context:{symbol}", "cache_control": "public, max-age=60", "ttl": 60,
+        },
+        "/api/connections/{connection_id}/structure": {
+            "resource": "schema:{connection_id}", "cache_control": "private, no-cache", "ttl": 300,
+        },
+    }
 
     # Pydantic V2 configuration using model_config
     model_config = {
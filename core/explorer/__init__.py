@@ -0,0 +1,14 @@
+from .connections import ConnectionInfo, ConnectionRegistry, TableInfo, explorer
+from .export import ARROW_STREAM, NDJSON, arrow_stream, negotiate, ndjson_stream
+
+__all__ = [
+    "ARROW_STREAM",
+    "NDJSON",
+    "ConnectionInfo",
+    "ConnectionRegistry",
+    "TableInfo",
+    "arrow_stream",
+    "explorer",
+    "ndjson_stream",
+    "negotiate",
+]
@@ -0,0 +1,454 @@
+# core/explorer/connections.py
+import asyncio
+import base64
+import hashlib
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, AsyncIterator, Literal
+
+from sqlalchemy import column, inspect, select, table, tuple_
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from core.config.settings import settings
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Driver = Literal["postgresql", "sqlite"]
+
+_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+@dataclass
+class ConnectionInfo:
+    id: str
+    name: str
+    driver: Driver
+    host: str = ""
+    port: int | None = None
+    database: str = ""
+    username: str = ""
+    password: str = field(default="", repr=False)
+    ssl: bool = False
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    @classmethod
+    def from_params(cls, params: dict, name: str | None = None) -> "ConnectionInfo":
+        driver = params.get("driver") or ("sqlite" if not params.get("host") else "postgresql")
+        if driver not in _DRIVERS:
+            raise ValueError(f"unsupported driver {driver!r}")
+        if not params.get("database"):
+            raise ValueError("database is required")
+        if driver == "sqlite" and params["database"] == ":memory:":
+            raise ValueError("in-memory SQLite databases cannot be shared")
+        return cls(
+            id=str(uuid.uuid4()),
+            name=name or params.get("name") or params["database"],
+            driver=driver,
+            host=params.get("host") or "",
+            port=int(params["port"]) if params.get("port") else None,
+            database=params["database"],
+            username=params.get("username") or "",
+            password=params.get("password") or "",
+            ssl=bool(params.get("ssl")),
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Identity of the target database, ignoring the display name."""
+        raw = f"{self.driver}|{self.host}|{self.port}|{self.database}|{self.username}|{self.ssl}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def url(self) -> URL:
+        if self.driver == "sqlite":
+            # read-write, never create: a file removed since registration stays gone
+            return URL.create(
+                _DRIVERS["sqlite"], database=f"{Path(self.database).as_uri()}?mode=rw", query={"uri": "true"}
+            )
+        return URL.create(
+            _DRIVERS[self.driver],
+            username=self.username or None,
+            password=self.password or None,
+            host=self.host or None,
+            port=self.port,
+            database=self.database,
+        )
+
+    def public(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "driver": self.driver,
+            "host": self.host,
+            "port": self.port,
+            "database": self.database,
+            "username": self.username,
+            "ssl": self.ssl,
+            "created_at": self.created_at,
+        }
+
+
+@dataclass
+class TableInfo:
+    schema: str | None
+    name: str
+    columns: list[str]
+    primary_key: list[str]
+    types: dict[str, Any] = field(default_factory=dict)  # column -> reflected SQLAlchemy type
+
+
+@dataclass
+class SchemaSnapshot:
+    tables: dict[tuple[str | None, str], TableInfo]
+    taken_at: float
+
+
+class _Source:
+    """A registered connection plus its lazily created engine."""
+
+    def __init__(self, info: ConnectionInfo):
+        self.info = info
+        self.engine: AsyncEngine | None = None
+        self.last_used = time.monotonic()
+        self.schema: SchemaSnapshot | None = None
+        self.lock = asyncio.Lock()
+
+    def get_engine(self) -> AsyncEngine:
+        self.last_used = time.monotonic()
+        if self.engine is None:
+            connect_args = {"ssl": True} if self.info.ssl and self.info.driver == "postgresql" else {}
+            self.engine = create_async_engine(
+                self.info.url(),
+                pool_size=settings.EXPLORER_POOL_SIZE,
+                max_overflow=0,
+                pool_timeout=settings.EXPLORER_POOL_TIMEOUT,
+                pool_recycle=1800,
+                connect_args=connect_args,
+            )
+            logger.info(f"Opened pool for connection {self.info.name}")
+        return self.engine
+
+    def checked_out(self) -> int:
+        if self.engine is None:
+            return 0
+        return getattr(self.engine.pool, "checkedout", lambda: 0)()
+
+    async def dispose(self) -> None:
+        if self.engine is not None:
+            engine, self.engine = self.engine, None
+            await engine.dispose()
+
+
+def _introspect(sync_conn) -> dict[tuple[str | None, str], TableInfo]:
+    inspector = inspect(sync_conn)
+    default = inspector.default_schema_name
+    schemas = [
+        s for s in inspector.get_schema_names()
+        if s not in ("information_schema", "pg_catalog", "pg_toast") and not s.startswith("pg_temp")
+    ] if sync_conn.dialect.name == "postgresql" else [default]
+    tables = {}
+    for schema in schemas:
+        for name in inspector.get_table_names(schema=schema):
+            reflected = inspector.get_columns(name, schema=schema)
+            columns = [c["name"] for c in reflected]
+            pk = inspector.get_pk_constraint(name, schema=schema).get("constrained_columns") or []
+            types = {c["name"]: c["type"] for c in reflected}
+            tables[(schema, name)] = TableInfo(schema, name, columns, pk, types)
+    return tables
+
+
+# key values JSON has no type for are tagged, so a cursor hands the driver
+# back the same Python type it returned (asyncpg won't take a string for
+# a timestamp or uuid column)
+_CURSOR_TYPES: list[tuple[str, type, Any, Any]] = [
+    ("datetime", datetime, datetime.isoformat, datetime.fromisoformat),
+    ("date", date, date.isoformat, date.fromisoformat),
+    ("time", dt_time, dt_time.isoformat, dt_time.fromisoformat),
+    ("timedelta", timedelta, timedelta.total_seconds, lambda v: timedelta(seconds=v)),
+    ("decimal", Decimal, str, Decimal),
+    ("uuid", uuid.UUID, str, uuid.UUID),
+    ("bytes", bytes, lambda v: base64.b64encode(v).decode(), base64.b64decode),
+]
+_CURSOR_DECODERS = {tag: decode for tag, _, _, decode in _CURSOR_TYPES}
+
+
+def _tag_value(value: Any) -> Any:
+    for tag, kind, encode, _ in _CURSOR_TYPES:
+        if isinstance(value, kind):
+            return {"$": tag, "v": encode(value)}
+    return str(value)
+
+
+def _untag_value(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    try:
+        return _CURSOR_DECODERS[value["$"]](value["v"])
+    except (KeyError, TypeError, ValueError, ArithmeticError) as exc:
+        raise ValueError("malformed cursor") from exc
+
+
+def encode_cursor(values: list[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=_tag_value).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as exc:
+        raise ValueError("malformed cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("malformed cursor")
+    return [_untag_value(v) for v in values]
+
+
+class ConnectionRegistry:
+    """External databases registered through the explorer.
+
+    Each connection gets its own engine, created on first use with a small
+    fixed-size pool, and disposed again after ``idle_seconds`` without use.
+    Table listings are introspected once and cached for ``schema_ttl``
+    seconds or until :meth:`invalidate` is called.
+
+    Only existing SQLite files under ``sqlite_dir`` and Postgres servers in
+    ``allowed_hosts`` can be registered; without a ``sqlite_dir`` no SQLite
+    file can.
+    """
+
+    def __init__(
+        self,
+        idle_seconds: float,
+        schema_ttl: float,
+        sqlite_dir: str | Path | None = None,
+        allowed_hosts: list[str] = (),
+    ):
+        self.idle_seconds = idle_seconds
+        self.schema_ttl = schema_ttl
+        self.sqlite_dir = Path(sqlite_dir).resolve() if sqlite_dir else None
+        self.allowed_hosts = set(allowed_hosts)
+        self._sources: dict[str, _Source] = {}
+        self._reaper: asyncio.Task | None = None
+
+    # ─── registration ────────────────────────────────────────────────────────
+    def register(self, params: dict, name: str | None = None) -> ConnectionInfo:
+        info = ConnectionInfo.from_params(params, name)
+        self._check_target(info)
+        for source in self._sources.values():
+            if source.info.fingerprint == info.fingerprint:
+                if source.info.password != info.password:
+                    # its open pool still uses the old credentials
+                    raise ValueError(
+                        f"{source.info.name} is already registered with other credentials; remove it first"
+                    )
+                return source.info
+        self._sources[info.id] = _Source(info)
+        return info
+
+    def _check_target(self, info: ConnectionInfo) -> None:
+        """Keep registrations to the allowed files and hosts. SQLite paths are
+        resolved (symlinks and ``..`` included) before the check, and stored
+        resolved."""
+        if info.driver == "postgresql":
+            if info.host not in self.allowed_hosts:
+                raise ValueError(f"host {info.host!r} is not allowed")
+            return
+        if self.sqlite_dir is None:
+            raise ValueError("SQLite connections are disabled")
+        path = (self.sqlite_dir / info.database).resolve()
+        if not path.is_relative_to(self.sqlite_dir):
+            raise ValueError(f"SQLite databases must be under {self.sqlite_dir}")
+        if not path.is_file():
+            raise ValueError(f"no SQLite database at {info.database}")
+        info.database = str(path)
+
+    def connections(self) -> list[ConnectionInfo]:
+        return [s.info for s in self._sources.values()]
+
+    def get(self, ref: str) -> _Source:
+        """Look a connection up by id, or failing that by name."""
+        source = self._sources.get(ref)
+        if source is None:
+            source = next((s for s in self._sources.values() if s.info.name == ref), None)
+        if source is None:
+            raise KeyError(ref)
+        self._ensure_reaper()
+        return source
+
+    async def remove(self, ref: str) -> None:
+        source = self.get(ref)
+        del self._sources[source.info.id]
+        await source.dispose()
+
+    # ─── schema ──────────────────────────────────────────────────────────────
+    async def schema(self, ref: str, refresh: bool = False) -> SchemaSnapshot:
+        source = self.get(ref)
+        snapshot = source.schema
+        if not refresh and snapshot and time.monotonic() - snapshot.taken_at < self.schema_ttl:
+            return snapshot
+        async with source.lock:  # one introspection at a time per connection
+            snapshot = source.schema
+            if refresh or not snapshot or time.monotonic() - snapshot.taken_at >= self.schema_ttl:
+                async with source.get_engine().connect() as conn:
+                    tables = await conn.run_sync(_introspect)
+                snapshot = source.schema = SchemaSnapshot(tables, time.monotonic())
+        return snapshot
+
+    def invalidate(self, ref: str | None = None) -> None:
+        sources = [self.get(ref)] if ref else self._sources.values()
+        for source in sources:
+            source.schema = None
+
+    async def table_info(self, ref: str, schema: str | None, name: str) -> TableInfo:
+        snapshot = await self.schema(ref)
+        info = snapshot.tables.get((schema, name))
+        if info is None and schema in (None, "main", "public", "default"):
+            info = next((t for (_, n), t in snapshot.tables.items() if n == name), None)
+        if info is None:
+            raise LookupError(f"unknown table {schema}.{name}")
+        return info
+
+    # ─── rows ────────────────────────────────────────────────────────────────
+    @staticmethod
+    def project(info: TableInfo, columns: list[str] | None) -> list[str]:
+        """Validate a column projection; ``None`` or empty means every column."""
+        if not columns:
+            return list(info.columns)
+        unknown = [c for c in columns if c not in info.columns]
+        if unknown:
+            raise ValueError(f"unknown columns: {', '.join(unknown)}")
+        return list(dict.fromkeys(columns))
+
+    @staticmethod
+    def keyset(info: TableInfo, cursor: str | None) -> list[Any] | None:
+        """Decode a page cursor and check it fits the table's key.
+
+        Tables without a primary key page by offset instead -- comparing
+        all their columns would skip rows with NULLs and repeated rows --
+        so their cursor is ``[offset]``.
+        """
+        if not cursor:
+            return None
+        after = decode_cursor(cursor)
+        if not info.primary_key:
+            if len(after) != 1 or not isinstance(after[0], int) or after[0] < 0:
+                raise ValueError("cursor does not match the table")
+        elif len(after) != len(info.primary_key):
+            raise ValueError("cursor does not match the table key")
+        return after
+
+    async def iter_batches(
+        self,
+        ref: str,
+        info: TableInfo,
+        columns: list[str],
+        after: list[Any] | None = None,
+        limit: int | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[list[tuple]]:
+        """Yield ``columns`` of the rows in primary-key order, ``batch_size``
+        row tuples at a time, starting after the ``after`` key.
+
+        Rows come off a server-side cursor, so memory is bounded by one batch
+        however large the table is. Tables without a primary key are ordered
+        by all of their columns and ``after`` is an offset (see :meth:`keyset`).
+        """
+        source = self.get(ref)
+        key = info.primary_key or info.columns
+        tbl = table(info.name, *(column(c) for c in info.columns), schema=info.schema)
+        stmt = select(*(tbl.c[c] for c in columns)).order_by(*(tbl.c[c] for c in key))
+        if after and not info.primary_key:
+            stmt = stmt.offset(after[0])
+        elif after:
+            if len(key) == 1:
+                stmt = stmt.where(tbl.c[key[0]] > after[0])
+            else:
+                stmt = stmt.where(tuple_(*(tbl.c[c] for c in key)) > tuple_(*after))
+        if limit:
+            stmt = stmt.limit(limit)
+
+        async with source.get_engine().connect() as conn:
+            result = await conn.stream(stmt.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                source.last_used = time.monotonic()
+                yield [tuple(row) for row in partition]
+
+    async def page(
+        self,
+        ref: str,
+        info: TableInfo,
+        cursor: str | None,
+        limit: int,
+        columns: list[str] | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """One keyset page plus the cursor for the next one (``None`` at the end)."""
+        after = self.keyset(info, cursor)
+        wanted = self.project(info, columns)
+        key = info.primary_key
+        selected = list(dict.fromkeys([*wanted, *key]))  # keys are needed for the cursor
+        rows = []
+        async for batch in self.iter_batches(ref, info, selected, after, limit + 1, limit + 1):
+            rows.extend(batch)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            if key:
+                last = dict(zip(selected, rows[-1]))
+                next_cursor = encode_cursor([last[c] for c in key])
+            else:
+                next_cursor = encode_cursor([(after[0] if after else 0) + limit])
+        width = len(wanted)
+        return [dict(zip(wanted, row[:width])) for row in rows], next_cursor
+
+    # ─── pool lifecycle ──────────────────────────────────────────────────────
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            try:
+                self._reaper = asyncio.get_running_loop().create_task(self._reap_forever())
+            except RuntimeError:  # no loop; the next async caller starts it
+                pass
+
+    async def _reap_forever(self) -> None:
+        interval = max(self.idle_seconds / 4, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def evict_idle(self) -> int:
+        now = time.monotonic()
+        idle = [
+            s for s in self._sources.values()
+            if s.engine is not None and now - s.last_used > self.idle_seconds and not s.checked_out()
+        ]
+        for source in idle:
+            await source.dispose()
+            logger.info(f"Closed idle pool for connection {source.info.name}")
+        return len(idle)
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._sources),
+            "open_pools": sum(1 for s in self._sources.values() if s.engine is not None),
+            "checked_out": sum(s.checked_out() for s in self._sources.values()),
+            "cached_tables": sum(len(s.schema.tables) for s in self._sources.values() if s.schema),
+        }
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for source in self._sources.values():
+            await source.dispose()
+
+
+explorer = ConnectionRegistry(
+    idle_seconds=settings.EXPLORER_IDLE_SECONDS,
+    schema_ttl=settings.EXPLORER_SCHEMA_TTL,
+    sqlite_dir=settings.EXPLORER_SQLITE_DIR,
+    allowed_hosts=settings.EXPLORER_ALLOWED_HOSTS,
+)
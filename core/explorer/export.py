@@ -0,0 +1,175 @@
+# core/explorer/export.py
+import io
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, AsyncIterator
+
+import orjson
+
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+NDJSON = "application/x-ndjson"
+
+_FORMATS = {
+    ARROW_STREAM: "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+    NDJSON: "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json": "json",
+    "*/*": "json",
+}
+
+
+def negotiate(accept: str | None) -> str:
+    """Pick ``"arrow"``, ``"ndjson"`` or ``"json"`` from an Accept header,
+    honouring q-values; unknown or missing headers get JSON."""
+    if not accept:
+        return "json"
+    choices = []
+    for position, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media.lower() in _FORMATS and q > 0:
+            choices.append((-q, position, _FORMATS[media.lower()]))
+    return min(choices)[2] if choices else "json"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)  # datetimes, decimals, UUIDs
+
+
+async def ndjson_stream(columns: list[str], batches: AsyncIterator[list[tuple]]) -> AsyncIterator[bytes]:
+    """A ``{"columns": [...]}`` header line, then one JSON array per row.
+
+    Rows are encoded as arrays rather than objects, so column names are not
+    repeated on every line, and each batch is written as one chunk.
+    """
+    def encode(value) -> bytes:
+        # datetimes passed through so they keep their str() form
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+    yield encode({"columns": columns}) + b"\n"
+    async for batch in batches:
+        if batch:
+            yield b"\n".join(encode(row) for row in batch) + b"\n"
+
+
+def _arrow_type(pa, sql_type: Any):
+    """The Arrow type for a reflected column type; string when there is no
+    exact match."""
+    try:
+        python_type = sql_type.python_type
+    except (AttributeError, NotImplementedError):
+        return pa.string()
+    if python_type is Decimal:
+        precision, scale = getattr(sql_type, "precision", None), getattr(sql_type, "scale", None)
+        if precision and precision <= 38:
+            return pa.decimal128(precision, scale or 0)
+        return pa.string()
+    if python_type is datetime:
+        return pa.timestamp("us", tz="UTC" if getattr(sql_type, "timezone", False) else None)
+    return {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        bytes: pa.binary(),
+        date: pa.date32(),
+        time: pa.time64("us"),
+    }.get(python_type, pa.string())
+
+
+def _convert(pa, values: tuple, arrow_type):
+    attempts = [
+        lambda: pa.array(values, type=arrow_type),
+        lambda: pa.array(values).cast(arrow_type),
+    ]
+    if pa.types.is_timestamp(arrow_type) and arrow_type.tz:
+        # zone-less text, as SQLite stores it: naive times here are UTC
+        attempts.append(lambda: pa.array(values).cast(pa.timestamp(arrow_type.unit)).cast(arrow_type))
+    for convert in attempts:
+        try:
+            return convert()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+            pass
+    return None
+
+
+def _to_arrow(pa, values: tuple, arrow_type) -> tuple[Any, int]:
+    """``values`` as an array of ``arrow_type`` and how many of them had to
+    be dropped (set to null) because they could not be converted.
+
+    Drivers don't always hand back the declared type -- SQLite returns its
+    DATETIMEs as text, and lets any column hold any value -- so values are
+    converted directly, then cast, then one by one.
+    """
+    if pa.types.is_string(arrow_type):
+        try:
+            return pa.array(values, type=arrow_type), 0
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.array([None if v is None else _json_default(v) for v in values], type=arrow_type), 0
+    array = _convert(pa, values, arrow_type)
+    if array is not None:
+        return array, 0
+    converted = [None if v is None else _convert(pa, (v,), arrow_type) for v in values]
+    dropped = sum(1 for v, c in zip(values, converted) if v is not None and c is None)
+    converted = [None if c is None else c[0].as_py() for c in converted]
+    return pa.array(converted, type=arrow_type), dropped
+
+
+async def arrow_stream(
+    columns: list[str],
+    batches: AsyncIterator[list[tuple]],
+    types: list[Any] | None = None,
+) -> AsyncIterator[bytes]:
+    """Arrow IPC stream: the schema, then one record batch per database batch.
+
+    The schema comes from the column ``types`` the table reports (reflected
+    SQLAlchemy types), so it is known before the first row and holds for
+    every batch; columns of unknown type are strings. Values are converted
+    column by column in Arrow's C++ code. The rare value that fits neither
+    its column's type nor a cast to it is sent as null and logged, rather
+    than ending the stream halfway.
+    """
+    import pyarrow as pa  # only needed by clients that ask for Arrow
+
+    types = types or [None] * len(columns)
+    schema = pa.schema([pa.field(name, _arrow_type(pa, t)) for name, t in zip(columns, types)])
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    dropped = dict.fromkeys(columns, 0)
+
+    def drain() -> bytes:
+        chunk = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return chunk
+
+    yield drain()
+    async for batch in batches:
+        if not batch:
+            continue
+        arrays = []
+        for name, field, values in zip(columns, schema, zip(*batch)):
+            array, lost = _to_arrow(pa, values, field.type)
+            arrays.append(array)
+            dropped[name] += lost
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield drain()
+
+    writer.close()
+    yield drain()
+    lost = {name: count for name, count in dropped.items() if count}
+    if lost:
+        logger.warning(f"Arrow export sent unconvertible values as null: {lost}")
@@ -0,0 +1,4 @@
+from .pipeline import APPROVED, PENDING, analyzer, approve, list_by_status
+from .scoring import score_batch
+
+__all__ = ["APPROVED", "PENDING", "analyzer", "approve", "list_by_status", "score_batch"]
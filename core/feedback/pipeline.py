@@ -0,0 +1,134 @@
+# core/feedback/pipeline.py
+import asyncio
+import itertools
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config.settings import settings
+from core.feedback.scoring import score_batch
+from core.utils.logger import get_logger
+from db.database import AsyncSessionLocal
+from db.models import FeedbackItem
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+APPROVED = "approved"
+
+
+async def list_by_status(
+    db: AsyncSession, status: str, after_id: int = 0, limit: int = 50
+) -> list[FeedbackItem]:
+    """Keyset page over ``(status, id)``, an index range scan, never a filter
+    over the whole table."""
+    stmt = (
+        select(FeedbackItem)
+        .where(FeedbackItem.status == status, FeedbackItem.id > after_id)
+        .order_by(FeedbackItem.id)
+        .limit(limit)
+    )
+    return list((await db.execute(stmt)).scalars())
+
+
+async def approve(db: AsyncSession, ids: list[int]) -> list[int]:
+    """Approve every pending item in ``ids`` with one UPDATE in one transaction.
+
+    Returns the ids that were actually approved; unknown or already approved
+    ids are left out.
+    """
+    if not ids:
+        return []
+    stmt = (
+        update(FeedbackItem)
+        .where(FeedbackItem.id.in_(ids), FeedbackItem.status == PENDING)
+        .values(status=APPROVED, approved_at=datetime.now(timezone.utc))
+        .returning(FeedbackItem.id)
+        .execution_options(synchronize_session=False)
+    )
+    approved = list((await db.execute(stmt)).scalars())
+    await db.commit()
+    return sorted(approved)
+
+
+class FeedbackAnalyzer:
+    """Background analysis of unscored pending feedback.
+
+    A job walks the pending items that have no sentiment yet in id order,
+    ``batch_size`` rows at a time. Each batch is scored in a thread in one
+    vectorized pass and written back with a single executemany UPDATE.
+    Only one job runs at a time; asking again while it runs returns it.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.jobs: dict[int, dict] = {}
+        self._ids = itertools.count(1)
+        self._current: asyncio.Task | None = None
+        self._current_id: int | None = None
+
+    def schedule(self) -> dict:
+        if self._current is not None and not self._current.done():
+            return self.jobs[self._current_id]
+        job_id = next(self._ids)
+        job = self.jobs[job_id] = {
+            "job_id": job_id,
+            "status": "queued",
+            "analyzed": 0,
+            "batches": 0,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+        }
+        # keep only the most recent jobs around
+        for old in sorted(self.jobs)[:-20]:
+            self.jobs.pop(old)
+        self._current_id = job_id
+        self._current = asyncio.create_task(self._run(job))
+        return job
+
+    async def _run(self, job: dict) -> None:
+        job["status"] = "running"
+        after_id = 0
+        try:
+            while True:
+                async with AsyncSessionLocal() as db:
+                    stmt = (
+                        select(FeedbackItem.id, FeedbackItem.message)
+                        .where(
+                            FeedbackItem.status == PENDING,
+                            FeedbackItem.sentiment.is_(None),
+                            FeedbackItem.id > after_id,
+                        )
+                        .order_by(FeedbackItem.id)
+                        .limit(self.batch_size)
+                    )
+                    rows = (await db.execute(stmt)).all()
+                    if not rows:
+                        break
+                    scored = await asyncio.to_thread(score_batch, [r.message for r in rows])
+                    now = datetime.now(timezone.utc)
+                    await db.execute(
+                        update(FeedbackItem),
+                        [{"id": r.id, **s, "analyzed_at": now} for r, s in zip(rows, scored)],
+                    )
+                    await db.commit()
+                after_id = rows[-1].id
+                job["analyzed"] += len(rows)
+                job["batches"] += 1
+            job["status"] = "done"
+        except Exception as exc:
+            logger.error(f"Feedback analysis job {job['job_id']} failed: {exc}")
+            job.update(status="failed", error=str(exc))
+        finally:
+            job["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    async def close(self) -> None:
+        if self._current is not None and not self._current.done():
+            self._current.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._current
+
+
+analyzer = FeedbackAnalyzer(settings.FEEDBACK_ANALYSIS_BATCH_SIZE)
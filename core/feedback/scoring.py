@@ -0,0 +1,98 @@
+# core/feedback/scoring.py
+import re
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# small hand-tuned lexicon; weights are in [-1, 1]
+_LEXICON = {
+    "love": 1.0, "great": 0.8, "awesome": 0.9, "excellent": 0.9, "good": 0.6,
+    "nice": 0.5, "helpful": 0.6, "fast": 0.4, "easy": 0.5, "thanks": 0.5,
+    "thank": 0.5, "works": 0.4, "clean": 0.4, "smooth": 0.5, "like": 0.3,
+    "bad": -0.6, "terrible": -0.9, "awful": -0.9, "hate": -1.0, "slow": -0.5,
+    "broken": -0.8, "bug": -0.5, "bugs": -0.5, "crash": -0.8, "crashes": -0.8,
+    "error": -0.5, "errors": -0.5, "confusing": -0.5, "hard": -0.3,
+    "fails": -0.6, "failed": -0.6, "annoying": -0.6, "useless": -0.8,
+}
+_NEGATIONS = {"not", "no", "never", "don't", "doesn't", "isn't", "can't", "won't"}
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has",
+    "have", "i", "if", "in", "into", "is", "it", "it's", "its", "me", "my", "of",
+    "on", "or", "so", "that", "the", "this", "to", "too", "very", "was", "we",
+    "were", "when", "with", "you", "your", "just", "really", "there", "they",
+} | _NEGATIONS
+
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+
+def _tokens(text: str) -> list[str]:
+    """Lower-cased tokens; a word right after a negation gets a ``not_`` prefix."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return [
+        f"not_{tok}" if i and tokens[i - 1] in _NEGATIONS else tok
+        for i, tok in enumerate(tokens)
+    ]
+
+
+def _weight(term: str) -> float:
+    if term.startswith("not_"):
+        return -0.5 * _LEXICON.get(term[4:], 0.0)
+    return _LEXICON.get(term, 0.0)
+
+
+def score_batch(texts: list[str], top_keywords: int = 5) -> list[dict]:
+    """Sentiment and keywords for a batch of texts in one pass.
+
+    The batch becomes a document × term count matrix; sentiment is a single
+    matrix-vector product against the lexicon weights and keywords are the
+    top TF-IDF terms, with document frequencies taken over the batch.
+
+    Returns one ``{"sentiment", "sentiment_score", "keywords"}`` dict per text.
+    """
+    if not texts:
+        return []
+    docs = [_tokens(text) for text in texts]
+    vocab: dict[str, int] = {}
+    rows = np.fromiter(
+        (i for i, doc in enumerate(docs) for _ in doc), dtype=np.int64
+    )
+    cols = np.fromiter(
+        (vocab.setdefault(tok, len(vocab)) for doc in docs for tok in doc), dtype=np.int64
+    )
+    terms = list(vocab)
+    counts = np.zeros((len(docs), max(len(terms), 1)), dtype=np.float32)
+    np.add.at(counts, (rows, cols), 1.0)
+
+    lengths = counts.sum(axis=1)
+    weights = np.array([_weight(t) for t in terms] or [0.0], dtype=np.float32)
+    scores = np.tanh((counts @ weights) / np.sqrt(np.maximum(lengths, 1.0)))
+
+    doc_freq = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(docs)) / (1 + doc_freq)) + 1.0
+    tfidf = counts / np.maximum(lengths, 1.0)[:, None] * idf
+    ignore = np.array(
+        [t in _STOPWORDS or t.startswith("not_") or len(t) < 3 for t in terms] or [True]
+    )
+    tfidf[:, ignore] = 0.0
+
+    k = min(top_keywords, tfidf.shape[1])
+    top = np.argpartition(-tfidf, k - 1, axis=1)[:, :k] if k else np.zeros((len(docs), 0), int)
+
+    results = []
+    for i, score in enumerate(scores.tolist()):
+        picked = sorted(top[i], key=lambda j: -tfidf[i, j])
+        keywords = [terms[j] for j in picked if tfidf[i, j] > 0]
+        if score >= POSITIVE_THRESHOLD:
+            label = "positive"
+        elif score <= NEGATIVE_THRESHOLD:
+            label = "negative"
+        else:
+            label = "neutral"
+        results.append({
+            "sentiment": label,
+            "sentiment_score": round(score, 4),
+            "keywords": keywords,
+        })
+    return results
@@ -0,0 +1,3 @@
+from .prober import DependencyStatus, HealthProber, prober
+
+__all__ = ["DependencyStatus", "HealthProber", "prober"]
@@ -0,0 +1,133 @@
+# core/health/prober.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from core.config.settings import settings
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Check = Callable[[], Awaitable[object]]
+
+
+@dataclass
+class DependencyStatus:
+    name: str
+    critical: bool
+    ok: bool | None = None  # None until the first probe finishes
+    latency_ms: float | None = None
+    error: str | None = None
+    checked_at: float | None = None  # wall clock
+    consecutive_failures: int = 0
+
+    def public(self) -> dict:
+        return {
+            "ok": self.ok,
+            "critical": self.critical,
+            "latency_ms": None if self.latency_ms is None else round(self.latency_ms, 3),
+            "error": self.error,
+            "checked_at": self.checked_at,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class HealthProber:
+    """Checks dependencies in the background so health probes never do I/O.
+
+    Every ``interval`` seconds all registered checks run concurrently, each
+    bounded by ``timeout``; results replace the stored statuses in one step.
+    Readiness means every critical dependency passed its latest check.
+    """
+
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self._checks: dict[str, Check] = {}
+        self.statuses: dict[str, DependencyStatus] = {}
+        self._task: asyncio.Task | None = None
+        self.started_at = time.time()
+
+    def register(self, name: str, check: Check, critical: bool = True) -> None:
+        self._checks[name] = check
+        self.statuses[name] = DependencyStatus(name, critical)
+
+    async def _run(self, name: str, check: Check) -> DependencyStatus:
+        previous = self.statuses[name]
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+            ok, error = True, None
+        except asyncio.TimeoutError:
+            ok, error = False, f"timed out after {self.timeout}s"
+        except Exception as exc:
+            ok, error = False, str(exc) or type(exc).__name__
+        if not ok and previous.ok is not False:
+            logger.warning(f"Health check {name} failing: {error}")
+        elif ok and previous.ok is False:
+            logger.info(f"Health check {name} recovered")
+        return DependencyStatus(
+            name,
+            previous.critical,
+            ok,
+            (time.perf_counter() - started) * 1000,
+            error,
+            time.time(),
+            0 if ok else previous.consecutive_failures + 1,
+        )
+
+    async def probe_once(self) -> None:
+        results = await asyncio.gather(*(self._run(n, c) for n, c in self._checks.items()))
+        self.statuses = {status.name: status for status in results}
+
+    async def _probe_forever(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._probe_forever())
+
+    @property
+    def ready(self) -> bool:
+        return all(s.ok for s in self.statuses.values() if s.critical)
+
+    def snapshot(self) -> dict:
+        return {name: status.public() for name, status in self.statuses.items()}
+
+    async def close(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+async def _check_database() -> None:
+    from sqlalchemy import text
+
+    from db.database import get_engine
+
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _check_redis() -> None:
+    from core.cache import redis_cache
+
+    client = redis_cache.redis  # read at call time; it is replaced on (re)connect
+    if client is None:
+        raise ConnectionError("not connected")
+    await client.ping()
+
+
+prober = HealthProber(
+    interval=settings.HEALTH_PROBE_INTERVAL,
+    timeout=settings.HEALTH_PROBE_TIMEOUT,
+)
+prober.register("database", _check_database)
+prober.register("redis", _check_redis, critical=False)  # we run without cache
@@ -0,0 +1,102 @@
+# core/memory/__init__.py
+import asyncio
+
+from core.config.settings import settings
+from core.memory.embedder import Embedder, HashingEmbedder, load_embedder
+from core.memory.index import IVFIndex
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_embedder: Embedder | None = None
+_index: IVFIndex | None = None
+
+
+def get_embedder() -> Embedder:
+    global _embedder
+    if _embedder is None:
+        _embedder = load_embedder(settings.MEMORY_EMBEDDER, settings.MEMORY_EMBEDDING_DIM)
+    return _embedder
+
+
+def set_embedder(embedder: Embedder) -> None:
+    """Swap the embedder (e.g. for a model-backed one). Closes the open index."""
+    global _embedder
+    close_memory_index()
+    _embedder = embedder
+
+
+def get_memory_index() -> IVFIndex:
+    global _index
+    if _index is None:
+        _index = IVFIndex(
+            settings.MEMORY_INDEX_DIR,
+            dim=get_embedder().dim,
+            nlist=settings.MEMORY_INDEX_NLIST,
+            nprobe=settings.MEMORY_INDEX_NPROBE,
+        )
+        logger.info(f"Memory index opened with {len(_index)} entries")
+    return _index
+
+
+def close_memory_index() -> None:
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
+
+
+def _remember(namespace: str, texts: list[str], metadata: dict | None) -> None:
+    vectors = get_embedder().embed(texts)
+    payloads = [{"text": text, **(metadata or {})} for text in texts]
+    index = get_memory_index()
+    index.add(vectors, payloads, namespace=namespace)
+    index.flush()
+
+
+def _recall(query: str, namespaces: list[str] | None, k: int) -> list[dict]:
+    vector = get_embedder().embed([query])[0]
+    hits = get_memory_index().search(vector, k=k, namespaces=namespaces)
+    return [{"score": round(score, 4), **payload} for score, payload in hits]
+
+
+async def remember(namespace: str, texts: list[str], metadata: dict | None = None) -> None:
+    """Embed ``texts`` and append them to the index under ``namespace``."""
+    await asyncio.to_thread(_remember, namespace, texts, metadata)
+
+
+async def recall(query: str, namespaces: list[str] | None = None, k: int = 5) -> list[dict]:
+    """Return the ``k`` stored entries closest to ``query``, best first."""
+    return await asyncio.to_thread(_recall, query, namespaces, k)
+
+
+LOGS_NAMESPACE = "logs"
+
+
+def user_namespace(user: int | str) -> str:
+    return f"user:{user}"
+
+
+async def agent_context(prompt: str, user_id: int | None = None, k: int = 5) -> list[dict]:
+    """Context for an agent prompt: the caller's memories plus saved logs."""
+    namespaces = [LOGS_NAMESPACE]
+    if user_id is not None:
+        namespaces.append(user_namespace(user_id))
+    hits = await recall(prompt, namespaces=namespaces, k=k)
+    return [hit for hit in hits if hit["score"] > 0]
+
+
+__all__ = [
+    "Embedder",
+    "HashingEmbedder",
+    "IVFIndex",
+    "LOGS_NAMESPACE",
+    "agent_context",
+    "close_memory_index",
+    "get_embedder",
+    "get_memory_index",
+    "recall",
+    "remember",
+    "set_embedder",
+    "user_namespace",
+]
@@ -0,0 +1,58 @@
+# core/memory/embedder.py
+import importlib
+import re
+import zlib
+from typing import Protocol, Sequence
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class Embedder(Protocol):
+    """Anything that turns a batch of texts into unit-length float32 rows."""
+
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+class HashingEmbedder:
+    """Local, dependency-free embedder based on signed feature hashing.
+
+    Unigrams and bigrams are hashed into ``dim`` buckets with a sign bit, so
+    texts that share vocabulary end up close under cosine similarity. It is
+    deterministic across processes, which keeps persisted indexes valid.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _embed_one(self, text: str, out: np.ndarray) -> None:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            h = zlib.crc32(feature.encode())
+            out[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(vectors, texts):
+            self._embed_one(text, row)
+        return normalize(vectors)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise rows in place (zero rows are left untouched)."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+
+def load_embedder(path: str, dim: int) -> Embedder:
+    """Instantiate an embedder from a ``module.Class`` dotted path."""
+    module_name, _, class_name = path.rpartition(".")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(dim=dim)
@@ -0,0 +1,285 @@
+# core/memory/index.py
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from core.memory.embedder import normalize
+
+_META = "meta.json"
+_VECTORS = "vectors.f32"
+_OWNERS = "owners.i32"
+_LISTS = "lists.i32"
+_CENTROIDS = "centroids.npy"
+_PAYLOADS = "payloads.jsonl"
+
+_MIN_CAPACITY = 1024
+_ASSIGN_CHUNK = 65536
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index over float32 rows.
+
+    Everything lives in one directory:
+
+    - ``meta.json``: dimension, row count, list count and namespace table
+    - ``vectors.f32``: row-major float32 matrix, memory-mapped
+    - ``owners.i32``: namespace id of every row
+    - ``lists.i32``: inverted list (centroid) of every row, -1 until trained
+    - ``centroids.npy``: the coarse quantiser
+    - ``payloads.jsonl``: one JSON document per row, in row order
+
+    Until ``train_size`` rows have been added the index answers queries with
+    an exact scan. Once it is large enough it clusters a sample into
+    ``nlist`` centroids and every query only scores the rows of the
+    ``nprobe`` closest lists. Each list keeps its own contiguous copy of its
+    rows in RAM so a probe is a handful of dense mat-vecs rather than a
+    scattered gather from the memory map. Rows are expected to be
+    L2-normalised, so the score is cosine similarity.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        dim: int,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        train_size: int | None = None,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+        meta = self._read_meta()
+        if meta and meta["dim"] != dim:
+            raise ValueError(
+                f"Index at {self.path} has dim={meta['dim']}, embedder produces dim={dim}"
+            )
+        self.dim = dim
+        self.nlist = meta["nlist"] if meta else nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or self.nlist * 32
+        self.count = meta["count"] if meta else 0
+        self._namespaces: dict[str, int] = meta["namespaces"] if meta else {}
+
+        existing = self.path / _VECTORS
+        on_disk = existing.stat().st_size // (4 * dim) if existing.exists() else 0
+        self._open_arrays(max(on_disk, self.count, _MIN_CAPACITY))
+        self._payloads = self._read_payloads()
+        self._payload_file = open(self.path / _PAYLOADS, "a", encoding="utf-8")
+
+        self._centroids: np.ndarray | None = None
+        self._lists: list[np.ndarray] = []
+        self._list_vectors: list[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+        if (self.path / _CENTROIDS).exists():
+            self._centroids = np.load(self.path / _CENTROIDS)
+            self._rebuild_lists()
+
+    # ─── Persistence ──────────────────────────────────────────────────────────
+
+    def _read_meta(self) -> dict | None:
+        try:
+            return json.loads((self.path / _META).read_text())
+        except FileNotFoundError:
+            return None
+
+    def _read_payloads(self) -> list[dict]:
+        file = self.path / _PAYLOADS
+        if not file.exists():
+            return []
+        with open(file, encoding="utf-8") as fh:
+            lines = fh.readlines()
+        if len(lines) != self.count:
+            # rows past the last flushed count were never committed
+            lines = lines[: self.count]
+            with open(file, "w", encoding="utf-8") as fh:
+                fh.writelines(lines)
+        return [json.loads(line) for line in lines]
+
+    def _map(self, name: str, dtype, shape: tuple) -> np.memmap:
+        file = self.path / name
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(file, "ab") as fh:
+            if os.path.getsize(file) < nbytes:
+                fh.truncate(nbytes)
+        return np.memmap(file, dtype=dtype, mode="r+", shape=shape)
+
+    def _open_arrays(self, capacity: int) -> None:
+        self._vectors = self._map(_VECTORS, np.float32, (capacity, self.dim))
+        self._owners = self._map(_OWNERS, np.int32, (capacity,))
+        self._assign = self._map(_LISTS, np.int32, (capacity,))
+        self._capacity = capacity
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= self._capacity:
+            return
+        self._flush_arrays()
+        del self._vectors, self._owners, self._assign
+        self._open_arrays(max(rows, self._capacity * 2))
+
+    def _flush_arrays(self) -> None:
+        self._vectors.flush()
+        self._owners.flush()
+        self._assign.flush()
+
+    def flush(self) -> None:
+        """Make every row added so far durable."""
+        with self._lock:
+            self._flush_arrays()
+            self._payload_file.flush()
+            meta = {
+                "dim": self.dim,
+                "count": self.count,
+                "nlist": self.nlist,
+                "namespaces": self._namespaces,
+            }
+            tmp = self.path / f"{_META}.tmp"
+            tmp.write_text(json.dumps(meta))
+            os.replace(tmp, self.path / _META)
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._payload_file.close()
+
+    # ─── Inverted lists ───────────────────────────────────────────────────────
+
+    def _nearest_lists(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _rebuild_lists(self) -> None:
+        assign = np.asarray(self._assign[: self.count])
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(self.nlist + 1))
+        self._lists = [order[bounds[c] : bounds[c + 1]] for c in range(self.nlist)]
+        self._list_vectors = [np.asarray(self._vectors[ids]) for ids in self._lists]
+        self._list_sizes = np.diff(bounds).astype(np.int64)
+
+    def _append_to_lists(
+        self, ids: np.ndarray, lists: np.ndarray, vectors: np.ndarray
+    ) -> None:
+        for c in np.unique(lists):
+            member = lists == c
+            size = self._list_sizes[c]
+            needed = size + int(member.sum())
+            if needed > len(self._lists[c]):
+                capacity = max(needed, 2 * len(self._lists[c]), 16)
+                grown_ids = np.empty(capacity, dtype=np.int64)
+                grown_ids[:size] = self._lists[c][:size]
+                grown_vectors = np.empty((capacity, self.dim), dtype=np.float32)
+                grown_vectors[:size] = self._list_vectors[c][:size]
+                self._lists[c], self._list_vectors[c] = grown_ids, grown_vectors
+            self._lists[c][size:needed] = ids[member]
+            self._list_vectors[c][size:needed] = vectors[member]
+            self._list_sizes[c] = needed
+
+    def train(self, iterations: int = 10, seed: int = 0) -> None:
+        """Cluster a sample of the stored rows and rebuild every inverted list.
+
+        Called automatically once ``train_size`` rows exist; call it again
+        after heavy growth to rebalance the lists.
+        """
+        with self._lock:
+            if self.count == 0:
+                return
+            rng = np.random.default_rng(seed)
+            nlist = min(self.nlist, self.count)
+            sample_ids = np.sort(
+                rng.choice(self.count, min(self.count, nlist * 16), replace=False)
+            )
+            sample = np.asarray(self._vectors[sample_ids])
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                empty = np.bincount(labels, minlength=nlist) == 0
+                sums[empty] = centroids[empty]
+                centroids = normalize(sums)
+
+            self.nlist = nlist
+            self._centroids = centroids
+            np.save(self.path / _CENTROIDS, centroids)
+            for start in range(0, self.count, _ASSIGN_CHUNK):
+                end = min(start + _ASSIGN_CHUNK, self.count)
+                self._assign[start:end] = self._nearest_lists(
+                    np.asarray(self._vectors[start:end])
+                )
+            self._rebuild_lists()
+            self.flush()
+
+    # ─── Public API ───────────────────────────────────────────────────────────
+
+    def add(
+        self,
+        vectors: np.ndarray,
+        payloads: Sequence[dict],
+        namespace: str = "default",
+    ) -> range:
+        """Append rows and return their ids."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(vectors) != len(payloads):
+            raise ValueError("vectors and payloads must have the same length")
+        with self._lock:
+            start, end = self.count, self.count + len(vectors)
+            self._reserve(end)
+            self._vectors[start:end] = vectors
+            owner = self._namespaces.setdefault(namespace, len(self._namespaces))
+            self._owners[start:end] = owner
+            if self._centroids is not None:
+                lists = self._nearest_lists(vectors)
+                self._assign[start:end] = lists
+                self._append_to_lists(np.arange(start, end), lists, vectors)
+            else:
+                self._assign[start:end] = -1
+            for payload in payloads:
+                self._payload_file.write(json.dumps(payload) + "\n")
+            self._payloads.extend(payloads)
+            self.count = end
+            if self._centroids is None and self.count >= self.train_size:
+                self.train()
+            return range(start, end)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 5,
+        namespaces: Iterable[str] | None = None,
+    ) -> list[tuple[float, dict]]:
+        """Return up to ``k`` ``(score, payload)`` pairs, best first."""
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            if self.count == 0:
+                return []
+            if namespaces is not None:
+                owners = [self._namespaces[n] for n in namespaces if n in self._namespaces]
+                if not owners:
+                    return []
+
+            if self._centroids is None:
+                ids = np.arange(self.count)
+                scores = self._vectors[: self.count] @ query
+            else:
+                nprobe = min(self.nprobe, self.nlist)
+                probe = np.argpartition(self._centroids @ query, -nprobe)[-nprobe:]
+                ids = np.concatenate([self._lists[c][: self._list_sizes[c]] for c in probe])
+                scores = np.concatenate([
+                    self._list_vectors[c][: self._list_sizes[c]] @ query for c in probe
+                ])
+            if namespaces is not None:
+                keep = np.isin(self._owners[ids], owners)
+                ids, scores = ids[keep], scores[keep]
+
+            k = min(k, len(scores))
+            if k == 0:
+                return []
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[t]), self._payloads[ids[t]]) for t in top]
+
+    def __len__(self) -> int:
+        return self.count
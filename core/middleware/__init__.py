@@ -0,0 +1,12 @@
+from .compression import CompressionMiddleware
+from .conditional import CachePolicy, ConditionalGetMiddleware
+from .rate_limit import RateLimit, RateLimitMiddleware, RateLimiter
+
+__all__ = [
+    "CachePolicy",
+    "CompressionMiddleware",
+    "ConditionalGetMiddleware",
+    "RateLimit",
+    "RateLimitMiddleware",
+    "RateLimiter",
+]
@@ -0,0 +1,228 @@
+# core/middleware/compression.py
+"""Content-negotiated response compression: zstd and brotli when their
+packages are installed, gzip always."""
+import asyncio
+import gzip
+import zlib
+from dataclasses import dataclass
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from core.config.settings import settings
+
+_COMPRESSIBLE = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/pdf",
+    "application/vnd.apache.arrow.stream",
+    "image/svg+xml",
+)
+
+
+def compressible(content_type: str | None) -> bool:
+    return bool(content_type) and content_type.lower().startswith(_COMPRESSIBLE)
+
+
+@dataclass(frozen=True)
+class Codec:
+    """One content coding.
+
+    ``compress`` encodes a whole body; ``stream`` returns a
+    ``(chunk, finish)`` pair for a body sent in pieces, where ``chunk``
+    flushes after every piece so the client can decode it right away.
+    """
+
+    name: str
+    compress: Callable[[bytes], bytes]
+    stream: Callable[[], tuple[Callable[[bytes], bytes], Callable[[], bytes]]]
+
+
+def _gzip(level: int) -> Codec:
+    def stream():
+        encoder = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+        return (
+            lambda data: encoder.compress(data) + encoder.flush(zlib.Z_SYNC_FLUSH),
+            encoder.flush,
+        )
+    return Codec("gzip", lambda data: gzip.compress(data, level, mtime=0), stream)
+
+
+def _brotli(quality: int) -> Codec | None:
+    try:
+        import brotli
+    except ImportError:
+        try:
+            import brotlicffi as brotli
+        except ImportError:
+            return None
+
+    def stream():
+        encoder = brotli.Compressor(quality=quality)
+        return lambda data: encoder.process(data) + encoder.flush(), encoder.finish
+    return Codec("br", lambda data: brotli.compress(data, quality=quality), stream)
+
+
+def _zstd(level: int) -> Codec | None:
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    compressor = zstandard.ZstdCompressor(level=level)
+
+    def stream():
+        encoder = compressor.compressobj()
+        return (
+            lambda data: encoder.compress(data) + encoder.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            encoder.flush,
+        )
+    return Codec("zstd", compressor.compress, stream)
+
+
+def available_codecs(fast: bool = True) -> list[Codec]:
+    """Installed codecs, most preferred first.
+
+    Parameters
+    ----------
+    fast: bool
+        Levels for compressing on every response; ``False`` gives the
+        smallest output, for bodies compressed once and served many times.
+    """
+    codecs = [
+        _zstd(3 if fast else 19),
+        _brotli(4 if fast else 11),
+        _gzip(6 if fast else 9),
+    ]
+    return [codec for codec in codecs if codec is not None]
+
+
+def negotiate(accept_encoding: str | None, codecs: list[Codec]) -> Codec | None:
+    """The codec to use for an Accept-Encoding header, honouring q-values
+    and, between equal q-values, the order of ``codecs``; ``None`` for
+    identity."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.lower()] = q
+    choices = [
+        (-weights.get(codec.name, weights.get("*", 0.0)), position, codec)
+        for position, codec in enumerate(codecs)
+    ]
+    best = min(choices, default=None, key=lambda choice: choice[:2])
+    return best[2] if best is not None and best[0] < 0 else None
+
+
+class CompressionMiddleware:
+    """Compress responses for clients that accept it.
+
+    Bodies under ``minimum_size`` and content that is already compressed
+    (images, archives, anything with a Content-Encoding) go out as they
+    are. Streaming responses are compressed chunk by chunk. Bodies or
+    chunks of ``offload_size`` bytes or more are compressed in a worker
+    thread, so a large export does not stall the event loop.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int | None = None,
+        offload_size: int | None = None,
+        codecs: list[Codec] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.offload_size = settings.COMPRESSION_OFFLOAD_SIZE if offload_size is None else offload_size
+        self.codecs = available_codecs() if codecs is None else codecs
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codec = negotiate(Headers(scope=scope).get("accept-encoding"), self.codecs)
+        await self.app(scope, receive, _Responder(self, codec, send).send)
+
+    async def run(self, encode: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= self.offload_size:
+            return await asyncio.to_thread(encode, data)
+        return encode(data)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, codec: Codec | None, send):
+        self.middleware = middleware
+        self.codec = codec
+        self._send = send
+        self.start = None
+        self.chunk = self.finish = None
+
+    async def send(self, message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            self.start = message  # held until the first body chunk shows the size
+            return
+        if kind != "http.response.body":
+            await self._send(message)
+            return
+        if self.start is not None:
+            await self._first(message)
+            return
+        if self.chunk is None:
+            await self._send(message)
+            return
+        more = message.get("more_body", False)
+        data = await self.middleware.run(self.chunk, message.get("body", b""))
+        if not more:
+            data += self.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more})
+
+    async def _first(self, message) -> None:
+        start, self.start = self.start, None
+        start["headers"] = list(start.get("headers", []))
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+
+        if (
+            start["status"] < 200
+            or start["status"] in (204, 304)
+            or "content-encoding" in headers
+            or not compressible(headers.get("content-type"))
+        ):
+            await self._send(start)
+            await self._send(message)
+            return
+        headers.add_vary_header("Accept-Encoding")
+        if self.codec is None or (not more and len(body) < self.middleware.minimum_size):
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.codec.name
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):  # no longer the same bytes
+            headers["ETag"] = f"W/{etag}"
+        if not more:
+            body = await self.middleware.run(self.codec.compress, body)
+            headers["Content-Length"] = str(len(body))
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        del headers["Content-Length"]
+        self.chunk, self.finish = self.codec.stream()
+        await self._send(start)
+        data = await self.middleware.run(self.chunk, body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": True})
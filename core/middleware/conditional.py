@@ -0,0 +1,109 @@
+# core/middleware/conditional.py
+import re
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers
+
+from core.cache.versions import ResourceVersions, versions as default_versions
+from core.config.settings import settings
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """ETag and caching rules for one route.
+
+    ``resource`` names the version the ETag is built from and may use the
+    route's path parameters (``"user:{user_id}"``). ``ttl`` retires the
+    version after that many seconds even without a write.
+    """
+
+    resource: str
+    cache_control: str = "no-cache"
+    ttl: int = 0
+
+
+def _compile(template: str) -> re.Pattern:
+    pattern = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(template))
+    return re.compile(f"^{pattern}$")
+
+
+def _parse_policies(raw: dict[str, dict]) -> list[tuple[re.Pattern, CachePolicy]]:
+    policies = [(path, CachePolicy(**policy)) for path, policy in raw.items()]
+    # the first reader of an expired version sets its ttl for everyone, so
+    # routes sharing a resource would otherwise get each other's expiry
+    ttls: dict[str, tuple[str, int]] = {}
+    for path, policy in policies:
+        other, ttl = ttls.setdefault(policy.resource, (path, policy.ttl))
+        if ttl != policy.ttl:
+            raise ValueError(
+                f"{path} and {other} share resource {policy.resource!r} with different ttls"
+            )
+    return [(_compile(path), policy) for path, policy in policies]
+
+
+class ConditionalGetMiddleware:
+    """ETags from tracked versions, and 304s before routing.
+
+    For a GET or HEAD on a route with a policy, the resource's version is
+    looked up first: when ``If-None-Match`` already carries it the answer
+    is a 304 and the route never runs -- no router import, no session, no
+    query, no body. Otherwise the response gets the ETag and the route's
+    Cache-Control. The version is read before the handler runs, so a
+    concurrent write can only make the ETag older than the body, which
+    costs a 200 later rather than serving stale data.
+    """
+
+    def __init__(
+        self,
+        app,
+        policies: dict[str, dict] | None = None,
+        versions: ResourceVersions | None = None,
+    ):
+        self.app = app
+        self.policies = _parse_policies(settings.CONDITIONAL_GET if policies is None else policies)
+        self.versions = versions or default_versions
+
+    def _policy(self, path: str) -> tuple[CachePolicy, dict] | None:
+        for pattern, policy in self.policies:
+            match = pattern.match(path)
+            if match:
+                return policy, match.groupdict()
+        return None
+
+    async def __call__(self, scope, receive, send):
+        found = (
+            self._policy(scope["path"])
+            if scope["type"] == "http" and scope["method"] in ("GET", "HEAD")
+            else None
+        )
+        if found is None:
+            await self.app(scope, receive, send)
+            return
+
+        policy, params = found
+        resource = policy.resource.format(**params)
+        version = await self.versions.get(resource, policy.ttl)
+        if version is None:  # versions unavailable: plain responses
+            await self.app(scope, receive, send)
+            return
+
+        etag = f'W/"{resource}.{version}"'
+        headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", policy.cache_control.encode()),
+        ]
+        if etag in Headers(scope=scope).get("if-none-match", ""):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                present = {name.lower() for name, _ in message.get("headers", [])}
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *(header for header in headers if header[0] not in present),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,173 @@
+# core/middleware/rate_limit.py
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Literal
+
+from core.cache import redis_cache
+from core.config.settings import settings
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# GCRA in one round trip. KEYS[1]: theoretical arrival time (ms).
+# ARGV: emission interval (ms), burst tolerance (ms). Uses the server clock
+# so every API worker agrees on "now".
+# Returns {allowed, remaining, retry_after_ms}.
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if now < allow_at then
+  return {0, 0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / interval), 0}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``rate`` requests per ``per`` seconds, allowing ``burst`` at once."""
+
+    rate: int
+    per: float
+    burst: int = 1
+    by: Literal["ip", "user"] = "ip"
+
+    @property
+    def interval_ms(self) -> float:
+        return self.per * 1000 / self.rate
+
+    @property
+    def tolerance_ms(self) -> float:
+        return self.interval_ms * self.burst
+
+
+class _LocalGCRA:
+    """Per-process GCRA used while Redis is down. Each worker enforces the
+    limit on its own, so the effective limit is multiplied by the worker
+    count; close enough to keep a single client from saturating us."""
+
+    def __init__(self, max_keys: int = 50_000):
+        self.tats: dict[str, float] = {}
+        self.max_keys = max_keys
+
+    def hit(self, key: str, interval: float, tolerance: float) -> tuple[bool, int, float]:
+        now = time.monotonic() * 1000
+        if len(self.tats) >= self.max_keys:
+            self.tats = {k: tat for k, tat in self.tats.items() if tat > now}
+        tat = max(self.tats.get(key, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - tolerance
+        if now < allow_at:
+            return False, 0, allow_at - now
+        self.tats[key] = new_tat
+        return True, int((now - allow_at) // interval), 0.0
+
+
+class RateLimiter:
+    def __init__(self):
+        self._local = _LocalGCRA()
+        self._client = None
+        self._script = None
+
+    async def hit(self, key: str, limit: RateLimit) -> tuple[bool, int, float]:
+        """Record one request; returns ``(allowed, remaining, retry_after_ms)``."""
+        client = redis_cache.redis
+        if client is not None:
+            if client is not self._client:
+                self._client = client
+                self._script = client.register_script(_GCRA_LUA)
+            try:
+                allowed, remaining, retry_ms = await self._script(
+                    keys=[key], args=[limit.interval_ms, limit.tolerance_ms]
+                )
+                return bool(int(allowed)), int(remaining), float(retry_ms)
+            except Exception as exc:
+                logger.warning(f"Redis rate limiting unavailable, limiting locally: {exc}")
+        return self._local.hit(key, limit.interval_ms, limit.tolerance_ms)
+
+
+def _parse_policies(raw: dict[str, dict]) -> dict[str, RateLimit]:
+    return {path: RateLimit(**policy) for path, policy in raw.items()}
+
+
+def _client_ip(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_id(scope) -> str | None:
+    """User id from the bearer token. Only the signature is checked, which
+    is all the limiter needs and costs no database access."""
+    from jose import JWTError, jwt  # only user-keyed policies need it
+
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                return str(jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])["sub"])
+            except (JWTError, KeyError):
+                return None
+    return None
+
+
+class RateLimitMiddleware:
+    """Throttle expensive endpoints before routing.
+
+    Policies are looked up by exact path and identify callers either by
+    client IP or by the authenticated user (falling back to IP for
+    anonymous callers). Rejections are 429 responses produced here, so an
+    over-limit request never reaches a dependency, the database or bcrypt.
+    """
+
+    def __init__(self, app, policies: dict[str, dict] | None = None, limiter: RateLimiter | None = None):
+        self.app = app
+        self.policies = _parse_policies(settings.RATE_LIMITS if policies is None else policies)
+        self.limiter = limiter or RateLimiter()
+
+    async def __call__(self, scope, receive, send):
+        limit = self.policies.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        user = _user_id(scope) if limit.by == "user" else None
+        identity = f"user:{user}" if user else f"ip:{_client_ip(scope)}"
+        allowed, remaining, retry_ms = await self.limiter.hit(
+            f"ratelimit:{scope['path']}:{identity}", limit
+        )
+        headers = [
+            (b"x-ratelimit-limit", str(limit.burst).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+        ]
+        if not allowed:
+            body = json.dumps({"detail": "Too many requests"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(retry_ms / 1000)).encode()),
+                    *headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
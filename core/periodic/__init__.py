@@ -0,0 +1,4 @@
+from .lease import FileLease, RedisLease
+from .scheduler import PeriodicScheduler, PeriodicTask, TaskStats, scheduler
+
+__all__ = ["FileLease", "PeriodicScheduler", "PeriodicTask", "RedisLease", "TaskStats", "scheduler"]
@@ -0,0 +1,186 @@
+# core/periodic/lease.py
+"""Leader leases for periodic tasks that must run on one worker.
+
+A lease elects the worker that runs global tasks, and carries what those
+tasks produce to the other workers: the leader :meth:`publish`\\ es each
+result under the task's name and followers read the :meth:`latest` one.
+``RedisLease`` works across hosts. ``FileLease`` is the single-host stand-in
+for running without Redis: an ``flock`` the OS drops when its holder exits,
+and result files next to it. A ``RedisLease`` falls back to one while Redis
+is unreachable, so each host keeps a leader rather than none.
+"""
+import os
+import secrets
+import socket
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# KEYS[1]: lease key. ARGV: owner, ttl in ms.
+# Renews the lease for its owner or takes a free one; 1 when held after.
+_HOLD_LUA = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+  return 1
+end
+if not owner then
+  redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+  return 1
+end
+return 0
+"""
+
+# KEYS[1]: lease key. ARGV[1]: owner. Frees the lease only for its owner.
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _encode(value: Any) -> bytes:
+    # the stamp tells followers a result apart from the one they delivered
+    return orjson.dumps({"stamp": time.time_ns(), "value": value})
+
+
+def _decode(raw: str | bytes | None) -> tuple[int, Any] | None:
+    if not raw:
+        return None
+    record = orjson.loads(raw)
+    return record["stamp"], record["value"]
+
+
+class RedisLease:
+    """Lease held as a Redis key with an expiry, renewed by its owner.
+
+    While Redis is unreachable the ``fallback`` lease is used instead, for
+    election and results alike; the first renewal that reaches Redis again
+    drops it. Workers on different hosts may then each lead for a while,
+    which beats none of them leading.
+    """
+
+    def __init__(self, name: str, ttl: float, fallback: "FileLease | None" = None):
+        self.key = f"lease:{name}"
+        self.ttl_ms = int(ttl * 1000)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self.fallback = fallback
+        self.degraded = False
+        self._client = None
+        self._hold = self._release = None
+
+    @property
+    def kind(self) -> str:
+        return "file" if self.degraded else "redis"
+
+    def _redis(self):
+        from core.cache import redis_cache  # main imports this module; redis waits for first use
+
+        client = redis_cache.redis
+        if client is not None and client is not self._client:
+            self._client = client
+            self._hold = client.register_script(_HOLD_LUA)
+            self._release = client.register_script(_RELEASE_LUA)
+        return client
+
+    async def hold(self) -> bool:
+        """Take or renew the lease; ``False`` when another worker has it, or
+        when Redis is unreachable and there is no fallback."""
+        if self._redis() is not None:
+            try:
+                held = bool(await self._hold(keys=[self.key], args=[self.owner, self.ttl_ms]))
+            except Exception as exc:
+                logger.warning(f"Could not renew lease {self.key}: {exc}")
+            else:
+                if self.degraded:
+                    logger.info(f"Redis is back; lease {self.key} leaves its fallback")
+                    self.degraded = False
+                    await self.fallback.release()
+                return held
+        if self.fallback is None:
+            return False
+        if not self.degraded:
+            logger.warning(f"Redis unavailable; lease {self.key} falls back to {self.fallback.path}")
+            self.degraded = True
+        return await self.fallback.hold()
+
+    async def release(self) -> None:
+        if self.fallback is not None:
+            await self.fallback.release()
+        if self._redis() is None:
+            return
+        try:
+            await self._release(keys=[self.key], args=[self.owner])
+        except Exception as exc:
+            logger.warning(f"Could not release lease {self.key}: {exc}")
+
+    async def publish(self, name: str, value: Any, ttl: float) -> None:
+        if self.degraded:
+            return await self.fallback.publish(name, value, ttl)
+        client = self._redis()
+        if client is not None:
+            await client.set(f"{self.key}:{name}", _encode(value), px=int(ttl * 1000))
+
+    async def latest(self, name: str) -> tuple[int, Any] | None:
+        if self.degraded:
+            return await self.fallback.latest(name)
+        client = self._redis()
+        return None if client is None else _decode(await client.get(f"{self.key}:{name}"))
+
+
+class FileLease:
+    """Lease held as an exclusive ``flock`` on a file in ``directory``.
+
+    Only workers on one host share it. Results are small files replaced
+    atomically; they are read and written inline, being a few hundred bytes
+    on local disk.
+    """
+
+    kind = "file"
+
+    def __init__(self, name: str, directory: str | Path):
+        self.directory = Path(directory)
+        self.path = self.directory / f"{name}.lock"
+        self._fd: int | None = None
+
+    async def hold(self) -> bool:
+        if self._fd is not None:
+            return True
+        import fcntl
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    async def release(self) -> None:
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            os.close(fd)  # drops the lock
+
+    def _result(self, name: str) -> Path:
+        return self.directory / f"{self.path.stem}.{name}.json"
+
+    async def publish(self, name: str, value: Any, ttl: float) -> None:
+        path = self._result(name)
+        staging = path.with_suffix(f".{os.getpid()}.tmp")
+        staging.write_bytes(_encode(value))
+        os.replace(staging, path)
+
+    async def latest(self, name: str) -> tuple[int, Any] | None:
+        try:
+            return _decode(self._result(name).read_bytes())
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,207 @@
+# core/periodic/scheduler.py
+import asyncio
+import random
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from core.config.settings import settings
+from core.periodic.lease import FileLease, RedisLease
+from core.utils import backoff
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PeriodicTask:
+    """Something to run every ``interval`` seconds.
+
+    ``run`` does the work. With ``leader_only`` it runs on the elected
+    worker alone, and its result is handed to ``deliver`` on every worker
+    -- sampling happens once, broadcasting to each worker's own clients
+    happens everywhere. Results of leader-only tasks must be JSON-encodable.
+    """
+
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    interval: float
+    deliver: Callable[[Any], Awaitable[None]] | None = None
+    leader_only: bool = False
+    jitter: float = 0.1  # fraction of the interval each delay may vary by
+    timeout: float | None = None
+
+
+@dataclass
+class TaskStats:
+    runs: int = 0
+    failures: int = 0
+    restarts: int = 0
+    deliveries: int = 0
+    last_ms: float | None = None
+    max_ms: float = 0.0
+    total_ms: float = 0.0
+    last_error: str | None = None
+    last_run_at: float | None = None  # wall clock
+    _seen: int | None = field(default=None, repr=False)  # stamp last delivered
+
+    def public(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "deliveries": self.deliveries,
+            "last_ms": None if self.last_ms is None else round(self.last_ms, 3),
+            "avg_ms": round(self.total_ms / self.runs, 3) if self.runs else None,
+            "max_ms": round(self.max_ms, 3),
+            "last_error": self.last_error,
+            "last_run_at": self.last_run_at,
+        }
+
+
+class PeriodicScheduler:
+    """Runs periodic tasks under supervision.
+
+    Every task gets its own loop. A failed run is counted and the loop goes
+    on; a loop that crashes is restarted after a backoff. Delays carry
+    jitter, and the first run waits a random part of the interval, so
+    workers started together don't tick together.
+
+    Leader-only tasks run on whichever worker holds the lease. The holder
+    renews it every third of ``lease_ttl``; if it stops (crash, hang) the
+    lease expires and another worker takes over. The backend comes from
+    ``SCHEDULER_LEASE``; a Redis lease falls back to a lock file while Redis
+    is down. Followers pick the leader's results up on their own ticks.
+    """
+
+    def __init__(self, lease_ttl: float | None = None, lease=None):
+        self.lease_ttl = lease_ttl or settings.SCHEDULER_LEASE_TTL
+        self.lease = lease
+        self.leader = False
+        self.tasks: dict[str, PeriodicTask] = {}
+        self.task_stats: dict[str, TaskStats] = {}
+        self._running: list[asyncio.Task] = []
+
+    def add(self, task: PeriodicTask) -> None:
+        self.tasks[task.name] = task
+        self.task_stats[task.name] = TaskStats()
+
+    def start(self) -> None:
+        if self._running:
+            return
+        if self.lease is None:
+            self.lease = self._configured_lease()
+            logger.info(f"Periodic tasks elect a leader through a {settings.SCHEDULER_LEASE} lease")
+        if any(task.leader_only for task in self.tasks.values()):
+            self._running.append(asyncio.create_task(self._supervise("election", self._campaign)))
+        for task in self.tasks.values():
+            self._running.append(
+                asyncio.create_task(self._supervise(task.name, lambda task=task: self._loop(task)))
+            )
+
+    def _configured_lease(self):
+        # from config, not from whether Redis is up right now: workers that
+        # disagreed on the backend could both lead
+        local = FileLease("periodic", settings.SCHEDULER_LOCK_DIR)
+        if settings.SCHEDULER_LEASE == "redis":
+            return RedisLease("periodic", self.lease_ttl, fallback=local)
+        if settings.SCHEDULER_LEASE == "file":
+            return local
+        raise ValueError(f"unknown SCHEDULER_LEASE {settings.SCHEDULER_LEASE!r}")
+
+    async def _supervise(self, name: str, loop: Callable[[], Awaitable[None]]) -> None:
+        delays = backoff.forever(1.0, 30.0)
+        while True:
+            started = time.monotonic()
+            try:
+                await loop()
+                return
+            except Exception as exc:
+                if time.monotonic() - started > 60:  # ran fine for a while
+                    delays = backoff.forever(1.0, 30.0)
+                if name in self.task_stats:
+                    self.task_stats[name].restarts += 1
+                logger.exception(f"Periodic loop {name} crashed, restarting: {exc}")
+            await asyncio.sleep(next(delays))
+
+    async def _campaign(self) -> None:
+        while True:
+            leader = await self.lease.hold()
+            if leader != self.leader:
+                logger.info(f"{'Elected' if leader else 'No longer'} leader for periodic tasks")
+                self.leader = leader
+            await asyncio.sleep(self.lease_ttl / 3)
+
+    @staticmethod
+    def _delay(task: PeriodicTask) -> float:
+        return task.interval * random.uniform(1 - task.jitter, 1 + task.jitter)
+
+    async def _loop(self, task: PeriodicTask) -> None:
+        stats = self.task_stats[task.name]
+        await asyncio.sleep(random.uniform(0, task.interval))
+        while True:
+            if not task.leader_only or self.leader:
+                await self._run(task, stats)
+            elif task.deliver is not None:
+                await self._follow(task, stats)
+            await asyncio.sleep(self._delay(task))
+
+    async def _run(self, task: PeriodicTask, stats: TaskStats) -> None:
+        started = time.perf_counter()
+        stats.last_run_at = time.time()
+        try:
+            result = await asyncio.wait_for(task.run(), task.timeout)
+        except Exception as exc:
+            stats.failures += 1
+            stats.last_error = str(exc) or type(exc).__name__
+            logger.warning(f"Periodic task {task.name} failed: {stats.last_error}")
+            return
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            stats.runs += 1
+            stats.last_ms = elapsed
+            stats.max_ms = max(stats.max_ms, elapsed)
+            stats.total_ms += elapsed
+        if task.leader_only:
+            # outlives a missed tick or two, not a dead leader
+            await self.lease.publish(task.name, result, ttl=max(task.interval * 3, self.lease_ttl))
+        if task.deliver is not None:
+            await task.deliver(result)
+            stats.deliveries += 1
+
+    async def _follow(self, task: PeriodicTask, stats: TaskStats) -> None:
+        latest = await self.lease.latest(task.name)
+        if latest is None or latest[0] == stats._seen:
+            return
+        stats._seen = latest[0]
+        await task.deliver(latest[1])
+        stats.deliveries += 1
+
+    async def close(self) -> None:
+        running, self._running = self._running, []
+        for task in running:
+            task.cancel()
+        for task in running:
+            with suppress(asyncio.CancelledError, Exception):
+                await task
+        if self.lease is not None and self.leader:
+            # let another worker take over now rather than at expiry
+            await self.lease.release()
+        self.leader = False
+
+    def stats(self) -> dict:
+        return {
+            "leader": self.leader,
+            "lease": self.lease.kind if self.lease is not None else None,
+            "tasks": {
+                name: {
+                    "role": "local" if not task.leader_only else "leader" if self.leader else "follower",
+                    **self.task_stats[name].public(),
+                }
+                for name, task in self.tasks.items()
+            },
+        }
+
+
+scheduler = PeriodicScheduler()
@@ -0,0 +1,25 @@
+from .registry import PluginSpec, plugin, registry
+from .runtime import (
+    UnknownPlugin,
+    close_plugin_sandbox,
+    execute,
+    parse_chain,
+    run_chain,
+    sandbox_stats,
+    start_plugin_sandbox,
+)
+from .sandbox import PluginError
+
+__all__ = [
+    "PluginError",
+    "PluginSpec",
+    "UnknownPlugin",
+    "close_plugin_sandbox",
+    "execute",
+    "parse_chain",
+    "plugin",
+    "registry",
+    "run_chain",
+    "sandbox_stats",
+    "start_plugin_sandbox",
+]
@@ -0,0 +1,30 @@
+# core/plugins/builtin.py
+import re
+from collections import Counter
+from typing import Any, Mapping
+
+from core.plugins.registry import plugin
+
+_WORD_RE = re.compile(r"[A-Za-z0-9']+")
+
+
+@plugin("echo", description="Return the input unchanged.")
+async def echo(data: dict, upstream: Mapping[str, Any]) -> dict:
+    return data
+
+
+@plugin("merge", description="Combine the results of every upstream step.")
+async def merge(data: dict, upstream: Mapping[str, Any]) -> dict:
+    return {**data, "merged": dict(upstream)}
+
+
+@plugin("text_stats", kind="cpu", description="Word, sentence and top-term counts.")
+def text_stats(data: dict, upstream: Mapping[str, Any]) -> dict:
+    text = data.get("text", "")
+    words = _WORD_RE.findall(text.lower())
+    return {
+        "characters": len(text),
+        "words": len(words),
+        "sentences": len([s for s in re.split(r"[.!?]+", text) if s.strip()]),
+        "top_terms": Counter(words).most_common(data.get("top", 5)),
+    }
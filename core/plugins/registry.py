@@ -0,0 +1,175 @@
+# core/plugins/registry.py
+import importlib
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any, Callable, Literal
+
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENTRY_POINT_GROUP = "hyphae.plugins"
+
+# plugins shipped with the app, resolved the same lazy way as entry points
+BUILTIN_PLUGINS = {
+    "echo": "core.plugins.builtin:echo",
+    "merge": "core.plugins.builtin:merge",
+    "text_stats": "core.plugins.builtin:text_stats",
+}
+
+PluginKind = Literal["io", "cpu"]
+
+
+@dataclass(frozen=True)
+class PluginSpec:
+    name: str
+    kind: PluginKind = "io"
+    description: str = ""
+    version: str = "0.1.0"
+
+
+def plugin(
+    name: str,
+    kind: PluginKind = "io",
+    description: str = "",
+    version: str = "0.1.0",
+) -> Callable:
+    """Mark a function as a plugin.
+
+    The function is called as ``func(data, upstream)`` where ``upstream``
+    maps dependency step ids to their results. ``kind="cpu"`` plugins run in
+    a worker process and must be importable module-level functions;
+    ``kind="io"`` plugins run on the event loop (coroutines) or in a thread.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        func.__plugin__ = PluginSpec(name, kind, description or (func.__doc__ or "").strip(), version)
+        return func
+
+    return decorate
+
+
+@dataclass
+class PluginTiming:
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def record(self, duration_ms: float, ok: bool) -> None:
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+@dataclass
+class LoadedPlugin:
+    spec: PluginSpec
+    func: Callable[..., Any] | None  # None for untrusted plugins, never imported here
+    target: str  # "module:attr", used to re-import the plugin in worker processes
+    sandboxed: bool = False
+
+
+class PluginRegistry:
+    """Name → plugin lookup that only imports a plugin when first used.
+
+    Built-in plugins and ones registered in code are trusted. Entry-point
+    plugins are third-party code: they are never imported into the API
+    process and only run inside sandbox workers.
+    """
+
+    def __init__(self):
+        self._targets: dict[str, str] | None = None
+        self._untrusted: set[str] = set()
+        self._loaded: dict[str, LoadedPlugin] = {}
+        self.timings: dict[str, PluginTiming] = {}
+
+    def _discover(self) -> dict[str, str]:
+        if self._targets is None:
+            targets = dict(BUILTIN_PLUGINS)
+            for ep in entry_points(group=ENTRY_POINT_GROUP):
+                targets[ep.name] = ep.value
+                self._untrusted.add(ep.name)
+            self._targets = targets
+            logger.info(f"Discovered {len(targets)} plugins")
+        return self._targets
+
+    def register(self, name: str, target: str, trusted: bool = True) -> None:
+        self._discover()[name] = target
+        if trusted:
+            self._untrusted.discard(name)
+        else:
+            self._untrusted.add(name)
+        self._loaded.pop(name, None)
+
+    def names(self) -> list[str]:
+        return sorted(self._discover())
+
+    def get(self, name: str) -> LoadedPlugin:
+        loaded = self._loaded.get(name)
+        if loaded is not None:
+            return loaded
+        target = self._discover().get(name)
+        if target is None:
+            raise KeyError(name)
+        if name in self._untrusted:
+            loaded = LoadedPlugin(PluginSpec(name), None, target, sandboxed=True)
+        else:
+            func = resolve(target)
+            spec = getattr(func, "__plugin__", None) or PluginSpec(name)
+            loaded = LoadedPlugin(spec, func, target, sandboxed=spec.kind == "cpu")
+        self._loaded[name] = loaded
+        return loaded
+
+    def sandbox_targets(self) -> list[str]:
+        """Targets to preload in sandbox workers: untrusted plugins plus the
+        trusted cpu plugins (built-ins are loaded here to learn their kind)."""
+        targets = self._discover()
+        for name in BUILTIN_PLUGINS:
+            if name in targets and name not in self._untrusted:
+                self.get(name)
+        preload = {targets[name] for name in self._untrusted if name in targets}
+        preload.update(p.target for p in self._loaded.values() if p.spec.kind == "cpu")
+        return sorted(preload)
+
+    def info(self, name: str) -> dict:
+        target = self._discover()[name]
+        loaded = self._loaded.get(name)
+        info = {
+            "name": name,
+            "target": target,
+            "loaded": loaded is not None,
+            "trusted": name not in self._untrusted,
+        }
+        if loaded:
+            info.update(
+                description=loaded.spec.description,
+                version=loaded.spec.version,
+                kind=loaded.spec.kind,
+                sandboxed=loaded.sandboxed,
+            )
+        info["timing"] = self.timing(name).as_dict()
+        return info
+
+    def timing(self, name: str) -> PluginTiming:
+        return self.timings.setdefault(name, PluginTiming())
+
+
+def resolve(target: str) -> Callable:
+    module_name, _, attr = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+registry = PluginRegistry()
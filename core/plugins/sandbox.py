@@ -0,0 +1,268 @@
+# core/plugins/sandbox.py
+import asyncio
+import multiprocessing
+import socket
+import time
+from typing import Any, Callable
+
+import orjson
+
+from core.config.settings import settings
+from core.plugins.worker import FRAME_HEADER, worker_main
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_ctx = multiprocessing.get_context("spawn")
+
+_ERROR_KINDS = ("plugin", "cpu", "memory")
+
+
+class PluginError(Exception):
+    """The plugin raised, or broke one of its sandbox limits."""
+
+    def __init__(self, message: str, kind: str = "plugin"):
+        super().__init__(message)
+        self.kind = kind
+
+
+def _number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_reply(reply) -> list:
+    """``reply`` if it has one of the shapes a worker sends; anything else
+    means the worker is not behaving and has to go."""
+    if isinstance(reply, list) and reply:
+        kind = reply[0]
+        if kind == "ready" and len(reply) == 3 and isinstance(reply[1], int) and _number(reply[2]):
+            return reply
+        if kind == "ok" and len(reply) == 4 and _number(reply[2]) and _number(reply[3]):
+            return reply
+        if kind == "error" and len(reply) == 3 and reply[1] in _ERROR_KINDS and isinstance(reply[2], str):
+            return reply
+    raise PluginError("plugin worker sent a malformed reply", "crash")
+
+
+class _Worker:
+    __slots__ = ("process", "reader", "writer", "max_bytes", "calls", "startup_ms")
+
+    def __init__(self, process, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_bytes: int):
+        self.process = process
+        self.reader = reader
+        self.writer = writer
+        self.max_bytes = max_bytes
+        self.calls = 0
+        self.startup_ms = 0.0
+
+    async def send(self, frame: bytes) -> None:
+        self.writer.write(frame)
+        await self.writer.drain()
+
+    async def receive(self, timeout: float) -> list:
+        """The next reply. A worker that stalls mid-message only costs this
+        call its timeout; the event loop never blocks on it."""
+        return await asyncio.wait_for(self._read(), timeout)
+
+    async def _read(self) -> list:
+        try:
+            (size,) = FRAME_HEADER.unpack(await self.reader.readexactly(FRAME_HEADER.size))
+            if size > self.max_bytes:
+                raise PluginError(f"plugin reply of {size} bytes is over the {self.max_bytes} byte limit", "crash")
+            body = await self.reader.readexactly(size)
+        except (asyncio.IncompleteReadError, ConnectionError) as exc:
+            raise PluginError(f"plugin worker died: {exc!r}", "crash")
+        try:
+            reply = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            raise PluginError("plugin worker sent an undecodable reply", "crash")
+        return _check_reply(reply)
+
+    def kill(self) -> None:
+        self.writer.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+def _frame(message) -> bytes:
+    body = orjson.dumps(message)
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+class SandboxPool:
+    """Pre-spawned pool of plugin worker processes.
+
+    Each worker imports the plugins it may run once at startup and then
+    serves calls over its own pipe. Calls are limited in CPU time and
+    address space inside the worker and in wall-clock time by the pool.
+    A worker is replaced after ``max_calls`` calls, after breaking a limit,
+    or when it dies. Replacements are spawned in the background, so callers
+    only wait if every worker is busy.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        preload: list[str],
+        max_calls: int,
+        cpu_seconds: float,
+        memory_mb: int,
+        timeout: float,
+        max_message_bytes: int | None = None,
+    ):
+        self.size = size
+        self.preload = preload
+        self.max_calls = max_calls
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self.max_message_bytes = max_message_bytes or settings.PLUGIN_MAX_MESSAGE_BYTES
+
+        self._idle: asyncio.Queue[_Worker] | None = None
+        self._workers: set[_Worker] = set()
+        self._spawning: set[asyncio.Task] = set()
+        self._closed = False
+        self.counters = {
+            "calls": 0,
+            "errors": 0,
+            "recycled": 0,
+            "crashed": 0,
+            "timeouts": 0,
+            "limit_kills": 0,
+        }
+        self._startup_ms: list[float] = []
+
+    async def start(self) -> None:
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        self._top_up()
+        await asyncio.gather(*self._spawning, return_exceptions=True)
+        logger.info(f"Plugin sandbox ready with {len(self._workers)}/{self.size} workers")
+
+    def _top_up(self) -> None:
+        """Spawn workers until live plus starting ones make up ``size``."""
+        while not self._closed and len(self._workers) + len(self._spawning) < self.size:
+            task = asyncio.create_task(self._spawn())
+            self._spawning.add(task)
+            task.add_done_callback(self._spawning.discard)
+
+    async def _spawn(self) -> None:
+        parent_sock, child_sock = socket.socketpair()
+        process = _ctx.Process(
+            target=worker_main,
+            args=(child_sock, self.preload, self.cpu_seconds, self.memory_mb),
+            daemon=True,
+        )
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(process.start)
+        finally:
+            child_sock.close()
+        reader, writer = await asyncio.open_unix_connection(sock=parent_sock)
+        worker = _Worker(process, reader, writer, self.max_message_bytes)
+        try:
+            await worker.receive(timeout=30)
+        except Exception as exc:
+            logger.error(f"Plugin worker failed to start: {exc}")
+            worker.kill()
+            return
+        worker.startup_ms = (time.perf_counter() - started) * 1000
+        self._startup_ms = (self._startup_ms + [worker.startup_ms])[-100:]
+        if self._closed:
+            worker.kill()
+            return
+        self._workers.add(worker)
+        self._idle.put_nowait(worker)
+
+    def _replace(self, worker: _Worker, reason: str) -> None:
+        self._workers.discard(worker)
+        worker.kill()
+        self.counters[reason] += 1
+        self._top_up()
+
+    async def call(self, target: str, data: dict, upstream: dict) -> Any:
+        try:
+            request = _frame(["call", target, data, upstream])
+        except orjson.JSONEncodeError as exc:
+            raise PluginError(f"plugin input is not JSON: {exc}")
+        await self.start()
+        self._top_up()  # covers workers that failed to start earlier
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), self.timeout)
+        except asyncio.TimeoutError:
+            raise PluginError("no plugin worker became available", "unavailable")
+        self.counters["calls"] += 1
+        try:
+            await worker.send(request)
+            reply = await worker.receive(self.timeout)
+        except asyncio.TimeoutError:
+            self._replace(worker, "timeouts")
+            raise PluginError(f"plugin did not finish within {self.timeout:.1f}s", "timeout")
+        except (PluginError, ConnectionError) as exc:
+            self._replace(worker, "crashed")
+            if isinstance(exc, PluginError):
+                raise
+            raise PluginError(f"plugin worker died: {exc!r}", "crash")
+        except asyncio.CancelledError:
+            # the worker may still be busy with our call; never reuse it
+            self._replace(worker, "recycled")
+            raise
+
+        worker.calls += 1
+        if reply[0] == "error" and reply[1] in ("cpu", "memory"):
+            self._replace(worker, "limit_kills")
+        elif worker.calls >= self.max_calls:
+            self._replace(worker, "recycled")
+        else:
+            self._idle.put_nowait(worker)
+
+        if reply[0] == "error":
+            self.counters["errors"] += 1
+            raise PluginError(reply[2], reply[1])
+        return reply[1]
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._spawning):
+            task.cancel()
+        for worker in list(self._workers):
+            worker.kill()
+        self._workers.clear()
+        self._idle = None
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "workers": len(self._workers),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "avg_startup_ms": (
+                round(sum(self._startup_ms) / len(self._startup_ms), 1) if self._startup_ms else 0.0
+            ),
+        }
+
+
+_sandbox: SandboxPool | None = None
+
+
+def get_sandbox(preload: Callable[[], list[str]]) -> SandboxPool:
+    """Return the shared pool; ``preload`` is only called when creating it."""
+    global _sandbox
+    if _sandbox is None:
+        _sandbox = SandboxPool(
+            size=settings.PLUGIN_PROCESS_WORKERS,
+            preload=preload(),
+            max_calls=settings.PLUGIN_MAX_CALLS_PER_WORKER,
+            cpu_seconds=settings.PLUGIN_CPU_SECONDS,
+            memory_mb=settings.PLUGIN_MEMORY_MB,
+            timeout=settings.PLUGIN_TIMEOUT,
+        )
+    return _sandbox
+
+
+async def close_sandbox() -> None:
+    global _sandbox
+    if _sandbox is not None:
+        await _sandbox.close()
+        _sandbox = None
@@ -0,0 +1,141 @@
+# core/plugins/worker.py
+"""Entry point of sandboxed plugin worker processes.
+
+This module itself uses only the stdlib, but a worker imports it as
+``core.plugins.worker``, which runs ``core/plugins/__init__`` first: the
+registry, runtime, sandbox and settings modules are loaded in every worker
+alongside the plugins it preloads.
+
+Messages in both directions are JSON, each preceded by its length as a
+4-byte big-endian unsigned int, so the API process never unpickles anything
+a plugin produced.
+"""
+import asyncio
+import importlib
+import inspect
+import json
+import resource
+import signal
+import struct
+import time
+import traceback
+
+_MB = 1024 * 1024
+
+FRAME_HEADER = struct.Struct("!I")
+
+
+def _read_exactly(sock, size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _receive(sock):
+    header = _read_exactly(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    body = _read_exactly(sock, FRAME_HEADER.unpack(header)[0])
+    return None if body is None else json.loads(body)
+
+
+def _send(sock, message) -> None:
+    body = json.dumps(message, allow_nan=False).encode()
+    sock.sendall(FRAME_HEADER.pack(len(body)) + body)
+
+
+class CPULimitExceeded(Exception):
+    pass
+
+
+def _on_sigxcpu(signum, frame):
+    raise CPULimitExceeded("plugin exceeded its CPU time limit")
+
+
+def _resolve(target: str):
+    module_name, _, attr = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def worker_main(sock, preload: list[str], cpu_seconds: float, memory_mb: int) -> None:
+    """Import ``preload`` once, then serve ``["call", target, data, upstream]``
+    messages until the socket closes.
+
+    Replies are ``["ok", result, cpu_ms, rss_mb]`` or
+    ``["error", kind, message]`` where ``kind`` is ``"plugin"``, ``"cpu"``
+    or ``"memory"``. Results must be JSON-encodable.
+    """
+    started = time.perf_counter()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+    plugins = {}
+    for target in preload:
+        try:
+            plugins[target] = _resolve(target)
+        except Exception as exc:  # reported again when the plugin is called
+            plugins[target] = exc
+
+    # address-space cap goes on after preloading so library imports fit
+    if memory_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb * _MB, memory_mb * _MB))
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+
+    _send(sock, ["ready", len(plugins), (time.perf_counter() - started) * 1000])
+    while True:
+        try:
+            message = _receive(sock)
+        except OSError:
+            return
+        if message is None:
+            return
+        _, target, data, upstream = message
+
+        before = _cpu_seconds()
+        if cpu_seconds:
+            soft = int(before + cpu_seconds) + 1
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, cpu_hard))
+        try:
+            func = plugins.get(target)
+            if func is None:
+                func = plugins[target] = _resolve(target)
+            if isinstance(func, Exception):
+                raise func
+            if inspect.iscoroutinefunction(func):
+                # each call gets its own loop; a worker serves one call at a time
+                result = asyncio.run(func(data, upstream))
+            else:
+                result = func(data, upstream)
+            reply = [
+                "ok",
+                result,
+                (_cpu_seconds() - before) * 1000,
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            ]
+        except CPULimitExceeded as exc:
+            reply = ["error", "cpu", str(exc)]
+        except MemoryError:
+            reply = ["error", "memory", "plugin exceeded its memory limit"]
+        except Exception as exc:
+            reply = ["error", "plugin", "".join(traceback.format_exception_only(exc)).strip()]
+        finally:
+            if cpu_seconds:
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_hard, cpu_hard))
+
+        try:
+            _send(sock, reply)
+        except (TypeError, ValueError) as exc:  # a result JSON can't carry
+            _send(sock, ["error", "plugin", f"could not return result: {exc}"])
@@ -1,7 +1,17 @@
 from fastapi import APIRouter
 
+from core.agents import scheduler
+from core.cache.response_cache import response_cache
+
 router = APIRouter()
 
 @router.get("/agents/stats")
 async def agent_stats():
-    return {"connected": 0}
+    agents = scheduler.stats()
+    return {
+        "connected": len(agents),
+        "queue_depth": sum(lane["queued"] for lane in agents.values()),
+        "running": sum(lane["running"] for lane in agents.values()),
+        "agents": agents,
+        "cache": response_cache.stats(),
+    }
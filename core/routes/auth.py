@@ -1,5 +1,6 @@
 # core/routes/auth.py
 
+import asyncio
 import os
 import secrets
 import bcrypt
@@ -18,19 +19,22 @@ from fastapi import (
     Request,
 )
 from jose import JWTError, jwt
-from sqlalchemy import select
+from sqlalchemy import exists, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache.versions import versions
 from core.config.settings import settings
 from core.utils.email import send_email
-from core.utils.dependencies import get_current_user
+from core.utils.dependencies import get_current_user, load_token_user
 from core.utils.logger import get_logger
 from core.websocket.websocket_manager import manager
 from core.websocket.emitter import emit_to_user
 
-from core.schemas import UserCreate, UserLogin, UserRead
+from core.schemas import UserCreate, UserLogin, UserRead, user_read_json
 from db.database import get_db
 from db.models import User, BlacklistedToken
+from db.statements import insert_ignore, violated_column
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -42,77 +46,70 @@ async def register_user(
     data: UserCreate,           # make sure UserCreate now includes a `pin: str` field
     db: AsyncSession = Depends(get_db),
 ):
-    # 1) Validate & uniqueness
+    # 1) Validate
     if not data.username or not data.password or not data.pin:
         raise HTTPException(400, "Username, password and PIN required")
 
-    # username must be unique
-    existing = await db.execute(
-        select(User).where(User.username == data.username)
+    # 2) Hash password + PIN off the event loop, then insert the user with its
+    #    tokens in one statement; the unique indexes enforce uniqueness
+    hashed_pw, hashed_pin = await asyncio.gather(
+        asyncio.to_thread(bcrypt.hashpw, data.password.encode(), bcrypt.gensalt()),
+        asyncio.to_thread(bcrypt.hashpw, data.pin.encode(), bcrypt.gensalt()),
     )
-    if existing.scalar_one_or_none():
-        raise HTTPException(400, "Username already exists")
-
-    # email (if provided) must also be unique
-    if data.email:
-        email_exists = await db.execute(
-            select(User).where(User.email == data.email)
-        )
-        if email_exists.scalar_one_or_none():
-            raise HTTPException(400, "Email already exists")
-
-    # 2) Hash password + PIN, persist user, then issue tokens
-    hashed_pw = bcrypt.hashpw(data.password.encode(), bcrypt.gensalt()).decode()
-    hashed_pin = bcrypt.hashpw(data.pin.encode(), bcrypt.gensalt()).decode()
-
     verification_token = secrets.token_urlsafe()
-    user = User(
-        username=data.username,
-        email=data.email,
-        hashed_password=hashed_pw,
-        pin_hash=hashed_pin,          # store the PIN hash
-        pin_verified=False,           # force PIN check later
-        verification_token=verification_token,
-        avatar=data.avatar
-    )
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-
+    refresh_token = secrets.token_urlsafe(32)
     now = datetime.now(timezone.utc)
-    access_expires = now + timedelta(hours=1)
+    try:
+        user_id = (await db.execute(
+            insert(User)
+            .values(
+                username=data.username,
+                email=data.email,
+                hashed_password=hashed_pw.decode(),
+                pin_hash=hashed_pin.decode(),     # store the PIN hash
+                pin_verified=False,               # force PIN check later
+                verification_token=verification_token,
+                avatar=data.avatar,
+                refresh_token=refresh_token,
+                refresh_token_expires_at=now + timedelta(days=7),
+            )
+            .returning(User.id)
+        )).scalar_one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if violated_column(exc, ["username", "email"]) == "email":
+            raise HTTPException(400, "Email already exists")
+        raise HTTPException(400, "Username already exists")
+
     access_token = jwt.encode(
-        {"sub": str(user.id), "username": user.username, "exp": access_expires},
+        {"sub": str(user_id), "username": data.username, "exp": now + timedelta(hours=1)},
         settings.JWT_SECRET,
         algorithm="HS256",
     )
-    refresh_token = secrets.token_urlsafe(32)
-    user.refresh_token = refresh_token
-    user.refresh_token_expires_at = now + timedelta(days=7)
-    await db.commit()
 
     # 3) Fire off verification email
-    if user.email:
+    if data.email:
         verify_link = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
         fallback = (
-            f"Hi {user.username},\n\n"
+            f"Hi {data.username},\n\n"
             f"Please verify your HyphaeOS account by clicking:\n{verify_link}\n\n"
             "— The HyphaeOS Team"
         )
         await send_email(
-            user.email,
+            data.email,
             "🔒 Verify Your HyphaeOS Email",
             "verify_email.html",
             body=fallback,
-            username=user.username,
+            username=data.username,
             verify_link=verify_link,
         )
 
     # 4) Return tokens + initial pin_verified flag
     return {
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
+        "id": user_id,
+        "username": data.username,
+        "email": data.email,
         "access_token": access_token,
         "refresh_token": refresh_token,
         "pin_verified": False,
@@ -221,17 +218,17 @@ async def logout_user(
         raise HTTPException(401, "Not authenticated")
     token = authorization.split(" ", 1)[1]
 
-    # Blacklist both tokens
-    db.add(BlacklistedToken(token=token))
+    # Blacklist both tokens in one statement; logging out twice is harmless
+    revoked = [{"token": BlacklistedToken.digest(token)}]
+    if refresh_token:
+        revoked.append({"token": BlacklistedToken.digest(refresh_token)})
+    await db.execute(insert_ignore(db, BlacklistedToken.__table__).values(revoked))
     if refresh_token:
-        db.add(BlacklistedToken(token=refresh_token))
-        res = await db.execute(
-            select(User).where(User.refresh_token == refresh_token)
+        await db.execute(
+            update(User)
+            .where(User.refresh_token == refresh_token)
+            .values(refresh_token=None, refresh_token_expires_at=None)
         )
-        u = res.scalar_one_or_none()
-        if u:
-            u.refresh_token = None
-            u.refresh_token_expires_at = None
 
     await db.commit()
     response.delete_cookie("refresh_token", path="/")
@@ -258,20 +255,13 @@ async def get_profile(
     except:
         raise HTTPException(401, "Invalid token subject")
 
-    user = await db.get(User, user_id)
+    user, revoked = await load_token_user(db, user_id, token)
+    if revoked:
+        raise HTTPException(401, "Token revoked")
     if not user:
         raise HTTPException(404, "User not found")
 
-    return {
-        "id":            user.id,
-        "username":      user.username,
-        "email":         user.email,
-        "pending_email": user.pending_email,
-        "verified":      user.is_verified,
-        "is_active":     user.is_active,
-        "created_at":    user.created_at,
-        "avatar":        user.avatar,
-    }
+    return Response(user_read_json.one(user), media_type="application/json")
 
 
 @router.post("/auth/change_username")
@@ -291,6 +281,7 @@ async def change_username(
 
     user.username = new_username
     await db.commit()
+    await versions.bump(f"user:{user.id}")
 
     # ✅ Emit using your helper
     print(f"Emitting WebSocket event: user={user.id} username={new_username}")
@@ -317,30 +308,32 @@ async def refresh_token(
     if not refresh_token:
         logger.error("No refresh token provided")
         raise HTTPException(401, "No refresh token")
-    res = await db.execute(
-        select(User).where(User.refresh_token == refresh_token)
-    )
-    user = res.scalar_one_or_none()
-    blk = await db.execute(
-        select(BlacklistedToken).where(BlacklistedToken.token == refresh_token)
-    )
-    if not user or blk.scalar_one_or_none():
-        raise HTTPException(401, "Invalid or revoked refresh token")
 
+    # Rotate in one statement: the row only matches while the token is
+    # current, unexpired and not revoked, so concurrent refreshes with the
+    # same token cannot both succeed
     now = datetime.now(timezone.utc)
-    if user.refresh_token_expires_at and user.refresh_token_expires_at < now:
-        raise HTTPException(401, "Refresh token expired")
+    new_refresh = secrets.token_urlsafe(32)
+    row = (await db.execute(
+        update(User)
+        .where(
+            User.refresh_token == refresh_token,
+            or_(User.refresh_token_expires_at.is_(None), User.refresh_token_expires_at > now),
+            ~exists().where(BlacklistedToken.token == BlacklistedToken.digest(refresh_token)),
+        )
+        .values(refresh_token=new_refresh, refresh_token_expires_at=now + timedelta(days=7))
+        .returning(User.id, User.username)
+    )).one_or_none()
+    if row is None:
+        await db.rollback()
+        raise HTTPException(401, "Invalid or revoked refresh token")
+    await db.commit()
 
-    access_expires = now + timedelta(hours=1)
     access_token = jwt.encode(
-        {"sub": str(user.id), "username": user.username, "exp": access_expires},
+        {"sub": str(row.id), "username": row.username, "exp": now + timedelta(hours=1)},
         settings.JWT_SECRET,
         algorithm="HS256",
     )
-    new_refresh = secrets.token_urlsafe(32)
-    user.refresh_token = new_refresh
-    user.refresh_token_expires_at = now + timedelta(days=7)
-    await db.commit()
 
     # send the new refresh token cookie in a way the browser will include on XHR
     response.set_cookie(
@@ -352,6 +345,7 @@ async def refresh_token(
         path="/",
         max_age=7 * 24 * 3600,
     )
+    return {"access_token": access_token}
 
 @router.post("/auth/change_password")
 async def change_password(
@@ -451,6 +445,7 @@ async def verify_email(token: str = Query(...), db: AsyncSession = Depends(get_d
     user.is_verified = True
     user.verification_token = None
     await db.commit()
+    await versions.bump(f"user:{user.id}")
 
     fallback = (
         f"Hey {user.username},\n\n"
@@ -490,6 +485,7 @@ async def change_email(
     user.pending_email = new_email
     user.verification_token = token
     await db.commit()
+    await versions.bump(f"user:{user.id}")
 
     verify_link = f"{settings.FRONTEND_URL}/verify-email-change?token={token}"
     background_tasks.add_task(
@@ -522,6 +518,7 @@ async def cancel_pending_email(
     user.pending_email = None
     user.verification_token = None
     await db.commit()
+    await versions.bump(f"user:{user.id}")
     return {"message": "Pending email change canceled."}
 
 
@@ -576,6 +573,7 @@ async def verify_email_change(
     user.verification_token = None
     # Do NOT modify is_verified to preserve login ability
     await db.commit()
+    await versions.bump(f"user:{user.id}")
 
     # Send confirmation email
     fallback = (
@@ -0,0 +1,160 @@
+# core/routes/batch.py
+import asyncio
+import base64
+import re
+from typing import Literal
+
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from pydantic import BaseModel
+
+from core.config.settings import settings
+from core.utils.dependencies import get_current_user, preauthenticated
+from core.utils.logger import get_logger
+from db.database import SerializedSession, shared_session, use_session
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+API_PREFIX = "/api/"
+BATCH_PATH = "/api/batch"
+
+# connection-level headers of the batch itself, not of its sub-requests
+_HOP_HEADERS = {b"content-length", b"content-type", b"transfer-encoding", b"accept-encoding", b"if-none-match"}
+_SCOPE_KEYS = ("asgi", "http_version", "scheme", "server", "client", "root_path", "app", "state", "extensions")
+
+_SHARED_PATHS = [
+    re.compile("^" + re.sub(r"\\{\w+\\}", "[^/]+", re.escape(template)) + "$")
+    for template in settings.BATCH_SHARED_SESSION_PATHS
+]
+
+
+class SubRequest(BaseModel):
+    id: str
+    method: Literal["GET", "HEAD"] = "GET"
+    path: str
+    headers: dict[str, str] = {}
+
+
+class BatchRequest(BaseModel):
+    requests: list[SubRequest]
+
+
+def _scope(parent: dict, sub: SubRequest) -> dict:
+    path, _, query = sub.path.partition("?")
+    headers = [(name, value) for name, value in parent["headers"] if name not in _HOP_HEADERS]
+    headers += [(name.lower().encode(), value.encode()) for name, value in sub.headers.items()]
+    return {
+        **{key: parent[key] for key in _SCOPE_KEYS if key in parent},
+        "type": "http",
+        "method": sub.method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+    }
+
+
+async def _dispatch(app, scope: dict) -> tuple[int, list, bytes]:
+    """Run one sub-request through the app, middleware included, and
+    collect its response."""
+    status, headers, body = 500, [], []
+    done = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()  # only disconnect once the response is complete
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status, headers = message["status"], message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception as exc:  # already answered with a 500
+        logger.error(f"Batch sub-request {scope['path']} failed: {exc}")
+    finally:
+        done.set()
+    return status, headers, b"".join(body)
+
+
+async def _run(app, scope: dict, db: SerializedSession) -> tuple[int, list, bytes]:
+    # GETs that commit (e.g. /api/auth/verify_email) keep a session of their own
+    if any(pattern.match(scope["path"]) for pattern in _SHARED_PATHS):
+        with use_session(db):
+            return await _dispatch(app, scope)
+    return await _dispatch(app, scope)
+
+
+def _item(item_id: str, status: int, headers: list, body: bytes) -> bytes:
+    """One entry of the response; JSON bodies are spliced in as they are,
+    UTF-8 text becomes a string and anything else a base64 string, marked
+    with ``"encoding": "base64"``."""
+    header_map = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in headers
+        if name.lower() != b"content-length"
+    }
+    entry = {"id": item_id, "status": status, "headers": header_map}
+    content_type = header_map.get("content-type", "")
+    if not body:
+        body = b"null"
+    elif not content_type.startswith("application/json"):
+        text = None
+        if content_type.startswith("text/"):
+            try:
+                text = body.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        if text is None:
+            entry["encoding"] = "base64"
+            text = base64.b64encode(body).decode("ascii")
+        body = orjson.dumps(text)
+    head = orjson.dumps(entry)
+    return head[:-1] + b',"body":' + body + b"}"
+
+
+@router.post("/batch")
+async def batch(
+    data: BatchRequest,
+    request: Request,
+    authorization: str | None = Header(None),
+):
+    """Run GET sub-requests concurrently, in-process, and answer with all of
+    their responses in order.
+
+    The Authorization header is checked once and holds for every
+    sub-request; those to the read-only routes in
+    ``BATCH_SHARED_SESSION_PATHS`` share one database session. Each still goes
+    through the middleware (rate limits, ETags), and may send its own
+    headers, e.g. ``If-None-Match``.
+    """
+    if len(data.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(400, f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+    for sub in data.requests:
+        if not sub.path.startswith(API_PREFIX) or sub.path.partition("?")[0] == BATCH_PATH:
+            raise HTTPException(400, f"Cannot batch {sub.path}")
+
+    async with shared_session() as db:
+        token = None
+        if authorization is not None:
+            user = await get_current_user(authorization, db)
+            token = preauthenticated.set((authorization, user))
+        try:
+            results = await asyncio.gather(
+                *(_run(request.app, _scope(request.scope, sub), db) for sub in data.requests)
+            )
+        finally:
+            if token is not None:
+                preauthenticated.reset(token)
+
+    items = b",".join(_item(sub.id, *result) for sub, result in zip(data.requests, results))
+    return Response(b'{"responses":[' + items + b"]}", media_type="application/json")
@@ -1,23 +1,157 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from core.cache.versions import versions
+from core.config.settings import settings
+from core.utils.dependencies import get_admin_user
+from core.utils.responses import FastJSONResponse
+from core.explorer import (
+    ARROW_STREAM,
+    NDJSON,
+    arrow_stream,
+    explorer,
+    ndjson_stream,
+    negotiate,
+)
 
 router = APIRouter()
 
-@router.get("/connections")
+# registering a connection reaches files and hosts from the server, so the
+# connection and explorer routes are admin-only; the dashboard metrics are not
+ADMIN_ONLY = [Depends(get_admin_user)]
+
+def _source_ref(ref: str) -> str:
+    try:
+        return explorer.get(ref).info.id
+    except KeyError:
+        raise HTTPException(404, f"Unknown connection {ref}")
+
+async def _schema_changed(ref: str) -> None:
+    # the structure route is addressed by id or by name
+    info = explorer.get(ref).info
+    await versions.bump(f"schema:{info.id}", f"schema:{info.name}")
+
+@router.get("/connections", dependencies=ADMIN_ONLY)
 async def list_connections():
-    return []
+    return [info.public() for info in explorer.connections()]
 
-@router.post("/connections")
+@router.post("/connections", dependencies=ADMIN_ONLY)
 async def create_connection(data: dict):
-    return {"id": "1", **data}
+    try:
+        info = explorer.register(data.get("params") or data, name=data.get("name"))
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
+    return info.public()
+
+@router.delete("/connections/{connection_id}", dependencies=ADMIN_ONLY)
+async def delete_connection(connection_id: str):
+    ref = _source_ref(connection_id)
+    await _schema_changed(ref)
+    await explorer.remove(ref)
+    return {"status": "deleted"}
 
-@router.post("/structure")
+@router.post("/connections/{connection_id}/refresh", dependencies=ADMIN_ONLY)
+async def refresh_connection(connection_id: str):
+    ref = _source_ref(connection_id)
+    explorer.invalidate(ref)
+    await _schema_changed(ref)
+    return {"status": "invalidated"}
+
+@router.get("/connections/{connection_id}/structure", dependencies=ADMIN_ONLY)
+async def connection_structure(connection_id: str):
+    """:func:`db_structure` for a registered connection, as a GET the
+    browser can revalidate with its ETag."""
+    return await _structure(_source_ref(connection_id))
+
+@router.post("/structure", dependencies=ADMIN_ONLY)
 async def db_structure(params: dict):
-    return {"items": []}
+    """Tree of schemas, tables and columns. Accepts a connection ``id`` or raw
+    connection params (registered on the fly, reusing an existing entry)."""
+    if params.get("id"):
+        ref = _source_ref(params["id"])
+    else:
+        try:
+            ref = explorer.register(params).id
+        except ValueError as exc:
+            raise HTTPException(400, str(exc))
+    refresh = bool(params.get("refresh"))
+    if refresh:
+        await _schema_changed(ref)
+    return await _structure(ref, refresh)
+
+async def _structure(ref: str, refresh: bool = False) -> dict:
+    try:
+        snapshot = await explorer.schema(ref, refresh=refresh)
+    except Exception as exc:
+        raise HTTPException(502, f"Could not read database structure: {exc}")
+
+    items, seen_schemas = [], set()
+    for (schema, name), info in sorted(snapshot.tables.items(), key=lambda kv: (kv[0][0] or "", kv[0][1])):
+        schema_id = f"schema:{schema or 'default'}"
+        if schema_id not in seen_schemas:
+            seen_schemas.add(schema_id)
+            items.append({"id": schema_id, "parentId": None, "label": schema or "default"})
+        table_id = f"table:{schema or 'default'}.{name}"
+        items.append({"id": table_id, "parentId": schema_id, "label": name})
+        items.extend(
+            {"id": f"{table_id}.{col}", "parentId": table_id, "label": col}
+            for col in info.columns
+        )
+    return {"connection_id": ref, "items": items}
+
+@router.get("/database/{database}/schema/{schema}/table/{table}", dependencies=ADMIN_ONLY)
+async def get_table_data(
+    database: str,
+    schema: str,
+    table: str,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    columns: str | None = Query(None, description="Comma-separated column projection"),
+    accept: str | None = Header(None),
+):
+    """A JSON keyset page by default. With ``Accept: application/x-ndjson`` or
+    an Arrow stream type, every row from ``cursor`` on (up to ``limit``) is
+    streamed in batches instead."""
+    ref = _source_ref(database)
+    projection = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    fmt = negotiate(accept)
+    try:
+        info = await explorer.table_info(ref, schema, table)
+        if fmt == "json":
+            page_size = min(limit or settings.EXPLORER_PAGE_SIZE, settings.EXPLORER_MAX_PAGE_SIZE)
+            rows, next_cursor = await explorer.page(ref, info, cursor, page_size, projection)
+            # rows are plain values: encode them directly, not via jsonable_encoder
+            return FastJSONResponse(
+                {"rows": rows, "next_cursor": next_cursor, "primary_key": info.primary_key}
+            )
+        selected = explorer.project(info, projection)
+        after = explorer.keyset(info, cursor)
+    except LookupError as exc:
+        raise HTTPException(404, str(exc))
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
 
-@router.get("/database/{database}/schema/{schema}/table/{table}")
-async def get_table_data(database: str, schema: str, table: str):
-    return {"rows": []}
+    batches = explorer.iter_batches(
+        ref, info, selected, after, limit, batch_size=settings.EXPLORER_STREAM_BATCH_SIZE
+    )
+    if fmt == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(406, "Arrow export is not available on this server")
+        types = [info.types.get(c) for c in selected]
+        return StreamingResponse(arrow_stream(selected, batches, types), media_type=ARROW_STREAM)
+    return StreamingResponse(ndjson_stream(selected, batches), media_type=NDJSON)
 
 @router.get("/metrics/database")
 async def database_metrics():
-    return {"databaseSize": "0", "tables": 0, "activeConnections": 0, "uptime": "0", "queriesPerSecond": 0, "cacheHitRatio": 0}
+    stats = explorer.stats()
+    return {
+        "databaseSize": "0",
+        "tables": stats["cached_tables"],
+        "activeConnections": stats["checked_out"],
+        "openPools": stats["open_pools"],
+        "uptime": "0",
+        "queriesPerSecond": 0,
+        "cacheHitRatio": 0,
+    }
@@ -1,19 +1,75 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.feedback import PENDING, analyzer, approve, list_by_status, score_batch
+from core.schemas import FeedbackAnalyze, FeedbackApprove, FeedbackSubmit
+from core.utils.dependencies import get_admin_user, get_current_user
+from db.database import get_db
+from db.models import FeedbackItem, User
 
 router = APIRouter()
 
+def _serialize(item: FeedbackItem) -> dict:
+    return {
+        "id": item.id,
+        "user": item.user,
+        "message": item.message,
+        "feedback_type": item.feedback_type,
+        "status": item.status,
+        "sentiment": item.sentiment,
+        "sentiment_score": item.sentiment_score,
+        "keywords": item.keywords or [],
+        "created_at": item.created_at.isoformat() if item.created_at else None,
+    }
+
 @router.post("/feedback/submit")
-async def submit_feedback(data: dict):
-    return {"status": "ok", "id": 1}
+async def submit_feedback(
+    data: FeedbackSubmit,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    message = data.message.strip()
+    if not message:
+        raise HTTPException(400, "Feedback message required")
+    item = FeedbackItem(user=user.username, message=message, feedback_type=data.feedback_type)
+    db.add(item)
+    await db.commit()
+    return {"status": "ok", "id": item.id}
+
+# the moderation queue and what changes it are for admins only
+
+@router.get("/feedback/pending", dependencies=[Depends(get_admin_user)])
+async def pending_feedback(
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    items = await list_by_status(db, PENDING, after_id, limit)
+    return [_serialize(item) for item in items]
+
+@router.post("/feedback/analyze", dependencies=[Depends(get_admin_user)])
+async def analyze_feedback(data: FeedbackAnalyze | None = Body(None)):
+    """Score one message inline, or start a batch job over unscored pending items."""
+    if data and data.message:
+        analysis = score_batch([data.message])[0]
+        return {"analysis": {**analysis, "type": data.feedback_type}}
+    return {"status": "queued", "job": analyzer.schedule()}
 
-@router.get("/feedback/pending")
-async def pending_feedback():
-    return []
+@router.get("/feedback/analyze/{job_id}", dependencies=[Depends(get_admin_user)])
+async def analysis_job(job_id: int):
+    job = analyzer.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown analysis job")
+    return job
 
-@router.post("/feedback/analyze")
-async def analyze_feedback(message: str, feedback_type: str):
-    return {"analysis": {"message": message, "type": feedback_type}}
+@router.post("/feedback/approve", dependencies=[Depends(get_admin_user)])
+async def approve_feedback_bulk(data: FeedbackApprove, db: AsyncSession = Depends(get_db)):
+    ids = data.ids
+    approved = await approve(db, ids)
+    return {"status": "approved", "approved": approved, "skipped": sorted(set(ids) - set(approved))}
 
-@router.post("/feedback/approve/{feedback_id}")
-async def approve_feedback(feedback_id: int):
+@router.post("/feedback/approve/{feedback_id}", dependencies=[Depends(get_admin_user)])
+async def approve_feedback(feedback_id: int, db: AsyncSession = Depends(get_db)):
+    if not await approve(db, [feedback_id]):
+        raise HTTPException(404, "No pending feedback with that id")
     return {"status": "approved"}
@@ -1,27 +1,54 @@
 # health.py
-from fastapi import APIRouter, Depends
-from db.database import get_db
-from core.cache.redis_cache import redis
+import sys
+
+from fastapi import APIRouter, Response
+
+from core.cache import redis_cache
+from core.health import prober
+from core.periodic import scheduler
+from db import database
 
 router = APIRouter()
 
-@router.get("/health")
-async def health(db=Depends(get_db)):
-    # Check DB
-    try:
-        await db.execute("SELECT 1")
-        db_ok = True
-    except Exception as e:
-        db_ok = False
-
-    # Check Redis
-    try:
-        pong = await redis.ping() if redis else False
-        redis_ok = bool(pong)
-    except Exception as e:
-        redis_ok = False
+# All of these answer from the background prober's last results; none of
+# them touches the database or Redis.
 
+@router.get("/health")
+async def health():
+    statuses = prober.statuses
     return {
-        "database": db_ok,
-        "redis": redis_ok,
+        "database": bool(statuses["database"].ok),
+        "redis": bool(statuses["redis"].ok),
+        "checks": prober.snapshot(),
+        "circuits": {
+            "database": database.breaker.stats(),
+            "redis": redis_cache.breaker.stats(),
+        },
+        "redis_pool": redis_cache.stats(),
+        "websockets": _websockets(),
+        "scheduler": scheduler.stats(),
     }
+
+
+def _websockets() -> dict:
+    # only endpoints whose router has been imported have sockets to count
+    managers = []
+    if ws := sys.modules.get("core.websocket.websocket_manager"):
+        managers.append(ws.manager)
+    if mycocore := sys.modules.get("core.routes.mycocore"):
+        managers.append(mycocore.streams)
+    return {manager.name: manager.stats() for manager in managers}
+
+
+@router.get("/health/live")
+async def liveness():
+    # the event loop answered, which is all liveness means
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness(response: Response):
+    ready = prober.ready
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "unavailable", "checks": prober.snapshot()}
@@ -0,0 +1,93 @@
+# core/routes/lazy.py
+import importlib
+
+from fastapi import FastAPI
+
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# First path segment under the API prefix -> module whose ``router`` serves
+# it. A module may own several segments; a segment has exactly one owner.
+ROUTER_MODULES: dict[str, str] = {
+    "health": "core.routes.health",
+    "auth": "core.routes.auth",
+    "batch": "core.routes.batch",
+    "users": "core.routes.users",
+    "system": "core.routes.system",
+    "core": "core.routes.system",
+    "logs": "core.routes.logs",
+    "feedback": "core.routes.feedback",
+    "queries": "core.routes.query",
+    "rootbloom": "core.routes.rootbloom",
+    "neuroweave": "core.routes.neuroweave",
+    "agent": "core.routes.neuroweave",
+    "sporelink": "core.routes.sporelink",
+    "verify": "core.routes.verify",
+    "connections": "core.routes.database",
+    "structure": "core.routes.database",
+    "database": "core.routes.database",
+    "metrics": "core.routes.database",
+    "plugins": "core.routes.plugins",
+    "mycocore": "core.routes.mycocore",
+    "state": "core.routes.state",
+    "agents": "core.routes.agents",
+    "market": "core.routes.market",
+    "market-context": "core.routes.market",
+    "news": "core.routes.market",
+    "upload": "core.routes.market",
+    "ws": "core.routes.ws",
+}
+
+
+class LazyRouters:
+    """Routers included into ``app`` the first time one of their URLs is
+    requested, so a worker only imports the endpoints it serves (and
+    whatever those pull in: bcrypt, numpy, psutil, ...)."""
+
+    def __init__(self, app: FastAPI, prefix: str, modules: dict[str, str] = ROUTER_MODULES):
+        self.app = app
+        self.prefix = prefix
+        self.modules = modules
+        self.loaded: set[str] = set()
+
+    def load(self, module_name: str) -> None:
+        if module_name in self.loaded:
+            return
+        module = importlib.import_module(module_name)
+        self.app.include_router(module.router, prefix=self.prefix)
+        self.loaded.add(module_name)
+        self.app.openapi_schema = None  # regenerate with the new routes
+        logger.debug(f"Loaded router {module_name}")
+
+    def load_for(self, path: str) -> None:
+        if not path.startswith(self.prefix + "/"):
+            return
+        segment = path[len(self.prefix) + 1:].partition("/")[0]
+        module_name = self.modules.get(segment)
+        if module_name is not None:
+            self.load(module_name)
+
+    def load_all(self) -> None:
+        for module_name in dict.fromkeys(self.modules.values()):
+            self.load(module_name)
+
+
+class LazyRouterMiddleware:
+    """Includes the router a request needs before routing it. The docs and
+    the OpenAPI schema describe every route, so they load everything."""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+        fastapi_app = routers.app
+        self.load_all_paths = {p for p in (fastapi_app.openapi_url, fastapi_app.docs_url, fastapi_app.redoc_url) if p}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path in self.load_all_paths:
+                self.routers.load_all()
+            else:
+                self.routers.load_for(path)
+        await self.app(scope, receive, send)
@@ -1,5 +1,7 @@
 from fastapi import APIRouter
 
+from core.memory import LOGS_NAMESPACE, remember
+
 router = APIRouter()
 
 @router.get("/logs/query")
@@ -20,4 +22,8 @@ async def flag_log(log_id: str, reason: str | None = None):
 
 @router.post("/logs/save")
 async def save_log(entry: dict):
+    text = entry.get("message") or entry.get("event")
+    if text:
+        metadata = {k: entry[k] for k in ("id", "agent", "level", "timestamp") if k in entry}
+        await remember(LOGS_NAMESPACE, [text], metadata)
     return {"status": "saved"}
@@ -1,13 +1,15 @@
 # core/routes/mycocore.py
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket
 from pydantic import BaseModel
 from typing import List, Literal
-from datetime import datetime
+from datetime import datetime, timezone
 import psutil
-import asyncio
+import time
 
+from core.periodic import PeriodicTask
 from core.utils.logger import get_logger
+from core.websocket.websocket_manager import ConnectionManager
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -29,12 +31,12 @@ class MycoCoreAlerts(BaseModel):
 
 class SystemMetricsPayload(BaseModel):
     type: Literal["system_metrics"]
-    timestamp: str
+    timestamp: datetime
     data: dict
 
 # ─── In-Memory Store ──────────────────────────────────────────────────────────
 
-websocket_connections: set[WebSocket] = set()
+streams = ConnectionManager("mycocore/stream")
 
 # ─── REST ENDPOINTS ───────────────────────────────────────────────────────────
 
@@ -64,40 +66,35 @@ async def mycocore_alerts():
 
 @router.websocket("/mycocore/stream")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    logger.info("New WS client connected to /mycocore/stream")
-    websocket_connections.add(websocket)
-    try:
-        while True:
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        logger.info("WebSocket client disconnected cleanly")
-    except Exception as e:
-        logger.error(f"WebSocket error: {e}")
-    finally:
-        websocket_connections.discard(websocket)
-        logger.info("Cleaned up WS connection")
+    connection = await streams.connect(websocket)
+    await streams.serve(connection)
 
 # ─── BACKGROUND BROADCAST TASK ────────────────────────────────────────────────
 
-async def system_metrics_broadcast():
-    while True:
-        cpu = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory().percent
-        payload = SystemMetricsPayload(
-            type="system_metrics",
-            timestamp=datetime.utcnow().isoformat() + "Z",
-            data={"cpu_usage": cpu, "memory_usage": memory},
-        ).dict()
-        logger.info(f"Broadcasting system metrics: {payload}")
-        if websocket_connections:
-            await asyncio.gather(
-                *(ws.send_json(payload) for ws in websocket_connections)
-            )
-        await asyncio.sleep(5)
-
-def start_metrics_task():
-    """
-    Kick off the background broadcast loop and return the created task.
-    """
-    return asyncio.create_task(system_metrics_broadcast())
+async def sample_system_metrics() -> dict:
+    """One sample, taken on the elected worker only. ``cpu_percent`` without
+    an interval measures since the previous call (the last tick) instead of
+    blocking the event loop for a second."""
+    return {
+        "cpu_usage": psutil.cpu_percent(interval=None),
+        "memory_usage": psutil.virtual_memory().percent,
+        "sampled_at": time.time(),
+    }
+
+async def broadcast_system_metrics(sample: dict):
+    """Sends a sample to this worker's stream clients; runs on every worker."""
+    payload = SystemMetricsPayload(
+        type="system_metrics",
+        timestamp=datetime.fromtimestamp(sample["sampled_at"], timezone.utc),
+        data={"cpu_usage": sample["cpu_usage"], "memory_usage": sample["memory_usage"]},
+    ).dict()
+    logger.debug(f"Broadcasting system metrics: {payload}")
+    await streams.broadcast(payload)
+
+metrics_task = PeriodicTask(
+    "system_metrics",
+    sample_system_metrics,
+    interval=5,
+    deliver=broadcast_system_metrics,
+    leader_only=True,
+)
@@ -1,14 +1,59 @@
-from fastapi import APIRouter
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Request, WebSocket
+
+from core.agents import open_agent_stream, register_agent, run_agent
+from core.agents.streaming import replay, serve_websocket, sse_response, wants_event_stream
+from core.cache.response_cache import response_cache
+from core.memory import agent_context
+from core.utils.dependencies import get_current_user, get_current_user_ws
+from db.models import User
 
 router = APIRouter()
 
+register_agent("neuroweave")
+
+
+async def _ask(request: Request, prompt: str, user_id: int, priority: str):
+    context = await agent_context(prompt, user_id)
+    job = {"prompt": prompt, "memories": context}
+    if wants_event_stream(request):
+        cached = await response_cache.get("neuroweave", job)
+        if cached is not None:
+            chunks = replay(cached)
+        else:
+            chunks = await open_agent_stream("neuroweave", job, priority)
+        return sse_response("neuroweave", chunks, context=context)
+    response = await response_cache.get_or_compute(
+        "neuroweave", job, lambda: run_agent("neuroweave", job, priority, batch_key="ask")
+    )
+    return {"agent": "neuroweave", "response": response, "context": context}
+
 @router.post("/neuroweave/ask")
-async def neuroweave_ask(prompt: str):
-    return {"agent": "neuroweave", "response": "answer"}
+async def neuroweave_ask(
+    request: Request,
+    prompt: str,
+    priority: Literal["interactive", "background"] = "interactive",
+    user: User = Depends(get_current_user),
+):
+    return await _ask(request, prompt, user.id, priority)
 
 @router.post("/agent/ask")
-async def neuroweave_tracked(prompt: str):
-    return {"agent": "neuroweave", "response": "answer"}
+async def neuroweave_tracked(
+    request: Request,
+    prompt: str,
+    priority: Literal["interactive", "background"] = "interactive",
+    user: User = Depends(get_current_user),
+):
+    return await _ask(request, prompt, user.id, priority)
+
+@router.websocket("/neuroweave/stream/{client_id}")
+async def neuroweave_stream(websocket: WebSocket, client_id: str, user: User = Depends(get_current_user_ws)):
+    async def build_job(message: dict) -> dict:
+        memories = await agent_context(message["prompt"], user.id)
+        return {"prompt": message["prompt"], "memories": memories}
+
+    await serve_websocket(websocket, "neuroweave", build_job)
 
 @router.get("/neuroweave/test")
 async def neuroweave_test():
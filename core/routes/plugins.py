@@ -1,15 +1,59 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException
 
+from core.plugins import PluginError, UnknownPlugin, execute, parse_chain, registry, run_chain, sandbox_stats
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
 router = APIRouter()
 
 @router.get("/plugins/list")
 async def list_plugins():
-    return {"status": "ok", "plugins": []}
+    return {
+        "status": "ok",
+        "plugins": [registry.info(name) for name in registry.names()],
+        "sandbox": sandbox_stats(),
+    }
 
 @router.post("/plugins/execute")
-async def execute_plugin(data: dict):
-    return {"status": "ok", "result": None}
+async def execute_plugin(data: dict, x_trace_id: str | None = Header(None)):
+    name = data.get("name")
+    if not name:
+        raise HTTPException(400, "Plugin name required")
+    try:
+        result, duration_ms = await execute(name, data.get("input") or {})
+    except UnknownPlugin:
+        raise HTTPException(404, f"Unknown plugin {name}")
+    except PluginError as exc:
+        logger.warning(f"Plugin {name} failed in sandbox ({exc.kind}): {exc}")
+        return {
+            "status": "error",
+            "result": None,
+            "error": str(exc),
+            "error_kind": exc.kind,
+            "trace_id": x_trace_id,
+        }
+    except Exception as exc:
+        logger.warning(f"Plugin {name} failed: {exc!r}")
+        return {
+            "status": "error",
+            "result": None,
+            "error": str(exc) or type(exc).__name__,
+            "error_kind": "plugin",
+            "trace_id": x_trace_id,
+        }
+    return {
+        "status": "ok",
+        "result": result,
+        "duration_ms": round(duration_ms, 3),
+        "trace_id": x_trace_id,
+    }
 
 @router.post("/plugins/chain")
 async def execute_plugin_chain(data: dict):
-    return {"status": "ok", "results": []}
+    try:
+        steps = parse_chain(data.get("plugins") or [])
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
+    results, timing = await run_chain(steps)
+    status = "ok" if all(r["status"] == "ok" for r in results) else "partial"
+    return {"status": status, "results": results, "metadata": {**(data.get("metadata") or {}), **timing}}
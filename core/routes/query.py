@@ -1,7 +1,20 @@
-from fastapi import APIRouter
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from db.database import query_log
 
 router = APIRouter()
 
 @router.get("/queries/recent")
-async def recent_queries(limit: int = 10):
-    return []
+async def recent_queries(limit: int = Query(10, ge=1, le=1000)):
+    return query_log.recent(limit)
+
+@router.get("/queries/slow")
+async def slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    sort: Literal["total_ms", "p95_ms", "p99_ms", "count", "max_ms"] = "total_ms",
+):
+    """Per-fingerprint aggregates. Sorting by ``count`` or ``total_ms`` puts
+    N+1 patterns (cheap statements run many times) at the top."""
+    return query_log.aggregates(limit, sort)
@@ -1,10 +1,53 @@
-from fastapi import APIRouter
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Request, WebSocket
+
+from core.agents import open_agent_stream, register_agent, run_agent
+from core.agents.streaming import replay, serve_websocket, sse_response, wants_event_stream
+from core.cache.response_cache import response_cache
+from core.memory import agent_context
+from core.utils.dependencies import get_current_user, get_current_user_ws
+from db.models import User
 
 router = APIRouter()
 
+register_agent("rootbloom")
+
+
 @router.post("/rootbloom/generate")
-async def generate_content(prompt: str, context: dict | None = None):
-    return {"agent": "rootbloom", "response": "generated", "timestamp": "now"}
+async def generate_content(
+    request: Request,
+    prompt: str,
+    context: dict | None = None,
+    priority: Literal["interactive", "background"] = "interactive",
+    user: User = Depends(get_current_user),
+):
+    memories = await agent_context(prompt, user.id)
+    job = {"prompt": prompt, "context": context, "memories": memories}
+    if wants_event_stream(request):
+        cached = await response_cache.get("rootbloom", job)
+        if cached is not None:
+            chunks = replay(cached)
+        else:
+            chunks = await open_agent_stream("rootbloom", job, priority)
+        return sse_response("rootbloom", chunks, metadata={"memories": memories})
+    response = await response_cache.get_or_compute(
+        "rootbloom", job, lambda: run_agent("rootbloom", job, priority, batch_key="generate")
+    )
+    return {
+        "agent": "rootbloom",
+        "response": response,
+        "timestamp": "now",
+        "metadata": {"memories": memories},
+    }
+
+@router.websocket("/rootbloom/stream/{client_id}")
+async def rootbloom_stream(websocket: WebSocket, client_id: str, user: User = Depends(get_current_user_ws)):
+    async def build_job(message: dict) -> dict:
+        memories = await agent_context(message["prompt"], user.id)
+        return {"prompt": message["prompt"], "context": message.get("context"), "memories": memories}
+
+    await serve_websocket(websocket, "rootbloom", build_job)
 
 @router.get("/rootbloom/health")
 async def rootbloom_health():
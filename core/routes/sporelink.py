@@ -1,10 +1,36 @@
-from fastapi import APIRouter
+from typing import Literal
+
+from fastapi import APIRouter, Depends
+
+from core.agents import register_agent, run_agent
+from core.cache.response_cache import response_cache
+from core.memory import agent_context
+from core.utils.dependencies import get_current_user
+from db.models import User
 
 router = APIRouter()
 
+register_agent("sporelink")
+
+
 @router.post("/sporelink/analyze")
-async def analyze_market(prompt: str, context: dict | None = None):
-    return {"agent": "sporelink", "response": "analysis", "timestamp": "now"}
+async def analyze_market(
+    prompt: str,
+    context: dict | None = None,
+    priority: Literal["interactive", "background"] = "interactive",
+    user: User = Depends(get_current_user),
+):
+    memories = await agent_context(prompt, user.id)
+    job = {"prompt": prompt, "context": context, "memories": memories}
+    response = await response_cache.get_or_compute(
+        "sporelink", job, lambda: run_agent("sporelink", job, priority, batch_key="analyze")
+    )
+    return {
+        "agent": "sporelink",
+        "response": response,
+        "timestamp": "now",
+        "metadata": {"memories": memories},
+    }
 
 @router.get("/sporelink/market/{symbol}")
 async def get_market_data(symbol: str):
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+
+from core.memory import recall, remember, user_namespace
+from core.utils.dependencies import get_current_user
+from db.models import User
 
 router = APIRouter()
 
@@ -14,6 +18,17 @@ async def get_memory_state():
 async def get_memory_chain(user: str):
     return []
 
+@router.post("/state/memory")
+async def add_memory(text: str = Body(..., embed=True), user: User = Depends(get_current_user)):
+    if not text.strip():
+        raise HTTPException(400, "Memory text required")
+    await remember(user_namespace(user.id), [text], {"user": user.id})
+    return {"status": "saved"}
+
+@router.get("/state/memory/search")
+async def search_memory(q: str, k: int = Query(5, ge=1, le=50), user: User = Depends(get_current_user)):
+    return await recall(q, namespaces=[user_namespace(user.id)], k=k)
+
 @router.delete("/state/memory/{key}")
 async def delete_memory_value(key: str):
     return {"status": "deleted"}
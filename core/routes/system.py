@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Response
-from fastapi.responses import StreamingResponse
-from io import BytesIO
+
+from core.cache.versions import versions
 
 router = APIRouter()
 
@@ -10,6 +10,7 @@ async def system_state():
 
 @router.post("/system/mode")
 async def set_system_mode(mode: str):
+    await versions.bump("system")
     return {"status": "ok", "mode": mode}
 
 @router.get("/core/status")
@@ -18,6 +19,7 @@ async def core_status():
 
 @router.post("/core/safe-mode/toggle")
 async def toggle_safe_mode():
+    await versions.bump("system")
     return {"status": "ok"}
 
 @router.get("/system/memory/{user}")
@@ -30,5 +32,6 @@ async def dashboard_summary():
 
 @router.get("/system/export/pdf/{user}")
 async def export_user_memory_pdf(user: str):
-    pdf_bytes = BytesIO(b"PDF data for " + user.encode())
-    return StreamingResponse(pdf_bytes, media_type="application/pdf")
+    # one body rather than a stream, so it is compressed in one piece
+    pdf_bytes = b"PDF data for " + user.encode()
+    return Response(pdf_bytes, media_type="application/pdf")
@@ -1,10 +1,11 @@
 # core/routes/users.py
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.schemas import UserRead, UserUpdate
+from core.cache.versions import versions
+from core.schemas import UserRead, UserUpdate, user_read_json
 from db.database    import get_db
 from db.models      import User
 
@@ -16,18 +17,11 @@ async def list_users(
     per_page: int = Query(20, ge=1),
     db:       AsyncSession = Depends(get_db),
 ):
-    # fetch page
-    stmt = select(User).offset((page - 1) * per_page).limit(per_page)
+    # fetch page: just the columns UserRead needs, encoded without a model per row
+    stmt = select(*user_read_json.columns(User)).offset((page - 1) * per_page).limit(per_page)
     res  = await db.execute(stmt)
-    users = res.scalars().all()
-
-    # fetch total count
-    total = await db.execute(select(func.count()).select_from(User))
-    count = total.scalar_one()
-
-    # you can include pagination metadata in headers or wrap in a dict, e.g.:
-    # return {"users": users, "total": count, "page": page, "per_page": per_page}
-    return users
+    users = res.all()
+    return Response(user_read_json.many(users), media_type="application/json")
 
 @router.get("/users/{user_id}", response_model=UserRead)
 async def get_user(
@@ -37,7 +31,7 @@ async def get_user(
     user = await db.get(User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
-    return user
+    return Response(user_read_json.one(user), media_type="application/json")
 
 @router.put("/users/{user_id}", response_model=UserRead)
 async def update_user(
@@ -55,8 +49,9 @@ async def update_user(
         setattr(user, field, val)
 
     await db.commit()
+    await versions.bump(f"user:{user_id}")
     await db.refresh(user)
-    return user
+    return Response(user_read_json.one(user), media_type="application/json")
 
 @router.delete("/users/{user_id}")
 async def delete_user(
@@ -68,4 +63,5 @@ async def delete_user(
         raise HTTPException(404, "User not found")
     await db.delete(user)
     await db.commit()
+    await versions.bump(f"user:{user_id}")
     return {"message": f"User {user_id} deleted"}
@@ -1,15 +1,96 @@
-from fastapi import APIRouter
+import asyncio
+from datetime import datetime, timezone
+
+import bcrypt
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache.attempts import verify_guard
+from core.config.settings import settings
+from core.utils import totp
+from core.utils.dependencies import get_current_user
+from db.database import get_db
+from db.models import User
 
 router = APIRouter()
 
+# codes stay valid for one step either side of now; remember them that long
+_WINDOW = 1
+_USED_TTL = totp.STEP * (2 * _WINDOW + 1)
+
+async def _reserve_attempt(key: str) -> str:
+    attempt, wait = await verify_guard.reserve(key)
+    if attempt is None:
+        raise HTTPException(
+            429,
+            "Too many failed attempts; try again later",
+            headers={"Retry-After": str(int(wait) + 1)},
+        )
+    return attempt
+
+async def _check_totp(key: str, secret: str, code: str) -> str | None:
+    """``None`` when ``code`` is valid and unused, else why not."""
+    counter = totp.match(secret, code, window=_WINDOW)
+    if counter is None:
+        return "Invalid code"
+    if not await verify_guard.claim(key, counter, _USED_TTL):
+        return "Code already used"
+    return None
+
+async def _failed(key: str, attempt: str, message: str) -> dict:
+    locked, remaining = await verify_guard.record_failure(key, attempt)
+    if locked:
+        message = "Too many failed attempts; account locked"
+    return {"success": False, "message": message, "attempts_remaining": remaining}
+
 @router.post("/verify")
-async def verify_code(data: dict):
-    return {"success": True}
+async def verify_code(data: dict, user: User = Depends(get_current_user)):
+    key = str(user.id)
+    is_pin = data.get("type") == "pin"
+    if not is_pin and not user.totp_secret:
+        raise HTTPException(400, "Two-factor authentication is not set up")
+    # counted before checking, so parallel guesses can't outrun the lockout
+    attempt = await _reserve_attempt(key)
+
+    code = str(data.get("code") or "")
+    if is_pin:
+        ok = bool(user.pin_hash) and await asyncio.to_thread(
+            bcrypt.checkpw, code.encode(), user.pin_hash.encode()
+        )
+        problem = None if ok else "Invalid code"
+    else:
+        problem = await _check_totp(key, user.totp_secret, code)
+
+    if problem is None:
+        await verify_guard.record_success(key)
+        return {"success": True}
+    return await _failed(key, attempt, problem)
 
 @router.post("/verify/setup")
-async def verify_setup():
-    return {"secret": "secret", "uri": "uri", "qr_code": "qr"}
+async def verify_setup(
+    data: dict | None = Body(None),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Enroll in TOTP. The secret is only handed out when it is created:
+    on first enrollment, or on a rotation proven with a current code."""
+    data = data or {}
+    if user.totp_secret:
+        if not data.get("rotate"):
+            raise HTTPException(409, "Two-factor authentication is already set up")
+        key = str(user.id)
+        attempt = await _reserve_attempt(key)
+        problem = await _check_totp(key, user.totp_secret, str(data.get("code") or ""))
+        if problem is not None:
+            return await _failed(key, attempt, problem)
+        await verify_guard.record_success(key)
+    user.totp_secret = totp.generate_secret()
+    await db.commit()
+    uri = totp.provisioning_uri(user.totp_secret, user.username, settings.TOTP_ISSUER)
+    qr_code = await asyncio.to_thread(totp.qr_png_base64, uri)
+    return {"secret": user.totp_secret, "uri": uri, "qr_code": qr_code}
 
 @router.get("/verify/stats")
 async def verify_stats():
-    return {"success_count": 0, "failure_count": 0, "locked_users": 0, "timestamp": "now"}
+    stats = await verify_guard.stats()
+    return {**stats, "timestamp": datetime.now(timezone.utc).isoformat()}
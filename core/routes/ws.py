@@ -10,19 +10,14 @@ logger = get_logger(__name__)
 
 @router.websocket("/ws/logs")
 async def websocket_logs(websocket: WebSocket, user=Depends(get_current_user_ws)):
-    await manager.connect(user.id, websocket)
+    connection = await manager.connect(websocket, user.id)
 
     # ✅ Emit "connected" message to client
-    await manager.send_to_user(user.id, {
+    await manager.send(connection, {
         "type": "connect",
         "message": f"🔒 Authenticated as {user.username}",
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": datetime.now(timezone.utc),
     })
 
-    try:
-        while True:
-            await websocket.receive_text()  # optional keep-alive
-    except Exception as e:
-        logger.warning(f"WebSocket error: {e}")
-    finally:
-        manager.disconnect(user.id, websocket)
\ No newline at end of file
+    # answers the manager's pings; dead peers are reaped by the heartbeat
+    await manager.serve(connection)
\ No newline at end of file
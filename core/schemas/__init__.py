@@ -1,3 +1,13 @@
-from .user import UserCreate, UserLogin, UserRead, UserUpdate
+from .feedback import FeedbackAnalyze, FeedbackApprove, FeedbackSubmit
+from .user import UserCreate, UserLogin, UserRead, UserUpdate, user_read_json
 
-__all__ = ["UserCreate", "UserLogin", "UserRead", "UserUpdate"]
+__all__ = [
+    "FeedbackAnalyze",
+    "FeedbackApprove",
+    "FeedbackSubmit",
+    "UserCreate",
+    "UserLogin",
+    "UserRead",
+    "UserUpdate",
+    "user_read_json",
+]
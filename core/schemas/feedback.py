@@ -0,0 +1,17 @@
+# core/schemas/feedback.py
+from pydantic import BaseModel, Field
+
+
+class FeedbackSubmit(BaseModel):
+    message: str = Field(..., max_length=10_000)
+    feedback_type: str = Field("general", min_length=1, max_length=32)
+
+
+class FeedbackAnalyze(BaseModel):
+    # without a message, a batch job over unscored pending items is queued
+    message: str | None = Field(None, max_length=10_000)
+    feedback_type: str | None = Field(None, max_length=32)
+
+
+class FeedbackApprove(BaseModel):
+    ids: list[int] = Field(..., max_length=1000)
@@ -1,8 +1,10 @@
 # core/schemas/user.py
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import AliasChoices, BaseModel, Field, EmailStr
 from typing  import Optional
 from datetime import datetime
 
+from core.utils.responses import ModelSerializer
+
 class UserCreate(BaseModel):
     username: str = Field(..., min_length=3, description="Username must be at least 3 characters")
     password: str = Field(..., min_length=8, description="Password must be at least 8 characters")
@@ -43,7 +45,8 @@ class UserRead(BaseModel):
     username:       str
     email:          Optional[EmailStr]
     pending_email:  Optional[EmailStr] = None
-    verified:       bool
+    # the model column is ``is_verified``
+    verified:       bool = Field(validation_alias=AliasChoices("verified", "is_verified"))
     is_active:      bool
     created_at:     datetime
     avatar:         Optional[str] = None
@@ -63,6 +66,10 @@ class UserRead(BaseModel):
         }
     }
 
+# /users and /auth/me encode users with this rather than validating a
+# UserRead per row; the columns were validated on the way in
+user_read_json = ModelSerializer(UserRead, attributes={"verified": "is_verified"})
+
 class UserUpdate(BaseModel):
     username:      Optional[str]     = Field(None, min_length=3)
     email:         Optional[EmailStr]
@@ -0,0 +1,117 @@
+# core/static.py
+"""The built frontend, served from memory with every compressed variant
+prepared once at startup."""
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from starlette.datastructures import Headers
+
+from core.config.settings import settings
+from core.middleware.compression import Codec, available_codecs, compressible, negotiate
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Vite content-hashes everything under assets/, so those never change
+_IMMUTABLE = "public, max-age=31536000, immutable"
+_REVALIDATE = "no-cache"
+
+
+@dataclass
+class _Asset:
+    content_type: str
+    tag: str  # content hash; the ETag adds the coding
+    cache_control: str
+    bodies: dict[str, bytes] = field(default_factory=dict)  # coding -> body; "identity" always
+
+
+class PrecompressedStatic:
+    """ASGI app for a static directory.
+
+    :meth:`load` reads every file and compresses the compressible ones with
+    each installed codec at its highest level, keeping a variant only when
+    it is smaller. Requests then just pick the negotiated variant. Paths
+    without a file extension fall back to ``index.html`` so client-side
+    routes load the app.
+    """
+
+    def __init__(self, directory: str | Path, codecs: list[Codec] | None = None, index: str = "index.html"):
+        self.directory = Path(directory)
+        self.codecs = available_codecs(fast=False) if codecs is None else codecs
+        self.index = index
+        self.assets: dict[str, _Asset] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.assets)
+
+    def load(self) -> int:
+        """Read and precompress the directory; returns the number of files.
+        Blocking -- run it in a thread."""
+        assets = {}
+        if self.directory.is_dir():
+            for path in sorted(p for p in self.directory.rglob("*") if p.is_file()):
+                name = path.relative_to(self.directory).as_posix()
+                assets[name] = self._prepare(name, path.read_bytes())
+        self.assets = assets
+        if assets:
+            logger.info(f"Serving {len(assets)} static files from {self.directory}")
+        return len(assets)
+
+    def _prepare(self, name: str, body: bytes) -> _Asset:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        asset = _Asset(
+            content_type=content_type,
+            tag=hashlib.blake2b(body, digest_size=12).hexdigest(),
+            cache_control=_IMMUTABLE if name.startswith("assets/") else _REVALIDATE,
+            bodies={"identity": body},
+        )
+        if compressible(content_type) and len(body) >= settings.COMPRESSION_MIN_SIZE:
+            for codec in self.codecs:
+                compressed = codec.compress(body)
+                if len(compressed) < len(body):
+                    asset.bodies[codec.name] = compressed
+        return asset
+
+    def match(self, path: str) -> _Asset | None:
+        name = path.lstrip("/") or self.index
+        asset = self.assets.get(name)
+        if asset is None and "." not in name.rsplit("/", 1)[-1]:
+            asset = self.assets.get(self.index)
+        return asset
+
+    async def __call__(self, scope, receive, send):
+        asset = self.match(scope["path"])
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            status = 404 if asset is None else 405
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        request_headers = Headers(scope=scope)
+        codecs = [codec for codec in self.codecs if codec.name in asset.bodies]
+        codec = negotiate(request_headers.get("accept-encoding"), codecs)
+        etag = f'"{asset.tag}-{codec.name}"' if codec else f'"{asset.tag}"'
+        headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", asset.cache_control.encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if etag in request_headers.get("if-none-match", ""):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        body = asset.bodies[codec.name if codec else "identity"]
+        if codec is not None:
+            headers.append((b"content-encoding", codec.name.encode()))
+        headers += [
+            (b"content-type", asset.content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
@@ -1 +1,6 @@
-from .email import send_email
+def __getattr__(name: str):
+    # every module imports core.utils.logger; don't make them all pay for SMTP
+    if name == "send_email":
+        from .email import send_email
+        return send_email
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,76 @@
+# core/utils/backoff.py
+"""Exponential backoff with full jitter."""
+import asyncio
+import itertools
+import random
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def forever(base: float, cap: float) -> Iterator[float]:
+    """Endless backoff delays for background reconnection.
+
+    Parameters
+    ----------
+    base: float
+        Upper bound of the first delay in seconds; doubled on every retry.
+    cap: float
+        Largest delay in seconds.
+
+    Yields
+    ------
+    float
+        Delays drawn uniformly from ``[0, min(cap, base * 2**n)]``, which keeps
+        workers that fail together from retrying in lockstep.
+    """
+    ceiling = base
+    while True:
+        yield random.uniform(0, ceiling)
+        ceiling = min(cap, ceiling * 2)
+
+
+def delays(attempts: int, base: float, cap: float) -> list[float]:
+    """Sleep before each retry after the first attempt: the first
+    ``attempts - 1`` values of :func:`forever`."""
+    return list(itertools.islice(forever(base, cap), max(attempts - 1, 0)))
+
+
+async def retry(
+    name: str,
+    attempt: Callable[[], Awaitable[T]],
+    attempts: int,
+    base: float,
+    cap: float,
+) -> T:
+    """Await ``attempt()`` until it succeeds, backing off between failures.
+
+    Parameters
+    ----------
+    name: str
+        What is being retried, for the log.
+    attempt: Callable[[], Awaitable[T]]
+        One try; any exception counts as a failure.
+    attempts, base, cap:
+        As for :func:`delays`.
+
+    Returns
+    -------
+    T
+        The first successful result. The last failure is re-raised once
+        every attempt has failed.
+    """
+    attempts = max(attempts, 1)
+    pauses = delays(attempts, base, cap)
+    for number in range(1, attempts + 1):
+        try:
+            return await attempt()
+        except Exception as exc:
+            logger.error(f"{name} attempt {number}/{attempts} failed: {exc}")
+            if number == attempts:
+                raise
+            await asyncio.sleep(pauses[number - 1])
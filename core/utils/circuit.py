@@ -0,0 +1,121 @@
+# core/utils/circuit.py
+"""Circuit breaker shared by the Redis client and the database sessions."""
+import time
+from typing import Callable, Literal
+
+from core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+State = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} unavailable (circuit open)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fail fast while a dependency is down.
+
+    ``failure_threshold`` consecutive failures open the circuit: calls are
+    rejected without touching the dependency for ``reset_timeout`` seconds.
+    After that the circuit is half open and admits one trial call at a
+    time; its success closes the circuit, its failure opens it again.
+    Successes observed some other way (a background probe) close it too.
+
+    Parameters
+    ----------
+    name: str
+        Dependency name, for logs and errors.
+    failure_threshold: int
+        Consecutive failures that open the circuit.
+    reset_timeout: float
+        Seconds the circuit stays open before a trial call is let through.
+    on_open, on_close: Callable[[], None], optional
+        Called on the transitions, e.g. to start or stop reconnecting.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+        on_open: Callable[[], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_open = on_open
+        self.on_close = on_close
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_at: float | None = None
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> State:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def allow(self) -> bool:
+        """Whether a call may go to the dependency now."""
+        state = self.state
+        if state == "closed":
+            return True
+        now = time.monotonic()
+        # half open: one trial at a time; a trial that never reported back
+        # within reset_timeout is presumed lost
+        if state == "half_open" and (self._trial_at is None or now - self._trial_at > self.reset_timeout):
+            self._trial_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self) -> None:
+        """:meth:`allow` or raise :class:`CircuitOpenError`."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.opened_at is not None:
+            self.opened_at = self._trial_at = None
+            logger.info(f"{self.name} circuit closed")
+            if self.on_close:
+                self.on_close()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.opened_at is not None:  # failed trial: stay open for another period
+            self.opened_at = time.monotonic()
+            self._trial_at = None
+        elif self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(f"{self.name} circuit opened after {self.failures} failures")
+            if self.on_open:
+                self.on_open()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": round(self.retry_after(), 3),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -1,18 +1,38 @@
 # core/utils/dependencies.py
+from contextvars import ContextVar
+
 from fastapi import Header, Depends, HTTPException, Query, WebSocketException
 from jose import JWTError, jwt
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.config.settings import settings
 from db.database import get_db
-from db.models import User
+from db.models import User, BlacklistedToken
 from core.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+async def load_token_user(db: AsyncSession, user_id: int, token: str) -> tuple[User | None, bool]:
+    """The token's user and whether the token was revoked, in one query."""
+    revoked = exists().where(BlacklistedToken.token == BlacklistedToken.digest(token))
+    row = (await db.execute(
+        select(User, revoked.label("revoked")).where(User.id == user_id)
+    )).one_or_none()
+    if row is None:
+        return None, False
+    return row.User, row.revoked
+
+# (Authorization header, user) already checked for this context; set by
+# POST /api/batch so its sub-requests don't each repeat the lookup
+preauthenticated: ContextVar[tuple[str, User] | None] = ContextVar("preauthenticated", default=None)
+
 async def get_current_user(
     authorization: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
 ):
+    known = preauthenticated.get()
+    if known is not None and known[0] == authorization:
+        return known[1]
     if not authorization or not authorization.startswith("Bearer "):
         logger.warning("Missing or malformed Authorization header")
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -25,7 +45,10 @@ async def get_current_user(
         logger.error(f"Invalid token: {e}")
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = await db.get(User, user_id)
+    user, revoked = await load_token_user(db, user_id, token)
+    if revoked:
+        logger.warning(f"Revoked token used for user {user_id}")
+        raise HTTPException(status_code=401, detail="Token revoked")
     if not user:
         logger.error(f"User not found: {user_id}")
         raise HTTPException(status_code=404, detail="User not found")
@@ -42,8 +65,16 @@ async def get_current_user_ws(
         logger.warning(f"WS auth failed: {e}")
         raise WebSocketException(code=1008)
 
-    user = await db.get(User, user_id)
-    if not user:
-        logger.warning(f"WS user not found: {user_id}")
+    user, revoked = await load_token_user(db, user_id, token)
+    # the socket outlives the handshake; don't pin a pooled connection to it
+    await db.close()
+    if not user or revoked:
+        logger.warning(f"WS user not found or token revoked: {user_id}")
         raise WebSocketException(code=1008)
-    return user
\ No newline at end of file
+    return user
+
+async def get_admin_user(user: User = Depends(get_current_user)):
+    if user.username not in settings.ADMIN_USERNAMES:
+        logger.warning(f"Non-admin user {user.id} denied an admin route")
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
@@ -1,12 +1,12 @@
 # core/utils/email.py
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from email.message import EmailMessage
 from email.utils import formataddr
 
 import aiosmtplib
-from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound
 
 from core.config.settings import settings
 
@@ -16,10 +16,17 @@ from core.config.settings import settings
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 TEMPLATES_DIR = PROJECT_ROOT / "frontend" / "templates"
 
-jinja_env = Environment(
-    loader=FileSystemLoader(str(TEMPLATES_DIR)),
-    autoescape=select_autoescape(["html", "xml"]),
-)
+
+@lru_cache(maxsize=1)
+def jinja_env():
+    """Template environment, built on the first email sent; most workers
+    never send one, so they never import Jinja."""
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(["html", "xml"]),
+    )
 
 
 async def send_email(
@@ -32,9 +39,11 @@ async def send_email(
     Render the given Jinja2 template with `context` and send it.
     If the template isn't found, falls back to a plain-text `context['body']`.
     """
+    from jinja2 import TemplateNotFound
+
     # 1) Render HTML or fallback to plain text
     try:
-        template = jinja_env.get_template(template_name)
+        template = jinja_env().get_template(template_name)
         html_body = template.render(**context)
     except TemplateNotFound:
         html_body = context.get("body", "")
@@ -0,0 +1,87 @@
+# core/utils/responses.py
+"""JSON responses encoded with orjson."""
+from operator import attrgetter
+from typing import Any, Iterable
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    # whatever orjson has no native encoding for (models, Decimals, sets,
+    # ...) is encoded the way FastAPI would encode it
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` as JSON bytes.
+
+    Parameters
+    ----------
+    content: Any
+        Anything FastAPI can return. ``dict``/``list``/``str``/numbers,
+        datetimes, UUIDs, dataclasses and numpy arrays are encoded in
+        orjson's C code; other types fall back to ``jsonable_encoder``.
+
+    Returns
+    -------
+    bytes
+        Compact UTF-8 JSON.
+    """
+    return orjson.dumps(
+        content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """The app's default response class.
+
+    FastAPI still runs ``jsonable_encoder`` over what a route returns before
+    rendering it; a route with a large payload can skip that by returning
+    ``FastJSONResponse(content)`` itself.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ModelSerializer:
+    """Precompiled JSON encoder for one response model.
+
+    Reads the model's fields straight off ORM objects or result rows and
+    encodes them with orjson, without building (or validating) a model
+    instance per item. The output matches ``model_dump_json`` for data that
+    passed the model's validation on the way in.
+
+    Parameters
+    ----------
+    model: type[BaseModel]
+        The response model; its field names are the JSON keys.
+    attributes: dict[str, str], optional
+        Source attribute for fields whose name differs from it.
+    """
+
+    def __init__(self, model: type[BaseModel], attributes: dict[str, str] | None = None):
+        attributes = attributes or {}
+        self.model = model
+        self.keys = tuple(model.model_fields)
+        self.attributes = tuple(attributes.get(key, key) for key in self.keys)
+        self._values = attrgetter(*self.attributes)
+
+    def columns(self, entity) -> list:
+        """The entity's columns for the model, to select just those."""
+        return [getattr(entity, attribute) for attribute in self.attributes]
+
+    def _item(self, obj) -> dict:
+        values = self._values(obj)
+        if len(self.keys) == 1:
+            values = (values,)
+        return dict(zip(self.keys, values))
+
+    def one(self, obj) -> bytes:
+        return orjson.dumps(self._item(obj), option=orjson.OPT_UTC_Z)
+
+    def many(self, objs: Iterable) -> bytes:
+        return orjson.dumps([self._item(obj) for obj in objs], option=orjson.OPT_UTC_Z)
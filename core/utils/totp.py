@@ -0,0 +1,62 @@
+# core/utils/totp.py
+"""RFC 6238 time-based one-time passwords (HMAC-SHA1, 6 digits, 30 s steps)."""
+import base64
+import hashlib
+import hmac
+import io
+import secrets
+import struct
+import time
+from urllib.parse import quote, urlencode
+
+STEP = 30
+DIGITS = 6
+
+
+def generate_secret() -> str:
+    """Random 160-bit secret, base32 encoded as authenticator apps expect."""
+    return base64.b32encode(secrets.token_bytes(20)).decode().rstrip("=")
+
+
+def _key(secret: str) -> bytes:
+    padded = secret.upper() + "=" * (-len(secret) % 8)
+    return base64.b32decode(padded)
+
+
+def code_at(secret: str, counter: int) -> str:
+    digest = hmac.new(_key(secret), struct.pack(">Q", counter), hashlib.sha1).digest()
+    offset = digest[-1] & 0x0F
+    value = struct.unpack(">I", digest[offset:offset + 4])[0] & 0x7FFFFFFF
+    return str(value % 10 ** DIGITS).zfill(DIGITS)
+
+
+def match(secret: str, code: str, window: int = 1, now: float | None = None) -> int | None:
+    """Return the time-step counter ``code`` is valid for, or ``None``.
+
+    Codes from ``window`` steps either side of now are accepted to allow for
+    clock drift. The counter is what replay protection should remember.
+    """
+    code = code.strip()
+    if len(code) != DIGITS or not code.isdigit():
+        return None
+    current = int((time.time() if now is None else now) // STEP)
+    for counter in range(current - window, current + window + 1):
+        if hmac.compare_digest(code_at(secret, counter), code):
+            return counter
+    return None
+
+
+def provisioning_uri(secret: str, account: str, issuer: str) -> str:
+    label = quote(f"{issuer}:{account}")
+    query = urlencode({"secret": secret, "issuer": issuer, "digits": DIGITS, "period": STEP})
+    return f"otpauth://totp/{label}?{query}"
+
+
+def qr_png_base64(uri: str) -> str:
+    """PNG QR code for ``uri``, base64 encoded. Not cached: ``uri`` carries
+    the secret, and each one is rendered once, when it is issued."""
+    import segno  # only needed when 2FA is being set up
+
+    buffer = io.BytesIO()
+    segno.make(uri, error="m").save(buffer, kind="png", scale=5)
+    return base64.b64encode(buffer.getvalue()).decode()
@@ -0,0 +1,120 @@
+# core/websocket/protocol.py
+"""Wire formats for the realtime sockets.
+
+Sockets get JSON text frames unless the client offers the ``MSGPACK``
+subprotocol in its handshake; then every frame is a msgpack map. In those
+frames, datetimes are integer milliseconds since the epoch and the field
+names in ``KEYS`` are sent as their index in it, at any depth. Names not in
+``KEYS`` stay strings, so decoders map integer keys back and pass the rest
+through. ``KEYS`` is append-only; a change to it bumps ``MSGPACK``.
+"""
+from datetime import datetime, timezone
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import msgpack
+except ImportError:  # optional: without it every socket speaks JSON
+    msgpack = None
+
+MSGPACK = "hyphae.msgpack.v1"
+
+KEYS = (
+    "type",
+    "message",
+    "timestamp",
+    "payload",
+    "data",
+    "status",
+    "symbol",
+    "price",
+    "change",
+    "cpu_usage",
+    "memory_usage",
+    "seq",
+)
+_KEY_IDS = {key: index for index, key in enumerate(KEYS)}
+
+
+def available() -> bool:
+    return msgpack is not None
+
+
+def negotiate(offered: list[str]) -> str | None:
+    """The subprotocol to accept from those the client offered."""
+    return MSGPACK if MSGPACK in offered and available() else None
+
+
+def epoch_ms(value: datetime) -> int:
+    if value.tzinfo is None:  # naive datetimes in this codebase are UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _intern(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {_KEY_IDS.get(key, key): _intern(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_intern(item) for item in value]
+    return value
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return epoch_ms(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} for msgpack frames")
+
+
+def packb(data: Any) -> bytes:
+    """``data`` as a msgpack frame."""
+    return msgpack.packb(_intern(data), default=_msgpack_default)
+
+
+def unpackb(frame: bytes) -> Any:
+    """A msgpack frame back into ``data``, field names restored; datetimes
+    stay epoch milliseconds. The reference decoder for clients and tests."""
+
+    def restore(value):
+        if isinstance(value, dict):
+            return {KEYS[key] if isinstance(key, int) else key: restore(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [restore(item) for item in value]
+        return value
+
+    return restore(msgpack.unpackb(frame, strict_map_key=False))
+
+
+def socketio_packet():
+    """Socket.IO packet class for the msgpack-serialized market server: the
+    standard msgpack parser's format, so stock clients decode it; only
+    datetimes change, to epoch milliseconds. Field names are not interned
+    there."""
+    from socketio.msgpack_packet import MsgPackPacket
+
+    return MsgPackPacket.configure(dumps_default=_msgpack_default)
+
+
+class Frame:
+    """One outgoing message, encoded at most once per format however many
+    sockets it goes to."""
+
+    __slots__ = ("data", "_text", "_binary")
+
+    def __init__(self, data: Any):
+        self.data = data
+        self._text: str | None = None
+        self._binary: bytes | None = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = orjson.dumps(self.data, default=jsonable_encoder, option=orjson.OPT_UTC_Z).decode()
+        return self._text
+
+    @property
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = packb(self.data)
+        return self._binary
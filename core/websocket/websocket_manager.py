@@ -1,23 +1,173 @@
-# backend/ws_manager.py
+# core/websocket/websocket_manager.py
+import asyncio
+import sys
+import time
+from contextlib import suppress
+
 from fastapi import WebSocket
-from typing import Dict
+
+from core.config.settings import settings
+from core.utils.logger import get_logger
+from core.websocket import protocol
+from core.websocket.protocol import Frame
+
+logger = get_logger(__name__)
+
+_PING = Frame({"type": "ping"})
+# close code for sockets dropped for silence or failed sends: "going away",
+# which clients treat as worth a reconnect
+_GOING_AWAY = 1001
+
+
+class Connection:
+    """What the manager keeps per socket. Slotted: with tens of thousands
+    of sockets per worker, a per-instance ``__dict__`` would cost more than
+    the fields themselves."""
+
+    __slots__ = ("websocket", "user_id", "binary", "opened", "last_seen")
+
+    def __init__(self, websocket: WebSocket, user_id: int | None, now: float, binary: bool = False):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.binary = binary  # msgpack frames instead of JSON text
+        self.opened = now
+        self.last_seen = now
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, list[WebSocket]] = {}
+    """Open sockets of one endpoint, with server-driven heartbeats.
+
+    A single task per manager pings every socket each ``heartbeat_interval``
+    seconds; clients answer with any message (``{"type": "pong"}``). A
+    socket silent for ``idle_timeout`` seconds, or whose send fails or
+    stalls for ``send_timeout``, is closed and dropped, so dead peers stop
+    being written to. The heartbeat task runs only while sockets are open.
+
+    Clients offering the :data:`~core.websocket.protocol.MSGPACK`
+    subprotocol get msgpack frames; a message sent to many sockets is
+    encoded once per format, not once per socket.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        heartbeat_interval: float | None = None,
+        idle_timeout: float | None = None,
+        send_timeout: float | None = None,
+    ):
+        self.name = name
+        self.heartbeat_interval = heartbeat_interval or settings.WS_HEARTBEAT_INTERVAL
+        self.idle_timeout = idle_timeout or settings.WS_IDLE_TIMEOUT
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT
+        self.connections: dict[WebSocket, Connection] = {}
+        self.active_connections: dict[int, set[Connection]] = {}  # user id -> its sockets
+        self.reaped = 0
+        self._heartbeat: asyncio.Task | None = None
+
+    async def connect(self, websocket: WebSocket, user_id: int | None = None) -> Connection:
+        subprotocol = protocol.negotiate(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=subprotocol)
+        connection = Connection(websocket, user_id, time.monotonic(), binary=subprotocol is not None)
+        self.connections[websocket] = connection
+        if user_id is not None:
+            self.active_connections.setdefault(user_id, set()).add(connection)
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._beat())
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        if self.connections.pop(connection.websocket, None) is None:
+            return
+        sockets = self.active_connections.get(connection.user_id)
+        if sockets is not None:
+            sockets.discard(connection)
+            if not sockets:
+                del self.active_connections[connection.user_id]
+
+    async def serve(self, connection: Connection) -> None:
+        """Read until the client goes away, noting when it was last heard
+        from. A disconnect, clean or not, is routine and not logged."""
+        websocket = connection.websocket
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                connection.last_seen = time.monotonic()
+        except Exception as e:
+            logger.debug(f"{self.name} socket ended: {e}")
+        finally:
+            self.disconnect(connection)
+
+    async def _send(self, connection: Connection, frame: Frame) -> None:
+        websocket = connection.websocket
+        try:
+            send = websocket.send_bytes(frame.binary) if connection.binary else websocket.send_text(frame.text)
+            await asyncio.wait_for(send, self.send_timeout)
+        except Exception:
+            await self._reap(connection)
+
+    async def _reap(self, connection: Connection) -> None:
+        if connection.websocket not in self.connections:
+            return
+        self.disconnect(connection)
+        self.reaped += 1
+        with suppress(Exception):
+            await asyncio.wait_for(connection.websocket.close(_GOING_AWAY), self.send_timeout)
+
+    async def _fan_out(self, connections, frame: Frame) -> None:
+        if connections:
+            await asyncio.gather(*(self._send(connection, frame) for connection in connections))
+
+    async def send(self, connection: Connection, data: dict) -> None:
+        await self._send(connection, Frame(data))
+
+    async def broadcast(self, data: dict) -> None:
+        await self._fan_out(list(self.connections.values()), Frame(data))
+
+    async def send_to_user(self, user_id: int, data: dict) -> None:
+        await self._fan_out(list(self.active_connections.get(user_id, ())), Frame(data))
+
+    async def _beat(self) -> None:
+        try:
+            while self.connections:
+                await asyncio.sleep(self.heartbeat_interval)
+                cutoff = time.monotonic() - self.idle_timeout
+                idle, alive = [], []
+                for connection in list(self.connections.values()):
+                    (idle if connection.last_seen < cutoff else alive).append(connection)
+                if idle:
+                    logger.info(f"Closing {len(idle)} idle {self.name} sockets")
+                await asyncio.gather(
+                    *(self._reap(connection) for connection in idle),
+                    self._fan_out(alive, _PING),
+                )
+        finally:
+            self._heartbeat = None
 
-    async def connect(self, user_id: int, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.setdefault(user_id, []).append(websocket)
+    async def close(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._heartbeat
 
-    def disconnect(self, user_id: int, websocket: WebSocket):
-        if user_id in self.active_connections:
-            self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+    def stats(self) -> dict:
+        """Socket counts and the manager's own memory for them (the sockets'
+        transport buffers belong to the server and are not included)."""
+        per_connection = sys.getsizeof(Connection(None, None, 0.0))
+        registry = (
+            sys.getsizeof(self.connections)
+            + sys.getsizeof(self.active_connections)
+            + sum(sys.getsizeof(sockets) for sockets in self.active_connections.values())
+            + per_connection * len(self.connections)
+        )
+        return {
+            "connections": len(self.connections),
+            "users": len(self.active_connections),
+            "reaped": self.reaped,
+            "bytes_per_connection": per_connection,
+            "registry_bytes": registry,
+        }
 
-    async def send_to_user(self, user_id: int, data: dict):
-        for ws in self.active_connections.get(user_id, []):
-            await ws.send_json(data)
 
-manager = ConnectionManager()
+manager = ConnectionManager("ws/logs")
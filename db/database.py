@@ -1,31 +1,183 @@
 # database.py
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 from core.config.settings import settings
 from core.utils.logger import get_logger
-import asyncio
+from core.utils.backoff import retry
+from core.utils.circuit import CircuitBreaker
+from db.query_log import QueryLog, install
 
 logger = get_logger(__name__)
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
-AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+_engine: AsyncEngine | None = None
+
+# Opened by connection failures the engine reports, closed by the next
+# statement that goes through -- the health prober's ``SELECT 1`` runs every
+# few seconds and bypasses the sessions, so it doubles as the half-open probe.
+breaker = CircuitBreaker(
+    "database",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+)
+
+
+class GuardedSessionFactory:
+    """``async_sessionmaker`` that refuses new sessions while ``breaker`` is
+    open, so requests fail with :class:`~core.utils.circuit.CircuitOpenError`
+    (a 503) at once instead of each waiting out a connect timeout."""
+
+    def __init__(self, factory: async_sessionmaker, breaker: CircuitBreaker):
+        self.factory = factory
+        self.breaker = breaker
+
+    def __call__(self, **kwargs):
+        self.breaker.check()
+        return self.factory(**kwargs)
+
+    def configure(self, **kwargs) -> None:
+        self.factory.configure(**kwargs)
+
+
+# bound to the engine by get_engine(); importing this module opens nothing
+AsyncSessionLocal = GuardedSessionFactory(async_sessionmaker(expire_on_commit=False), breaker)
 Base = declarative_base()
 
+query_log = QueryLog(size=settings.QUERY_LOG_SIZE, max_shapes=settings.QUERY_LOG_MAX_SHAPES)
+
+
+def get_engine() -> AsyncEngine:
+    """The application engine, created on first use.
+
+    The lifespan creates it through :func:`connect_db`; anything running
+    without the lifespan (scripts, tests) gets it on its first session.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+        AsyncSessionLocal.configure(bind=_engine)
+        _watch(_engine)
+        if settings.QUERY_LOG_ENABLED:
+            install(_engine, query_log)
+    return _engine
+
+
+def _watch(engine: AsyncEngine) -> None:
+    """Feed the engine's connection failures and successes to ``breaker``."""
+
+    def connect(dialect, conn_rec, cargs, cparams):
+        # refused or timed-out connects surface as plain OSErrors, which
+        # handle_error never sees
+        try:
+            return dialect.connect(*cargs, **cparams)
+        except Exception:
+            breaker.record_failure()
+            raise
+
+    def on_error(context):
+        if context.is_disconnect and context.connection is not None:  # connects counted above
+            breaker.record_failure()
+
+    def on_success(*_):
+        breaker.record_success()
+
+    event.listen(engine.sync_engine, "do_connect", connect)
+    event.listen(engine.sync_engine, "handle_error", on_error)
+    event.listen(engine.sync_engine, "after_cursor_execute", on_success)
+
+
+def __getattr__(name: str):
+    # ``from db.database import engine`` keeps working, lazily
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class SerializedSession:
+    """One ``AsyncSession`` shared by concurrent readers.
+
+    An ``AsyncSession`` allows one operation at a time; here the awaitable
+    methods take turns on a lock. ``execute`` buffers its rows, so callers
+    never hold the session between turns. A call that fails rolls the
+    session back before the next turn, so one reader's error doesn't leave
+    the others a failed transaction. ``close`` is left to the owner.
+    """
+
+    _SERIALIZED = frozenset({"execute", "scalar", "scalars", "get", "refresh", "flush", "commit", "rollback"})
+
+    def __init__(self, session):
+        self._session = session
+        self._lock = asyncio.Lock()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._session, name)
+        if name not in self._SERIALIZED:
+            return attr
+
+        async def serialized(*args, **kwargs):
+            async with self._lock:
+                try:
+                    return await attr(*args, **kwargs)
+                except Exception:
+                    await self._session.rollback()
+                    raise
+
+        return serialized
+
+    async def close(self) -> None:
+        pass
+
+
+_shared: ContextVar[SerializedSession | None] = ContextVar("shared_session", default=None)
+
+
+@asynccontextmanager
+async def shared_session():
+    """A :class:`SerializedSession` for read-only fan-out (``POST
+    /api/batch``): one checkout and one connection instead of one per
+    request. :func:`get_db` hands it out only inside :func:`use_session`."""
+    get_engine()
+    async with AsyncSessionLocal() as session:
+        yield SerializedSession(session)
+
+
+@contextmanager
+def use_session(shared: SerializedSession):
+    """Make :func:`get_db` yield ``shared`` in this context, including tasks
+    started from it. Only for handlers that don't write: they would commit
+    whatever the other sharers have pending."""
+    token = _shared.set(shared)
+    try:
+        yield shared
+    finally:
+        _shared.reset(token)
+
+
 async def get_db():
+    shared = _shared.get()
+    if shared is not None:
+        yield shared
+        return
+    get_engine()
     async with AsyncSessionLocal() as session:
         yield session
 
-async def connect_db(max_retries: int = 3, delay: float = 2.0) -> bool:
+async def connect_db(max_retries: int | None = None, delay: float | None = None) -> bool:
     """Connect to the database and create tables.
 
     Parameters
     ----------
-    max_retries: int
-        Number of connection attempts before giving up.
-    delay: float
-        Delay in seconds between retries.
+    max_retries: int, optional
+        Number of connection attempts before giving up
+        (``STARTUP_RETRIES`` by default).
+    delay: float, optional
+        First backoff delay in seconds, doubled on every retry
+        (``STARTUP_BACKOFF_BASE`` by default).
 
     Returns
     -------
@@ -34,35 +186,40 @@ async def connect_db(max_retries: int = 3, delay: float = 2.0) -> bool:
     """
     from . import models  # noqa: F401
 
-    for attempt in range(1, max_retries + 1):
-        try:
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-                # add new columns for existing tables if needed
+    engine = get_engine()
+
+    async def attempt():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # add new columns for existing tables if needed
+            for column, ddl in (("reset_token", "VARCHAR(128)"), ("totp_secret", "VARCHAR(64)")):
                 try:
                     if engine.dialect.name.startswith("postgres"):
                         await conn.execute(
-                            text(
-                                "ALTER TABLE users ADD COLUMN IF NOT EXISTS reset_token VARCHAR(128)"
-                            )
+                            text(f"ALTER TABLE users ADD COLUMN IF NOT EXISTS {column} {ddl}")
                         )
                     else:
-                        await conn.execute(
-                            text("ALTER TABLE users ADD COLUMN reset_token VARCHAR(128)")
-                        )
+                        await conn.execute(text(f"ALTER TABLE users ADD COLUMN {column} {ddl}"))
                 except Exception:
                     # column may already exist or not be alterable; ignore errors
                     pass
-            logger.info("Database connection established")
-            return True
-        except Exception as exc:
-            logger.error(f"Database connection attempt {attempt} failed: {exc}")
-            if attempt == max_retries:
-                logger.error("All database connection attempts failed; running in degraded mode")
-                return False
-            await asyncio.sleep(delay)
+
+    try:
+        await retry(
+            "Database connection",
+            attempt,
+            max_retries or settings.STARTUP_RETRIES,
+            settings.STARTUP_BACKOFF_BASE if delay is None else delay,
+            settings.STARTUP_BACKOFF_MAX,
+        )
+    except Exception:
+        logger.error("All database connection attempts failed; running in degraded mode")
+        return False
+    logger.info("Database connection established")
+    return True
 
 
 async def close_db():
-    await engine.dispose()
-    logger.info("Database connection closed")
+    if _engine is not None:
+        await _engine.dispose()
+        logger.info("Database connection closed")
@@ -1,4 +1,5 @@
 from .user import User
 from .blacklist import BlacklistedToken
+from .feedback import FeedbackItem
 
-__all__ = ["User", "BlacklistedToken"]
+__all__ = ["User", "BlacklistedToken", "FeedbackItem"]
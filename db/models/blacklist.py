@@ -1,8 +1,15 @@
 #db/models/blacklist.py
+import hashlib
+
 from sqlalchemy import Column, String
 
 from db.database import Base
 
 class BlacklistedToken(Base):
     __tablename__ = "blacklisted_tokens"
-    token = Column(String(128), primary_key=True)
\ No newline at end of file
+    # sha256 of the revoked token; raw JWTs do not fit the column
+    token = Column(String(128), primary_key=True)
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,22 @@
+#db/models/feedback.py
+from sqlalchemy import JSON, Column, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from db.database import Base
+
+class FeedbackItem(Base):
+    __tablename__ = "feedback_items"
+    # pending/approved listings are range scans on (status, id)
+    __table_args__ = (Index("ix_feedback_items_status_id", "status", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    user = Column(String(50), nullable=True)
+    message = Column(Text, nullable=False)
+    feedback_type = Column(String(32), nullable=False, default="general")
+    status = Column(String(16), nullable=False, default="pending")
+    sentiment = Column(String(16), nullable=True)
+    sentiment_score = Column(Float, nullable=True)
+    keywords = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    analyzed_at = Column(DateTime(timezone=True), nullable=True)
+    approved_at = Column(DateTime(timezone=True), nullable=True)
@@ -21,4 +21,5 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     pin_hash = Column(String(128), nullable=True)
     pin_verified = Column(Boolean, default=False)
-    avatar = Column(String(300), nullable=True)
\ No newline at end of file
+    avatar = Column(String(300), nullable=True)
+    totp_secret = Column(String(64), nullable=True)
\ No newline at end of file
@@ -0,0 +1,195 @@
+# db/query_log.py
+import itertools
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+
+from sqlalchemy import event
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):\w+|\?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Statement with literals and bind markers replaced by ``?``, whitespace
+    collapsed and ``IN (?, ?, ...)`` lists folded, so every execution of the
+    same query shape gets the same key."""
+    text = _STRING_RE.sub("?", statement)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("IN (?+)", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+class _Aggregate:
+    __slots__ = ("count", "total_ms", "max_ms", "rows", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.recent: deque[float] = deque(maxlen=window)
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class QueryLog:
+    """Fixed-size log of executed statements plus per-fingerprint stats.
+
+    Writers claim a slot from ``itertools.count`` (atomic under the GIL) and
+    overwrite it, so recording takes no lock and never allocates beyond
+    the entry tuple. Percentiles come from each fingerprint's last
+    ``window`` durations and are computed when read. Stats are kept for
+    at most ``max_shapes`` fingerprints; later ones are pooled under
+    ``OTHER``, so statements with inlined values can't grow it unbounded.
+    """
+
+    OTHER = "(other statements)"
+
+    def __init__(self, size: int = 1000, window: int = 512, max_shapes: int = 1000):
+        self.size = size
+        self.window = window
+        self.max_shapes = max_shapes
+        self._slots: list[tuple | None] = [None] * size
+        self._counter = itertools.count()
+        self._written = 0
+        self._stats: dict[str, _Aggregate] = {}
+
+    def record(self, statement: str, duration_ms: float, rows: int | None) -> None:
+        key = fingerprint(statement)
+        seq = next(self._counter)
+        self._slots[seq % self.size] = (seq, time.time(), key, duration_ms, rows)
+        self._written = seq + 1
+
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self.max_shapes:
+                key = self.OTHER
+            stats = self._stats.setdefault(key, _Aggregate(self.window))
+        stats.count += 1
+        stats.total_ms += duration_ms
+        stats.max_ms = max(stats.max_ms, duration_ms)
+        stats.rows += rows or 0
+        stats.recent.append(duration_ms)
+
+    def recent(self, limit: int = 10) -> list[dict]:
+        """Newest first."""
+        end = self._written
+        entries = []
+        for seq in range(end - 1, max(end - min(limit, self.size), 0) - 1, -1):
+            entry = self._slots[seq % self.size]
+            if entry is None or entry[0] != seq:  # overwritten meanwhile
+                continue
+            _, ts, key, duration_ms, rows = entry
+            entries.append({
+                "timestamp": ts,
+                "fingerprint": key,
+                "duration_ms": round(duration_ms, 3),
+                "rows": rows,
+            })
+        return entries
+
+    def aggregates(self, limit: int = 20, sort: str = "total_ms") -> list[dict]:
+        summaries = []
+        for key, stats in list(self._stats.items()):
+            ordered = sorted(stats.recent)
+            if not ordered:
+                continue
+            summaries.append({
+                "fingerprint": key,
+                "count": stats.count,
+                "total_ms": round(stats.total_ms, 3),
+                "avg_ms": round(stats.total_ms / stats.count, 3),
+                "max_ms": round(stats.max_ms, 3),
+                "p50_ms": round(_percentile(ordered, 0.50), 3),
+                "p95_ms": round(_percentile(ordered, 0.95), 3),
+                "p99_ms": round(_percentile(ordered, 0.99), 3),
+                "rows": stats.rows,
+            })
+        summaries.sort(key=lambda s: s[sort], reverse=True)
+        return summaries[:limit]
+
+    def reset(self) -> None:
+        self._slots = [None] * self.size
+        self._counter = itertools.count()
+        self._written = 0
+        self._stats.clear()
+
+
+def install(engine, log: QueryLog) -> None:
+    """Time every cursor execution on ``engine`` (sync or async) into ``log``."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        rowcount = getattr(cursor, "rowcount", -1)
+        log.record(statement, (time.perf_counter() - started) * 1000, rowcount if rowcount >= 0 else None)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(context):
+        # no after_cursor_execute follows; drop the start time it would have
+        # taken, or the next statement on this connection is timed from it
+        if context.connection is None or context.execution_context is None:
+            return
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+class RoundTrips:
+    """Counts of statements and transaction ends sent while a
+    :func:`count_round_trips` block was open."""
+
+    __slots__ = ("statements", "commits", "rollbacks")
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    @property
+    def total(self) -> int:
+        return self.statements + self.commits + self.rollbacks
+
+
+@contextmanager
+def count_round_trips(engine):
+    """Count what ``engine`` sends to the server inside the block.
+
+    Each cursor execution and each COMMIT/ROLLBACK is one network round trip
+    on a client/server database, which is what the auth benchmarks compare.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    counts = RoundTrips()
+
+    def _statement(*args):
+        counts.statements += 1
+
+    def _commit(conn):
+        counts.commits += 1
+
+    def _rollback(conn):
+        counts.rollbacks += 1
+
+    listeners = [("before_cursor_execute", _statement), ("commit", _commit), ("rollback", _rollback)]
+    for name, fn in listeners:
+        event.listen(sync_engine, name, fn)
+    try:
+        yield counts
+    finally:
+        for name, fn in listeners:
+            event.remove(sync_engine, name, fn)
@@ -0,0 +1,31 @@
+# db/statements.py
+"""Small dialect-aware statement helpers shared by the routes."""
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def insert_ignore(session: AsyncSession, table: Table):
+    """``INSERT ... ON CONFLICT DO NOTHING`` for SQLite and Postgres."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table).prefix_with("IGNORE")  # MySQL
+    return dialect_insert(table).on_conflict_do_nothing()
+
+
+def violated_column(exc: IntegrityError, columns: list[str]) -> str | None:
+    """Which of ``columns`` a unique-constraint violation was about.
+
+    SQLite reports ``UNIQUE constraint failed: users.email``; Postgres
+    names the index (``ix_users_email``) and the key (``Key (email)=...``).
+    """
+    message = str(exc.orig)
+    # longest first, so "pending_email" is not reported as "email"
+    for name in sorted(columns, key=len, reverse=True):
+        if f".{name}" in message or f"_{name}" in message or f"({name})" in message:
+            return name
+    return None
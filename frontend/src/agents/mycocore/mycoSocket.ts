@@ -23,6 +23,11 @@ export function initWebSocket() {
   socket.onmessage = (event) => {
   try {
     const raw = JSON.parse(event.data);
+    // server heartbeat: answer it so the socket isn't reaped as idle
+    if (raw.type === "ping") {
+      socket?.send(JSON.stringify({ type: "pong" }));
+      return;
+    }
     const data: MycoCoreEvent = {
       ...raw,
       timestamp: raw.timestamp ?? new Date().toISOString(),
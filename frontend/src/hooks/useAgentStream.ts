@@ -47,6 +47,11 @@ export function useAgentStream(path: string) {
         if (!isMounted.current || ws.readyState !== WebSocket.OPEN) return;
         try {
           const data = JSON.parse(ev.data);
+          // server heartbeat: answer it so the socket isn't reaped as idle
+          if (data.type === "ping") {
+            ws.send(JSON.stringify({ type: "pong" }));
+            return;
+          }
           setEvents((prev) => [...prev, data]);
         } catch {
           console.error("Invalid WS message:", ev.data);
@@ -1,94 +1,199 @@
 # main.py
-from fastapi import FastAPI
+# Keep this module's imports light: worker spawn time is import time plus
+# startup. Routers are imported on their first request (core.routes.lazy),
+# subsystems when something first uses them.
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager, suppress
 import asyncio
+import math
 import random
-import socketio
+import sys
 
 from core.config.settings import settings
-from core.cache.redis_cache import connect_redis, close_redis
-from db.database import connect_db, close_db
+from core.middleware import CompressionMiddleware, ConditionalGetMiddleware, RateLimitMiddleware
+from core.periodic.scheduler import PeriodicTask
+from core.routes.lazy import LazyRouterMiddleware, LazyRouters
+from core.static import PrecompressedStatic
+from core.utils.circuit import CircuitOpenError
 from core.utils.logger import get_logger
+from core.utils.responses import FastJSONResponse
 
 logger = get_logger(__name__)
-from core.routes.health import router as health_router
-from core.routes.auth import router as auth_router
-from core.routes.users import router as users_router
-from core.routes.system import router as system_router
-from core.routes.logs import router as logs_router
-from core.routes.feedback import router as feedback_router
-from core.routes.query import router as query_router
-from core.routes.rootbloom import router as rootbloom_router
-from core.routes.neuroweave import router as neuroweave_router
-from core.routes.sporelink import router as sporelink_router
-from core.routes.verify import router as verify_router
-from core.routes.database import router as database_router
-from core.routes.plugins import router as plugins_router
-from core.routes.mycocore import router as mycocore_router, start_metrics_task
-from core.routes.state import router as state_router
-from core.routes.agents import router as agents_router
-from core.routes.market import router as market_router
-from core.routes.ws import router as ws_router
 
 # Prefix for all API routes
 API_PREFIX = "/api"
 
+
+def _loaded(module_name: str):
+    """The module if something imported it; shutdown should not import a
+    subsystem just to close it."""
+    return sys.modules.get(module_name)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from core.cache.redis_cache import connect_redis, close_redis
+    from core.health import prober
+    from core.periodic import scheduler
+    from core.plugins import close_plugin_sandbox, start_plugin_sandbox
+    from core.routes.mycocore import metrics_task
+    from db.database import connect_db, close_db
+
     # Startup
-    redis_ok = await connect_redis()
-    db_ok = await connect_db()
+    if not settings.LAZY_ROUTERS:
+        routers.load_all()
+    redis_ok, db_ok = await asyncio.gather(connect_redis(), connect_db())
     if not redis_ok:
         logger.warning("Running without Redis cache")
     if not db_ok:
         logger.warning("Database unavailable; some features may not work")
+    prober.start()
+    # compress the frontend bundle once, off the event loop
+    await asyncio.to_thread(static.load)
 
-    market_task  = asyncio.create_task(market_broadcast())
-    # fire off our system_metrics broadcast loop
-    metrics_task = start_metrics_task()
+    # the market feed and metrics sampling run on one elected worker;
+    # every worker broadcasts their results to its own clients
+    scheduler.add(market_task)
+    scheduler.add(metrics_task)
+    scheduler.start()
+    # warm the plugin sandbox without holding up startup
+    sandbox_task = asyncio.create_task(start_plugin_sandbox())
     yield
     # Shutdown
-    market_task.cancel()  # Ensure market task is canceled
-    metrics_task.cancel()  # Ensure metrics task is canceled
-    with suppress(Exception):
-        await market_task
-        await metrics_task
+    await prober.close()
+    await scheduler.close()
+    # awaiting a cancelled task raises CancelledError, which is not an Exception
+    sandbox_task.cancel()
+    with suppress(asyncio.CancelledError, Exception):
+        await sandbox_task
+    if agents := _loaded("core.agents"):
+        await agents.scheduler.close()
+    await close_plugin_sandbox()
+    if feedback := _loaded("core.feedback"):
+        await feedback.analyzer.close()
+    if explorer := _loaded("core.explorer"):
+        await explorer.explorer.close()
+    if memory := _loaded("core.memory"):
+        memory.close_memory_index()
+    if ws := _loaded("core.websocket.websocket_manager"):
+        await ws.manager.close()
+    if mycocore := _loaded("core.routes.mycocore"):
+        await mycocore.streams.close()
     await close_redis()
     await close_db()
 
-fastapi_app = FastAPI(lifespan=lifespan)
+fastapi_app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+
+@fastapi_app.exception_handler(CircuitOpenError)
+async def dependency_unavailable(request: Request, exc: CircuitOpenError):
+    # a dependency's circuit is open: answer now rather than after a timeout
+    return JSONResponse(
+        {"detail": f"{exc.name} temporarily unavailable"},
+        status_code=503,
+        headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+    )
 
 # Allow CORS for the frontend origin
 origins = ["http://localhost:5173"]
 
-# Socket.IO server for market updates
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins=origins)
+# Socket.IO servers for market updates, one per wire format, each created
+# with its first connection or the first broadcast. python-socketio fixes
+# the serializer per server, so msgpack clients connect under their own path.
+SOCKETIO_PATH = "/market/"
+SOCKETIO_MSGPACK_PATH = "/market-msgpack/"
+_sio_servers: dict[str, tuple] = {}  # path -> (server, ASGI app)
+
+
+def get_sio(path: str = SOCKETIO_PATH):
+    if path not in _sio_servers:
+        import socketio
 
-# Background task to emit placeholder market data
-async def market_broadcast():
+        serializer = "default"
+        if path == SOCKETIO_MSGPACK_PATH:
+            from core.websocket.protocol import socketio_packet
+
+            serializer = socketio_packet()
+        # /market has no event handlers, so it has to be listed to accept connections
+        server = socketio.AsyncServer(
+            async_mode="asgi",
+            cors_allowed_origins=origins,
+            namespaces=["/", "/market"],
+            serializer=serializer,
+        )
+        _sio_servers[path] = (server, socketio.ASGIApp(server, socketio_path=path.strip("/")))
+    return _sio_servers[path][0]
+
+
+async def _market_emit(event: str, data: dict) -> None:
+    # each server encodes an emit once for all of its clients
+    for server, _ in list(_sio_servers.values()):
+        await server.emit(event, data, namespace="/market")
+
+
+# Placeholder market data: generated on the elected worker, emitted by
+# every worker to its own Socket.IO clients
+async def market_tick() -> dict:
     symbols = ["AAPL", "MSFT", "GOOG"]
     indices = ["DOW", "NASDAQ"]
-    while True:
-        sym = random.choice(symbols)
-        await sio.emit(
-            "quote",
-            {"symbol": sym, "price": round(random.uniform(100, 500), 2)},
-            namespace="/market",
-        )
-        idx = random.choice(indices)
-        await sio.emit(
-            "index",
-            {
-                "symbol": idx,
-                "price": round(random.uniform(1000, 2000), 2),
-                "change": round(random.uniform(-5, 5), 2),
-            },
-            namespace="/market",
-        )
-        await asyncio.sleep(1)
+    return {
+        "quote": {"symbol": random.choice(symbols), "price": round(random.uniform(100, 500), 2)},
+        "index": {
+            "symbol": random.choice(indices),
+            "price": round(random.uniform(1000, 2000), 2),
+            "change": round(random.uniform(-5, 5), 2),
+        },
+    }
+
+
+async def market_broadcast(tick: dict):
+    for event, data in tick.items():
+        await _market_emit(event, data)
+
+
+market_task = PeriodicTask("market", market_tick, interval=1, deliver=market_broadcast, leader_only=True)
+
+
+# the built frontend, when there is one; API and docs paths are never static
+static = PrecompressedStatic(settings.STATIC_DIR)
+_NOT_STATIC = (API_PREFIX + "/", fastapi_app.docs_url, fastapi_app.redoc_url, fastapi_app.openapi_url)
 
-sio_app = socketio.ASGIApp(sio, other_asgi_app=fastapi_app, socketio_path="market")
+
+async def app(scope, receive, send):
+    """ASGI entry point: Socket.IO under /market/ (/market-msgpack/ for
+    msgpack frames), the frontend's static files, FastAPI for the rest."""
+    if scope["type"] == "lifespan":
+        await fastapi_app(scope, receive, send)
+    elif scope["path"].startswith((SOCKETIO_PATH, SOCKETIO_MSGPACK_PATH)):
+        path = SOCKETIO_PATH if scope["path"].startswith(SOCKETIO_PATH) else SOCKETIO_MSGPACK_PATH
+        get_sio(path)
+        await _sio_servers[path][1](scope, receive, send)
+    elif (
+        scope["type"] == "http"
+        and static.loaded
+        and not scope["path"].startswith(_NOT_STATIC)
+        and static.match(scope["path"]) is not None
+    ):
+        await static(scope, receive, send)
+    else:
+        await fastapi_app(scope, receive, send)
+
+routers = LazyRouters(fastapi_app, API_PREFIX)
+
+# innermost: only requests that get past the limiter import a router
+fastapi_app.add_middleware(LazyRouterMiddleware, routers=routers)
+
+# 304s are answered before a router is even imported
+fastapi_app.add_middleware(ConditionalGetMiddleware)
+
+# runs inside CORS (so 429s stay readable by the browser) but before routing,
+# so throttled requests never reach a dependency
+fastapi_app.add_middleware(RateLimitMiddleware)
+
+# inside CORS, outside everything that produces a body
+fastapi_app.add_middleware(CompressionMiddleware)
 
 fastapi_app.add_middleware(
     CORSMiddleware,
@@ -98,29 +203,3 @@ fastapi_app.add_middleware(
     allow_headers=["*"],
     expose_headers=["Authorization"],  # Ensure Authorization header is exposed
 )
-
-routers = [
-    health_router,
-    auth_router,
-    users_router,
-    system_router,
-    logs_router,
-    feedback_router,
-    query_router,
-    rootbloom_router,
-    neuroweave_router,
-    sporelink_router,
-    verify_router,
-    database_router,
-    plugins_router,
-    mycocore_router,
-    state_router,
-    agents_router,
-    market_router,
-    ws_router,
-]
-for router in routers:
-    fastapi_app.include_router(router, prefix=API_PREFIX)
-
-# Expose ASGI app with Socket.IO mounted
-app = sio_app
\ No newline at end of file
@@ -1,22 +1,81 @@
 import os
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
 os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
 
 import asyncio
-from core.cache.redis_cache import connect_redis, close_redis
 
-async def main():
-    await connect_redis()
-    # Get the redis global variable from the actual module, not an import-time copy
-    from core.cache import redis_cache
+import pytest
+import pytest_asyncio
+from redis.exceptions import ResponseError
+
+from core.cache import redis_cache
+from core.cache.redis_client import AutoPipeline, TrackedPool
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _stand_in(server, max_connections=10):
+    """In-memory Redis over the real pool class."""
+
+    def new_client(decode_responses=True):
+        return fakeredis.FakeAsyncRedis(
+            server=server,
+            decode_responses=decode_responses,
+            connection_pool_class=TrackedPool,
+            max_connections=max_connections,
+        )
+    return new_client
+
+
+@pytest_asyncio.fixture
+async def connected(monkeypatch):
+    monkeypatch.setattr(redis_cache, "_new_client", _stand_in(fakeredis.FakeServer()))
+    assert await redis_cache.connect_redis(max_retries=1)
+    yield redis_cache
+    await redis_cache.close_redis()
+
+
+@pytest.mark.asyncio
+async def test_text_and_binary_clients(connected):
+    assert await connected.redis.ping()
+    await connected.redis.set("foo", "bar")
+    assert await connected.redis.get("foo") == "bar"
+
+    blob = bytes(range(256))
+    await connected.redis_bytes.set("blob", blob)
+    assert await connected.redis_bytes.get("blob") == blob
+    assert await connected.redis_bytes.get("foo") == b"bar"
+
+
+@pytest.mark.asyncio
+async def test_commands_in_one_tick_share_a_pipeline(connected):
+    client = connected.redis
+    await asyncio.gather(*(client.set(f"k{i}", i) for i in range(20)))
+    pipeline = connected.stats()["pipelines"]["text"]
+    assert pipeline["largest_batch"] == 20
+
+    await client.set("word", "x")
+    values = await asyncio.gather(
+        client.get("k3"), client.incr("word"), client.get("k7"), return_exceptions=True
+    )
+    # one command's error stays with that command
+    assert values[0] == "3" and values[2] == "7"
+    assert isinstance(values[1], ResponseError)
+
+
+@pytest.mark.asyncio
+async def test_pool_reports_waits_when_undersized():
+    client = _stand_in(fakeredis.FakeServer(), max_connections=1)()
     try:
-        pong = await redis_cache.redis.ping()
-        print("PING:", pong)
-        await redis_cache.redis.set("foo", "bar")
-        val = await redis_cache.redis.get("foo")
-        print("GET foo:", val)
-    finally:
-        await close_redis()
+        await asyncio.gather(*(client.set(f"k{i}", i) for i in range(5)))
+        stats = client.connection_pool.stats()
+        assert stats["max_connections"] == 1 and stats["peak_in_use"] == 1
+        assert stats["acquired"] == 5 and stats["waits"] > 0
 
-if __name__ == "__main__":
-    asyncio.run(main())
+        pipelined = AutoPipeline(client)
+        values = await asyncio.gather(*(pipelined.get(f"k{i}") for i in range(5)))
+        assert values == [str(i) for i in range(5)]
+        assert client.connection_pool.stats()["acquired"] == 6  # one round trip
+    finally:
+        await client.aclose(close_connection_pool=True)
@@ -0,0 +1,77 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+
+import pytest
+
+from core.agents.scheduler import AgentScheduler, AgentTimeout, Priority, SchedulerOverloaded
+
+
+@pytest.mark.asyncio
+async def test_compatible_jobs_are_micro_batched():
+    batches = []
+
+    async def handler(payloads):
+        batches.append(list(payloads))
+        return [p * 2 for p in payloads]
+
+    sched = AgentScheduler()
+    sched.register("echo", handler, concurrency=1, max_batch=4, batch_window=0.05)
+    results = await asyncio.gather(*(sched.submit("echo", i, batch_key="k") for i in range(4)))
+
+    assert results == [0, 2, 4, 6]
+    assert batches == [[0, 1, 2, 3]]
+    assert sched.stats()["echo"]["avg_batch_size"] == 4
+    await sched.close()
+
+
+@pytest.mark.asyncio
+async def test_interactive_jobs_jump_background_queue():
+    order = []
+    gate = asyncio.Event()
+
+    async def handler(payloads):
+        if payloads == ["blocker"]:
+            await gate.wait()
+        order.extend(payloads)
+        return payloads
+
+    sched = AgentScheduler()
+    sched.register("lane", handler, concurrency=1, max_batch=1)
+    blocker = asyncio.create_task(sched.submit("lane", "blocker"))
+    await asyncio.sleep(0)
+    background = asyncio.create_task(sched.submit("lane", "bg", priority=Priority.BACKGROUND))
+    interactive = asyncio.create_task(sched.submit("lane", "ui"))
+    await asyncio.sleep(0.01)
+    assert sched.stats()["lane"]["queued"] == 2
+
+    gate.set()
+    await asyncio.gather(blocker, background, interactive)
+    assert order == ["blocker", "ui", "bg"]
+    await sched.close()
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_overload():
+    async def slow(payloads):
+        await asyncio.sleep(1)
+        return payloads
+
+    sched = AgentScheduler()
+    sched.register("slow", slow, concurrency=1, max_batch=1, max_queue=1)
+    first = asyncio.create_task(sched.submit("slow", 1, timeout=0.05))
+    await asyncio.sleep(0.01)
+    queued = asyncio.create_task(sched.submit("slow", 2, timeout=0.05))
+    await asyncio.sleep(0)
+    with pytest.raises(SchedulerOverloaded):
+        await sched.submit("slow", 3)
+
+    for task in (first, queued):
+        with pytest.raises(AgentTimeout):
+            await task
+    stats = sched.stats()["slow"]
+    assert stats["timed_out"] == 2 and stats["rejected"] == 1
+    await sched.close()
@@ -0,0 +1,143 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.agents import AgentScheduler, AgentTimeout, FakeBackend
+from core.config.settings import settings
+from core.memory import close_memory_index
+from core.routes.neuroweave import router as neuroweave_router
+from core.routes.state import router as state_router
+from core.utils.dependencies import get_current_user, get_current_user_ws
+from db.models import User
+
+
+@pytest.fixture(autouse=True)
+def memory_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_INDEX_DIR", str(tmp_path))
+    yield
+    close_memory_index()
+
+
+def _client(user_id: int | None = 1) -> TestClient:
+    app = FastAPI()
+    app.include_router(neuroweave_router, prefix="/api")
+    app.include_router(state_router, prefix="/api")
+    if user_id is not None:
+        user = User(id=user_id, username=f"u{user_id}")
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_user_ws] = lambda: user
+    return TestClient(app)
+
+
+def test_agents_and_memories_belong_to_the_token_user():
+    anonymous = _client(None)
+    assert anonymous.post("/api/neuroweave/ask", params={"prompt": "hi"}).status_code == 401
+    assert anonymous.post("/api/state/memory", json={"text": "secret"}).status_code == 401
+
+    owner, other = _client(1), _client(2)
+    assert owner.post("/api/state/memory", json={"text": "my locker code is 4512"}).status_code == 200
+    mine = owner.get("/api/state/memory/search", params={"q": "locker code"}).json()
+    assert [hit["text"] for hit in mine] == ["my locker code is 4512"]
+    assert other.get("/api/state/memory/search", params={"q": "locker code"}).json() == []
+    assert owner.get("/api/state/memory/search", params={"q": "x", "k": 500}).status_code == 422
+
+    context = owner.post("/api/neuroweave/ask", params={"prompt": "locker code", "user_id": 2}).json()["context"]
+    assert [hit["text"] for hit in context] == ["my locker code is 4512"]
+
+
+def test_json_mode_is_unchanged():
+    resp = _client().post("/api/neuroweave/ask", params={"prompt": "hello there"})
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json()["response"] == "neuroweave received: hello there"
+
+
+def test_sse_mode_streams_deltas_then_done():
+    resp = _client().post(
+        "/api/neuroweave/ask",
+        params={"prompt": "hello there"},
+        headers={"Accept": "text/event-stream"},
+    )
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in resp.text.split("\n\n") if block]
+    deltas = [json.loads(e.removeprefix("data: "))["delta"] for e in events[:-1]]
+    assert "".join(deltas) == "neuroweave received: hello there"
+    assert events[-1].startswith("event: done")
+
+
+def test_websocket_mode_sends_chunks_then_done():
+    with _client().websocket_connect("/api/neuroweave/stream/abc") as ws:
+        ws.send_json({"prompt": "hi"})
+        frames = []
+        while not frames or frames[-1]["type"] == "chunk":
+            frames.append(ws.receive_json())
+    assert [f["type"] for f in frames] == ["chunk", "chunk", "chunk", "done"]
+    assert frames[-1]["response"] == "neuroweave received: hi"
+
+
+def test_bad_messages_and_failed_jobs_get_error_frames(monkeypatch):
+    from core.agents import streaming
+
+    working = streaming.scheduler.open_stream
+
+    async def broken(agent, job, priority):
+        if job["prompt"] == "still here":
+            return await working(agent, job, priority=priority)
+
+        async def chunks():
+            yield "partial"
+            raise RuntimeError("backend exploded")
+        return chunks()
+
+    with _client().websocket_connect("/api/neuroweave/stream/abc") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "messages must be JSON"}
+        for message in (["hi"], {"text": "hi"}, {"prompt": 5}):
+            ws.send_json(message)
+            assert ws.receive_json()["detail"] == "prompt required"
+
+        monkeypatch.setattr(streaming.scheduler, "open_stream", broken)
+        ws.send_json({"prompt": "hi"})
+        assert ws.receive_json()["type"] == "chunk"
+        assert ws.receive_json() == {"type": "error", "detail": "neuroweave failed"}
+
+        ws.send_json({"prompt": "still here"})
+        while (frame := ws.receive_json())["type"] == "chunk":
+            pass
+        assert frame["response"] == "neuroweave received: still here"
+
+    resp = _client().post(
+        "/api/neuroweave/ask", params={"prompt": "sse"}, headers={"Accept": "text/event-stream"}
+    )
+    events = [block for block in resp.text.split("\n\n") if block]
+    assert events[0] == 'data: {"delta": "partial"}'
+    assert events[-1].startswith("event: error")
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_before_generation_finishes():
+    backend = FakeBackend(delay=0.05)
+    sched = AgentScheduler()
+    sched.register(
+        "slow",
+        lambda jobs: asyncio.sleep(0, [None] * len(jobs)),
+        stream_handler=lambda job: backend.stream("slow", job),
+        timeout=0.12,
+    )
+    chunks = await sched.open_stream("slow", {"prompt": "a b c d e"})
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first = await chunks.__anext__()
+    assert first == "slow " and loop.time() - started < 0.1
+
+    with pytest.raises(AgentTimeout):
+        async for _ in chunks:
+            pass
+    await sched.close()
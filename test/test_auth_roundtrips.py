@@ -0,0 +1,20 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:1/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import pytest
+
+from bench.auth_roundtrips import measure
+
+
+@pytest.mark.asyncio
+async def test_auth_flows_make_single_statement_round_trips(tmp_path):
+    results = await measure(f"sqlite+aiosqlite:///{tmp_path}/auth.db")
+
+    assert results["register"] == {"statements": 1, "commits": 1, "rollbacks": 0, "total": 2}
+    assert results["refresh"] == {"statements": 1, "commits": 1, "rollbacks": 0, "total": 2}
+    assert results["me"]["statements"] == 1
+    assert results["logout"]["statements"] == 2
+    assert results["logout"]["commits"] == 1
+    assert results["register_duplicate"]["statements"] == 1
@@ -0,0 +1,121 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+import base64
+import re
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from core.routes import batch
+from core.utils import dependencies
+from db.database import get_db
+from db.models import User
+
+
+def _client(monkeypatch, running: list) -> tuple[TestClient, list]:
+    lookups = []
+
+    async def load_token_user(db, user_id, token):
+        lookups.append(user_id)
+        return User(id=user_id, username="u", email="u@example.com"), False
+
+    monkeypatch.setattr(dependencies, "load_token_user", load_token_user)
+    monkeypatch.setattr(dependencies.jwt, "decode", lambda *a, **k: {"sub": "7"})
+    monkeypatch.setattr(batch, "_SHARED_PATHS", [re.compile("^/api/session$"), re.compile("^/api/broken$")])
+    app = FastAPI()
+    app.include_router(batch.router, prefix="/api")
+
+    @app.get("/api/me")
+    async def me(user=Depends(dependencies.get_current_user)):
+        return {"id": user.id}
+
+    @app.get("/api/session")
+    async def session(n: int, db=Depends(get_db)):
+        running.append(n)
+        await asyncio.sleep(0.01)
+        value = (await db.execute(text("SELECT :n"), {"n": n})).scalar()
+        return {"n": value, "session": id(db), "together": len(running)}
+
+    @app.get("/api/broken")
+    async def broken(db=Depends(get_db)):
+        running.append("broken")
+        await db.execute(text("SELECT * FROM no_such_table"))
+
+    @app.get("/api/writes")
+    async def writes(db=Depends(get_db)):
+        await db.commit()
+        return {"session": id(db)}
+
+    @app.get("/api/text")
+    async def plain():
+        return PlainTextResponse("hello")
+
+    @app.get("/api/png")
+    async def png():
+        return Response(b"\x89PNG\r\n\x1a\n\xff", media_type="image/png")
+
+    return TestClient(app), lookups
+
+
+def test_sub_requests_share_auth_and_session(monkeypatch):
+    client, lookups = _client(monkeypatch, [])
+    response = client.post(
+        "/api/batch",
+        headers={"Authorization": "Bearer t"},
+        json={"requests": [
+            {"id": "a", "path": "/api/me"},
+            {"id": "b", "path": "/api/me"},
+            {"id": "c", "path": "/api/session?n=1"},
+            {"id": "d", "path": "/api/session?n=2"},
+            {"id": "e", "path": "/api/text"},
+            {"id": "f", "path": "/api/missing"},
+            {"id": "g", "path": "/api/png"},
+        ]},
+    )
+    assert response.status_code == 200
+    items = response.json()["responses"]
+    assert [item["id"] for item in items] == list("abcdefg")
+    assert items[0]["body"] == items[1]["body"] == {"id": 7}
+    assert lookups == [7]  # authenticated once, for the whole batch
+
+    c, d = items[2]["body"], items[3]["body"]
+    assert (c["n"], d["n"]) == (1, 2)
+    assert c["session"] == d["session"]
+    assert max(c["together"], d["together"]) == 2  # ran concurrently
+    assert items[4]["body"] == "hello" and "encoding" not in items[4]
+    assert items[5]["status"] == 404
+    assert items[6]["encoding"] == "base64"
+    assert base64.b64decode(items[6]["body"]) == b"\x89PNG\r\n\x1a\n\xff"
+
+
+def test_rejects_what_it_cannot_batch(monkeypatch):
+    client, _ = _client(monkeypatch, [])
+    for path in ("/docs", "/api/batch"):
+        response = client.post("/api/batch", json={"requests": [{"id": "x", "path": path}]})
+        assert response.status_code == 400
+    response = client.post(
+        "/api/batch", json={"requests": [{"id": "x", "method": "DELETE", "path": "/api/me"}]}
+    )
+    assert response.status_code == 422
+    assert client.post("/api/batch", json={"requests": [{"id": "x", "path": "/api/me"}]}).json() == {
+        "responses": [{"id": "x", "status": 401, "headers": {"content-type": "application/json"},
+                       "body": {"detail": "Not authenticated"}}]
+    }
+
+
+def test_only_listed_routes_share_the_session_and_errors_roll_back(monkeypatch):
+    client, _ = _client(monkeypatch, [])
+    items = client.post("/api/batch", json={"requests": [
+        {"id": "broken", "path": "/api/broken"},
+        {"id": "after", "path": "/api/session?n=3"},
+        {"id": "writes", "path": "/api/writes"},
+    ]}).json()["responses"]
+    assert items[0]["status"] == 500
+    assert items[1]["status"] == 200 and items[1]["body"]["n"] == 3  # not a failed transaction
+    assert items[2]["status"] == 200 and items[2]["body"]["session"] != items[1]["body"]["session"]
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from bench.load import compare, run_load
+
+
+@pytest.mark.asyncio
+async def test_run_load_counts_successes_and_errors():
+    async def op(seq: int) -> bool:
+        await asyncio.sleep(0.001)
+        if seq % 5 == 0:
+            raise RuntimeError("boom")
+        return seq % 5 != 1 and 100  # bytes received
+
+    summary = (await run_load("op", op, concurrency=4, duration=0.2, warmup=0.05)).summary()
+
+    assert summary["requests"] > 0
+    assert summary["errors"] > 0
+    assert summary["req_per_s"] > 0
+    assert summary["bytes_per_s"] == pytest.approx(summary["req_per_s"] * 100, rel=0.01)
+    assert 0 < summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    def report(req_per_s, p50, p99):
+        return {"results": {"asgi:me": {"req_per_s": req_per_s, "p50_ms": p50, "p99_ms": p99}}}
+
+    baseline = report(1000, 5.0, 20.0)
+    assert compare(baseline, report(950, 5.2, 21.0), tolerance=0.10) == []
+    regressions = compare(baseline, report(800, 5.0, 30.0), tolerance=0.10)
+    assert [r.split(":")[1].split()[1] for r in regressions] == ["req_per_s", "p99_ms"]
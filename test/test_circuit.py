@@ -0,0 +1,76 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import time
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core.cache.redis_cache import GuardedRedis
+from core.utils.circuit import CircuitBreaker, CircuitOpenError
+from db.database import GuardedSessionFactory
+
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    events = []
+    breaker = CircuitBreaker(
+        "dep", failure_threshold=2, reset_timeout=5,
+        on_open=lambda: events.append("open"), on_close=lambda: events.append("close"),
+    )
+
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and events == ["open"]
+    assert not breaker.allow() and breaker.retry_after() == 5
+
+    now[0] += 5
+    assert breaker.state == "half_open"
+    assert breaker.allow()  # the trial
+    assert not breaker.allow()  # one at a time
+    breaker.record_failure()  # failed trial: open for another period
+    assert breaker.state == "open" and events == ["open"]
+
+    now[0] += 5
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and events == ["open", "close"]
+    assert breaker.stats()["times_opened"] == 1 and breaker.stats()["rejected"] == 2
+
+
+class _DownRedis:
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        raise RedisConnectionError("connection refused")
+
+
+@pytest.mark.asyncio
+async def test_guarded_redis_fails_fast_once_open():
+    client = _DownRedis()
+    guarded = GuardedRedis(client, CircuitBreaker("redis", failure_threshold=2, reset_timeout=60))
+
+    for _ in range(2):
+        with pytest.raises(RedisConnectionError):
+            await guarded.get("k")
+    with pytest.raises(CircuitOpenError) as exc:
+        await guarded.get("k")
+    assert client.calls == 2  # the open circuit never reached the client
+    assert exc.value.retry_after > 0
+
+
+def test_session_factory_refuses_sessions_while_open():
+    breaker = CircuitBreaker("database", failure_threshold=1, reset_timeout=60)
+    factory = GuardedSessionFactory(async_sessionmaker(), breaker)
+    factory().sync_session.close()
+
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        factory()
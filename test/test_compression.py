@@ -0,0 +1,104 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import gzip
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from core.middleware.compression import CompressionMiddleware, available_codecs, negotiate
+from core.static import PrecompressedStatic
+
+BODY = "hyphae " * 1000
+
+
+def _client(offload_size: int = 1 << 20) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BODY.encode()
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/png")
+    async def png():
+        return PlainTextResponse(BODY, media_type="image/png")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=100, offload_size=offload_size)
+    return TestClient(app)
+
+
+def _raw_get(client, path, encoding="gzip"):
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_negotiation_honours_q_values_and_server_order():
+    gzip_only = [c for c in available_codecs() if c.name == "gzip"]
+    assert negotiate("gzip, deflate", gzip_only).name == "gzip"
+    assert negotiate("gzip;q=0, br", gzip_only) is None
+    assert negotiate("*", gzip_only).name == "gzip"
+    assert negotiate(None, gzip_only) is None
+    names = [c.name for c in available_codecs()]
+    assert negotiate(", ".join(names), available_codecs()).name == names[0]
+
+
+def test_compresses_over_threshold_and_skips_the_rest():
+    for offload_size in (1 << 20, 0):  # inline and in a worker thread
+        client = _client(offload_size)
+        response, raw = _raw_get(client, "/big")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(raw) < len(BODY)
+        assert gzip.decompress(raw).decode() == BODY
+
+    client = _client()
+    for path in ("/small", "/png"):
+        response, raw = _raw_get(client, path)
+        assert "content-encoding" not in response.headers
+    response, _ = _raw_get(client, "/big", encoding="identity")
+    assert "content-encoding" not in response.headers
+
+
+def test_streams_are_compressed_per_chunk():
+    response, raw = _raw_get(_client(), "/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert zlib.decompress(raw, 31).decode() == BODY * 3
+
+
+def test_static_files_are_precompressed(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>" + BODY + "</html>")
+    (tmp_path / "assets" / "app.js").write_text("console.log(1);")
+    static = PrecompressedStatic(tmp_path)
+    assert static.load() == 2
+    assert "gzip" in static.match("/").bodies
+    assert list(static.match("/assets/app.js").bodies) == ["identity"]  # under the threshold
+
+    client = TestClient(static)
+    response, raw = _raw_get(client, "/dashboard")  # client-side route
+    assert response.headers["content-encoding"] == static.codecs[-1].name == "gzip"
+    assert gzip.decompress(raw).decode().startswith("<html>")
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+    again = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+
+    response = client.get("/assets/app.js")
+    assert response.text == "console.log(1);"
+    assert "immutable" in response.headers["cache-control"]
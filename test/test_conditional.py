@@ -0,0 +1,76 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.cache import redis_cache
+from core.cache.versions import versions
+from core.middleware import ConditionalGetMiddleware
+
+POLICIES = {"/items/{item_id}": {"resource": "item:{item_id}", "cache_control": "private, no-cache"}}
+
+
+def _app(calls: list) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        calls.append(item_id)
+        return {"id": item_id}
+
+    @app.post("/items/{item_id}")
+    async def write(item_id: int):
+        await versions.bump(f"item:{item_id}")
+        return {"id": item_id}
+
+    app.add_middleware(ConditionalGetMiddleware, policies=POLICIES)
+    return TestClient(app)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_cache, "redis", client)
+    return client
+
+
+def test_matching_etag_is_answered_before_the_handler(redis):
+    calls = []
+    client = _app(calls)
+
+    first = client.get("/items/1")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"item:1.')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get("/items/1", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+    assert calls == [1]  # the 304 never reached the route
+
+    assert client.get("/items/2", headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/items/1")
+    changed = client.get("/items/1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_no_etags_without_redis(monkeypatch):
+    monkeypatch.setattr(redis_cache, "redis", None)
+    response = _app([]).get("/items/1")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_a_resource_has_one_ttl():
+    ConditionalGetMiddleware(None)  # the shipped table is consistent
+    with pytest.raises(ValueError, match="different ttls"):
+        ConditionalGetMiddleware(None, policies={
+            "/a": {"resource": "shared"},
+            "/b": {"resource": "shared", "ttl": 5},
+        })
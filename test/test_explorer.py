@@ -0,0 +1,177 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import sqlite3
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from core.explorer import ConnectionRegistry
+from core.explorer.connections import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "external.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, qty INTEGER)")
+        conn.executemany("INSERT INTO items VALUES (?, ?, ?)", [(i, f"n{i}", i * 2) for i in range(1, 251)])
+        conn.execute("CREATE TABLE pairs (a INTEGER, b INTEGER, v TEXT, PRIMARY KEY (a, b))")
+        conn.executemany("INSERT INTO pairs VALUES (?, ?, ?)", [(a, b, "x") for a in range(3) for b in range(3)])
+        conn.execute("CREATE TABLE loose (a INTEGER, b TEXT)")
+        conn.executemany("INSERT INTO loose VALUES (?, ?)", [(1, "x"), (1, "x"), (None, "y"), (2, None), (1, "x")])
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_the_table(db_path):
+    registry = ConnectionRegistry(idle_seconds=60, schema_ttl=60, sqlite_dir=os.path.dirname(db_path))
+    info = registry.register({"driver": "sqlite", "database": db_path}, name="ext")
+    assert registry.register({"database": db_path}).id == info.id
+    try:
+        table = await registry.table_info("ext", "main", "items")
+        assert table.primary_key == ["id"]
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = await registry.page(info.id, table, cursor, 100, columns=["name"])
+            seen.extend(rows)
+            if cursor is None:
+                break
+        assert len(seen) == 250 and seen[0] == {"name": "n1"} and seen[-1] == {"name": "n250"}
+
+        pairs = await registry.table_info(info.id, None, "pairs")
+        first, cursor = await registry.page(info.id, pairs, None, 4)
+        rest, end = await registry.page(info.id, pairs, cursor, 10)
+        assert [(r["a"], r["b"]) for r in first + rest] == [(a, b) for a in range(3) for b in range(3)]
+        assert end is None
+
+        loose = await registry.table_info(info.id, None, "loose")
+        seen, cursor = [], None
+        while True:  # no primary key: offset pages keep NULLs and repeats
+            rows, cursor = await registry.page(info.id, loose, cursor, 2)
+            seen.extend(rows)
+            if cursor is None:
+                break
+        assert len(seen) == 5 and seen.count({"a": 1, "b": "x"}) == 3
+        with pytest.raises(ValueError):
+            registry.keyset(loose, encode_cursor([1, "x"]))
+    finally:
+        await registry.close()
+
+
+def test_cursor_keeps_key_types():
+    values = [
+        7, "x", None, datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        datetime(2026, 1, 2).date(), Decimal("1.50"), uuid.uuid4(), timedelta(hours=1), b"\x00\xff",
+    ]
+    assert decode_cursor(encode_cursor(values)) == values
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([{"$": "datetime", "v": "not a date"}]))
+
+
+def test_registration_is_confined_to_allowed_targets(db_path, tmp_path):
+    registry = ConnectionRegistry(
+        idle_seconds=60, schema_ttl=60, sqlite_dir=tmp_path, allowed_hosts=["db.internal"]
+    )
+    assert registry.register({"database": "external.db"}).database == db_path
+    for params in (
+        {"database": "missing.db"},  # would be created
+        {"database": "../external.db"},
+        {"database": os.environ["DATABASE_URL"].rsplit("/", 1)[-1]},
+        {"driver": "postgresql", "host": "169.254.169.254", "database": "x"},
+    ):
+        with pytest.raises(ValueError):
+            registry.register(params)
+    assert registry.register({"host": "db.internal", "database": "x", "password": "a"}).driver == "postgresql"
+    with pytest.raises(ValueError, match="other credentials"):
+        registry.register({"host": "db.internal", "database": "x", "password": "b"})
+    with pytest.raises(ValueError, match="disabled"):
+        ConnectionRegistry(idle_seconds=60, schema_ttl=60).register({"database": db_path})
+
+
+@pytest.mark.asyncio
+async def test_schema_cache_invalidation_and_idle_eviction(db_path):
+    registry = ConnectionRegistry(idle_seconds=0, schema_ttl=60, sqlite_dir=os.path.dirname(db_path))
+    info = registry.register({"driver": "sqlite", "database": db_path})
+    try:
+        snapshot = await registry.schema(info.id)
+        assert await registry.schema(info.id) is snapshot
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE later (id INTEGER PRIMARY KEY)")
+        registry.invalidate(info.id)
+        assert ("main", "later") in (await registry.schema(info.id)).tables
+
+        assert registry.stats()["open_pools"] == 1
+        assert await registry.evict_idle() == 1
+        assert registry.stats()["open_pools"] == 0
+    finally:
+        await registry.close()
+
+
+def test_table_rows_stream_as_ndjson_and_arrow(db_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from core.explorer import explorer, negotiate
+    from core.routes.database import router
+    from core.utils.dependencies import get_admin_user
+
+    assert negotiate("application/json;q=0.5, application/x-ndjson") == "ndjson"
+    assert negotiate("application/vnd.apache.arrow.stream;q=0.9, */*;q=0.1") == "arrow"
+    assert negotiate(None) == negotiate("text/html") == "json"
+
+    app = FastAPI()
+    app.include_router(router)
+    monkeypatch.setattr(explorer, "sqlite_dir", Path(db_path).parent)
+    explorer.register({"driver": "sqlite", "database": db_path}, name="stream")
+    url = "/database/stream/schema/main/table/items"
+    with TestClient(app) as client:
+        assert client.get("/connections").status_code == 401
+        assert client.get("/metrics/database").status_code == 200  # the dashboard polls it
+        app.dependency_overrides[get_admin_user] = lambda: None
+        page = client.get(url, params={"limit": 2, "columns": "qty"}).json()
+        lines = client.get(
+            url,
+            params={"cursor": page["next_cursor"], "columns": "id,qty"},
+            headers={"Accept": "application/x-ndjson"},
+        ).text.splitlines()
+        assert page["rows"] == [{"qty": 2}, {"qty": 4}]
+        assert lines[0] == '{"columns":["id","qty"]}'
+        assert lines[1] == "[3,6]" and len(lines) == 249
+
+        assert client.get(url, params={"columns": "nope"}).status_code == 400
+
+        pa = pytest.importorskip("pyarrow")
+        body = client.get(url, params={"limit": 100}, headers={"Accept": "application/vnd.apache.arrow.stream"}).content
+        arrow = pa.ipc.open_stream(body).read_all()
+        assert arrow.num_rows == 100 and arrow.column_names == ["id", "name", "qty"]
+        assert arrow.column("qty").to_pylist()[:3] == [2, 4, 6]
+        client.portal.call(explorer.close)
+
+
+@pytest.mark.asyncio
+async def test_arrow_schema_follows_the_reported_types():
+    pa = pytest.importorskip("pyarrow")
+    from sqlalchemy import DateTime, Integer, Text
+
+    from core.explorer import arrow_stream
+
+    async def batches():
+        yield [(1, None, "2026-01-01 00:00:00", 1)]  # nothing to infer "note" from
+        yield [(2, 5, "2026-01-02 12:30:00", "abc")]  # SQLite lets any column hold anything
+
+    types = [Integer(), Text(), DateTime(timezone=True), Integer()]
+    chunks = [c async for c in arrow_stream(["id", "note", "at", "n"], batches(), types)]
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.num_rows == 2
+    assert table.schema.field("at").type == pa.timestamp("us", tz="UTC")
+    assert table.column("note").to_pylist() == [None, "5"]
+    assert table.column("n").to_pylist() == [1, None]
+    assert table.column("at").to_pylist()[1].hour == 12
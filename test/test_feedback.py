@@ -0,0 +1,88 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from core.feedback import PENDING, analyzer, approve, list_by_status, score_batch
+from db.database import AsyncSessionLocal, Base, engine
+from db.models import FeedbackItem
+
+
+@pytest_asyncio.fixture
+async def db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=[FeedbackItem.__table__])
+        await conn.run_sync(Base.metadata.create_all, tables=[FeedbackItem.__table__])
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def test_score_batch_sentiment_and_keywords():
+    good, bad, empty = score_batch([
+        "I love the new dashboard, it is great",
+        "Search is not good and the export crashes",
+        "",
+    ])
+    assert good["sentiment"] == "positive" and "dashboard" in good["keywords"]
+    assert bad["sentiment"] == "negative" and "export" in bad["keywords"]
+    assert empty == {"sentiment": "neutral", "sentiment_score": 0.0, "keywords": []}
+
+
+@pytest.mark.asyncio
+async def test_pending_pages_and_bulk_approve(db):
+    db.add_all([FeedbackItem(message=f"item {i}") for i in range(5)])
+    await db.commit()
+
+    first = await list_by_status(db, PENDING, limit=3)
+    rest = await list_by_status(db, PENDING, after_id=first[-1].id, limit=3)
+    assert [i.id for i in first + rest] == [1, 2, 3, 4, 5]
+
+    assert await approve(db, [1, 2, 99]) == [1, 2]
+    assert await approve(db, [1]) == []
+    assert [i.id for i in await list_by_status(db, PENDING)] == [3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_analysis_job_scores_in_batches(db, monkeypatch):
+    monkeypatch.setattr(analyzer, "batch_size", 2)
+    db.add_all([FeedbackItem(message=m) for m in ("great work", "slow and broken", "ok")])
+    await db.commit()
+
+    job = analyzer.schedule()
+    await analyzer._current
+    assert job["status"] == "done" and job["analyzed"] == 3 and job["batches"] == 2
+
+    rows = (await db.execute(select(FeedbackItem).order_by(FeedbackItem.id))).scalars().all()
+    assert [r.sentiment for r in rows] == ["positive", "negative", "neutral"]
+    assert all(r.analyzed_at is not None for r in rows)
+
+
+def test_routes_take_the_user_from_the_token_and_validate_bodies(db):
+    from types import SimpleNamespace
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from core.routes.feedback import router
+    from core.utils.dependencies import get_admin_user, get_current_user
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        assert client.post("/feedback/submit", json={"message": "hi"}).status_code == 401
+        assert client.post("/feedback/approve", json={"ids": [1]}).status_code == 401
+
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, username="alice")
+        res = client.post("/feedback/submit", json={"message": "hi", "user": "mallory"})
+        assert res.status_code == 200
+        assert client.post("/feedback/submit", json={"message": "  "}).status_code == 400
+        assert client.get("/feedback/pending").status_code == 403
+
+        app.dependency_overrides[get_admin_user] = lambda: None
+        assert client.get("/feedback/pending").json()[0]["user"] == "alice"
+        assert client.post("/feedback/approve", json={"ids": ["x"]}).status_code == 422
+        assert client.post("/feedback/approve", json={"ids": [1, 2]}).json()["skipped"] == [2]
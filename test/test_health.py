@@ -0,0 +1,87 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.health import HealthProber
+from core.routes import health
+from core.utils.backoff import delays, retry
+
+
+@pytest.mark.asyncio
+async def test_prober_records_latency_failures_and_readiness():
+    prober = HealthProber(interval=60, timeout=0.05)
+    calls = {"db": 0}
+
+    async def db():
+        calls["db"] += 1
+        if calls["db"] == 2:
+            raise ConnectionError("refused")
+
+    async def cache():
+        await asyncio.sleep(1)  # slower than the timeout
+
+    prober.register("db", db)
+    prober.register("cache", cache, critical=False)
+    assert not prober.ready  # nothing probed yet
+
+    await prober.probe_once()
+    assert prober.ready
+    assert prober.statuses["db"].ok and prober.statuses["db"].latency_ms >= 0
+    assert prober.statuses["cache"].ok is False
+    assert "timed out" in prober.statuses["cache"].error
+
+    await prober.probe_once()
+    assert not prober.ready
+    db_status = prober.snapshot()["db"]
+    assert (db_status["ok"], db_status["error"], db_status["consecutive_failures"]) == (False, "refused", 1)
+
+
+def test_probes_answer_from_memory(monkeypatch):
+    prober = HealthProber(interval=60, timeout=1)
+
+    async def down():
+        raise AssertionError("probes must not run checks")
+
+    prober.register("database", down)
+    prober.register("redis", down, critical=False)
+    monkeypatch.setattr(health, "prober", prober)
+
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+    assert client.get("/health/live").json() == {"status": "alive"}
+    assert client.get("/health/ready").status_code == 503
+    assert client.get("/health").json()["database"] is False
+
+    for status in prober.statuses.values():
+        status.ok = True
+    assert client.get("/health/ready").status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_retry_backs_off_exponentially_within_cap():
+    assert all(0 <= d <= min(1.0, 0.1 * 2 ** n) for n, d in enumerate(delays(8, 0.1, 1.0)))
+
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("down")
+        return "up"
+
+    assert await retry("flaky", flaky, attempts=5, base=0.001, cap=0.01) == "up"
+    assert len(attempts) == 3
+    with pytest.raises(ConnectionError):
+        await retry("down", _fail, attempts=2, base=0.001, cap=0.01)
+
+
+async def _fail():
+    raise ConnectionError("still down")
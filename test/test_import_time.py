@@ -0,0 +1,66 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+from core.routes.lazy import ROUTER_MODULES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What ``import main`` may cost on top of FastAPI itself (which pulls in
+# Starlette and pydantic and dominates cold start either way).
+OWN_IMPORT_BUDGET_MS = 100
+
+# Imported on first use only; each is tens of milliseconds or more
+DEFERRED = [
+    "numpy", "psutil", "jinja2", "aiosmtplib", "socketio", "bcrypt", "jose",
+    "redis", "sqlalchemy", "core.routes.auth", "core.memory", "db.database",
+]
+
+
+def _import_profile(module: str) -> dict[str, tuple[int, int]]:
+    """``python -X importtime`` of ``module`` in a fresh interpreter:
+    name -> (self µs, cumulative µs)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=os.environ.copy(), capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        profile.setdefault(name.strip(), (int(own), int(cumulative)))
+    return profile
+
+
+def _report(profile: dict[str, tuple[int, int]], top: int = 15) -> str:
+    slowest = sorted(profile.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    return "\n".join(f"{cum / 1000:9.1f} ms  {name}" for name, (_, cum) in slowest)
+
+
+def test_main_import_stays_within_budget():
+    profile = _import_profile("main")
+
+    loaded = [name for name in DEFERRED if name in profile]
+    assert not loaded, f"imported eagerly by main: {loaded}\n{_report(profile)}"
+
+    own_ms = (profile["main"][1] - profile["fastapi"][1]) / 1000
+    assert own_ms < OWN_IMPORT_BUDGET_MS, (
+        f"main costs {own_ms:.1f} ms beyond FastAPI (budget {OWN_IMPORT_BUDGET_MS} ms)\n"
+        + _report(profile)
+    )
+
+
+def test_router_table_covers_every_route():
+    for module_name in set(ROUTER_MODULES.values()):
+        for route in importlib.import_module(module_name).router.routes:
+            segment = route.path.lstrip("/").partition("/")[0]
+            assert ROUTER_MODULES.get(segment) == module_name, (
+                f"{route.path} ({module_name}) is not routed lazily"
+            )
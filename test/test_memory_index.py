@@ -0,0 +1,49 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import numpy as np
+
+from core.memory.embedder import HashingEmbedder, normalize
+from core.memory.index import IVFIndex
+
+
+def test_hashing_embedder_ranks_shared_vocabulary_first(tmp_path):
+    embedder = HashingEmbedder(dim=128)
+    index = IVFIndex(tmp_path, dim=128)
+    texts = ["apple stock rallied today", "my cat sleeps all day", "weather is rainy"]
+    index.add(embedder.embed(texts), [{"text": t} for t in texts])
+
+    hits = index.search(embedder.embed(["how did apple stock do"])[0], k=2)
+    assert hits[0][1]["text"] == "apple stock rallied today"
+    assert hits[0][0] >= hits[1][0]
+
+
+def test_namespaces_filter_results(tmp_path):
+    embedder = HashingEmbedder(dim=64)
+    index = IVFIndex(tmp_path, dim=64)
+    index.add(embedder.embed(["shared note"]), [{"owner": "a"}], namespace="user:a")
+    index.add(embedder.embed(["shared note"]), [{"owner": "b"}], namespace="user:b")
+
+    hits = index.search(embedder.embed(["shared note"])[0], k=5, namespaces=["user:b"])
+    assert [payload["owner"] for _, payload in hits] == ["b"]
+    assert index.search(embedder.embed(["x"])[0], namespaces=["user:missing"]) == []
+
+
+def test_trained_index_persists_and_accepts_inserts(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = normalize(rng.standard_normal((600, 16)).astype(np.float32))
+    index = IVFIndex(tmp_path, dim=16, nlist=8, nprobe=8, train_size=500)
+    index.add(vectors, [{"i": i} for i in range(600)])
+    assert index._centroids is not None
+    index.close()
+
+    reopened = IVFIndex(tmp_path, dim=16, nlist=8, nprobe=8)
+    assert len(reopened) == 600
+    extra = normalize(rng.standard_normal((1, 16)).astype(np.float32))
+    reopened.add(extra, [{"i": "new"}])
+
+    # probing every list makes the IVF search exact
+    assert reopened.search(vectors[42], k=1)[0][1] == {"i": 42}
+    assert reopened.search(extra[0], k=1)[0][1] == {"i": "new"}
@@ -0,0 +1,129 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+import itertools
+
+import pytest
+
+from core.cache import redis_cache
+from core.periodic import FileLease, PeriodicScheduler, PeriodicTask, RedisLease
+from core.utils import backoff
+
+
+def _worker(lease, runs: list, delivered: list) -> PeriodicScheduler:
+    async def sample():
+        runs.append(len(runs))
+        return {"n": len(runs)}
+
+    async def deliver(result):
+        delivered.append(result["n"])
+
+    worker = PeriodicScheduler(lease_ttl=0.3, lease=lease)
+    worker.add(PeriodicTask("sample", sample, interval=0.05, deliver=deliver, leader_only=True))
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_one_worker_runs_global_tasks_and_all_receive_results(tmp_path):
+    runs, delivered_a, delivered_b = [], [], []
+    a = _worker(FileLease("periodic", tmp_path), runs, delivered_a)
+    b = _worker(FileLease("periodic", tmp_path), runs, delivered_b)
+    a.start()
+    b.start()
+    await asyncio.sleep(0.6)
+
+    assert a.leader != b.leader
+    leader, follower = (a, b) if a.leader else (b, a)
+    assert leader.task_stats["sample"].runs == len(runs) > 3
+    assert follower.task_stats["sample"].runs == 0
+    assert delivered_a and delivered_b
+    assert follower.stats()["tasks"]["sample"]["role"] == "follower"
+
+    await leader.close()  # hands the lease over
+    await asyncio.sleep(0.3)
+    assert follower.leader
+    await follower.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_lease_is_exclusive_until_released(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    monkeypatch.setattr(redis_cache, "redis", fakeredis.FakeAsyncRedis(decode_responses=True))
+    first, second = RedisLease("periodic", ttl=5), RedisLease("periodic", ttl=5)
+
+    assert await first.hold() and await first.hold()  # renewals
+    assert not await second.hold()
+    await first.publish("sample", {"n": 1}, ttl=5)
+    stamp, value = await second.latest("sample")
+    assert value == {"n": 1}
+
+    await second.release()  # not the owner: no effect
+    assert not await second.hold()
+    await first.release()
+    assert await second.hold()
+
+
+@pytest.mark.asyncio
+async def test_redis_lease_falls_back_to_a_file_while_redis_is_down(monkeypatch, tmp_path):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_cache, "redis", client)
+    first = RedisLease("periodic", ttl=5, fallback=FileLease("periodic", tmp_path))
+    second = RedisLease("periodic", ttl=5, fallback=FileLease("periodic", tmp_path))
+    assert await first.hold() and not await second.hold()
+
+    monkeypatch.setattr(redis_cache, "redis", None)  # lost mid-flight
+    assert await second.hold() and not await first.hold()  # still exactly one leader
+    assert second.kind == "file"
+    await second.publish("sample", {"n": 2}, ttl=5)
+    assert (await first.latest("sample"))[1] == {"n": 2}
+
+    monkeypatch.setattr(redis_cache, "redis", client)
+    assert await first.hold() and first.kind == "redis"
+    assert not await second.hold() and second.fallback._fd is None  # file lock let go
+
+
+def test_lease_backend_comes_from_config(monkeypatch):
+    from core.config.settings import settings
+
+    monkeypatch.setattr(redis_cache, "redis", None)
+    monkeypatch.setattr(settings, "SCHEDULER_LEASE", "redis")
+    assert isinstance(PeriodicScheduler()._configured_lease(), RedisLease)
+    monkeypatch.setattr(settings, "SCHEDULER_LEASE", "file")
+    assert isinstance(PeriodicScheduler()._configured_lease(), FileLease)
+    monkeypatch.setattr(settings, "SCHEDULER_LEASE", "zookeeper")
+    with pytest.raises(ValueError):
+        PeriodicScheduler()._configured_lease()
+
+
+@pytest.mark.asyncio
+async def test_crashed_loops_restart_and_failures_are_counted(monkeypatch):
+    monkeypatch.setattr(backoff, "forever", lambda base, cap: itertools.repeat(0))
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 2:
+            raise ValueError("bad sample")
+        return len(calls)
+
+    async def deliver(result):
+        if result == 3:
+            raise RuntimeError("broadcast crashed")
+
+    worker = PeriodicScheduler(lease=FileLease("unused", "/nonexistent"))
+    worker.add(PeriodicTask("flaky", flaky, interval=0.01, deliver=deliver))
+    worker.start()
+    await asyncio.sleep(0.2)
+    await worker.close()
+
+    stats = worker.stats()["tasks"]["flaky"]
+    assert stats["role"] == "local"
+    assert stats["failures"] == 1 and stats["last_error"] == "bad sample"
+    assert stats["restarts"] == 1
+    assert stats["runs"] > 4 and stats["max_ms"] >= stats["avg_ms"] > 0
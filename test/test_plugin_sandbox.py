@@ -0,0 +1,133 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+import time
+
+import pytest
+
+from core.plugins import PluginError, registry
+from core.plugins.sandbox import SandboxPool, _Worker
+from core.plugins.worker import FRAME_HEADER
+
+HERE = __name__
+
+
+def ok(data, upstream):
+    return {"pid": os.getpid(), **data}
+
+
+def crash(data, upstream):
+    os._exit(1)
+
+
+def spin(data, upstream):
+    while True:
+        pass
+
+
+def hang(data, upstream):
+    time.sleep(60)
+
+
+async def slow_ok(data, upstream):
+    await asyncio.sleep(0)
+    return {"async": True, **data}
+
+
+class Opaque:
+    pass
+
+
+def opaque(data, upstream):
+    return Opaque()
+
+
+def make_pool(**overrides):
+    options = dict(size=1, preload=[f"{HERE}:ok"], max_calls=100,
+                   cpu_seconds=1, memory_mb=0, timeout=5.0)
+    options.update(overrides)
+    return SandboxPool(**options)
+
+
+@pytest.mark.asyncio
+async def test_crash_and_cpu_limit_replace_the_worker():
+    pool = make_pool()
+    try:
+        first = await pool.call(f"{HERE}:ok", {"n": 1}, {})
+        assert first["n"] == 1 and first["pid"] != os.getpid()
+
+        with pytest.raises(PluginError) as crashed:
+            await pool.call(f"{HERE}:crash", {}, {})
+        assert crashed.value.kind == "crash"
+
+        with pytest.raises(PluginError) as limited:
+            await pool.call(f"{HERE}:spin", {}, {})
+        assert limited.value.kind == "cpu"
+
+        after = await pool.call(f"{HERE}:ok", {}, {})
+        assert after["pid"] not in (first["pid"], os.getpid())
+        assert await pool.call(f"{HERE}:slow_ok", {"n": 2}, {}) == {"async": True, "n": 2}
+        stats = pool.stats()
+        assert stats["crashed"] == 1 and stats["limit_kills"] == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_recycling():
+    pool = make_pool(max_calls=2, timeout=0.5)
+    try:
+        pids = [(await pool.call(f"{HERE}:ok", {}, {}))["pid"] for _ in range(3)]
+        assert pids[0] == pids[1] != pids[2]
+        assert pool.stats()["recycled"] == 1
+
+        with pytest.raises(PluginError) as timed_out:
+            await pool.call(f"{HERE}:hang", {}, {})
+        assert timed_out.value.kind == "timeout"
+        assert (await pool.call(f"{HERE}:ok", {"again": True}, {}))["again"]
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_results_must_be_json():
+    pool = make_pool()
+    try:
+        with pytest.raises(PluginError) as refused:
+            await pool.call(f"{HERE}:opaque", {}, {})
+        assert refused.value.kind == "plugin" and "could not return result" in str(refused.value)
+        assert pool.stats()["crashed"] == 0  # the worker itself behaved
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_bad_frames_are_rejected_without_blocking():
+    def worker_reading(data: bytes) -> _Worker:
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        return _Worker(None, reader, None, max_bytes=64)
+
+    for frame in (
+        FRAME_HEADER.pack(4) + b"\x80\x04N.",  # a pickle, not JSON
+        FRAME_HEADER.pack(2) + b"{}",  # JSON of the wrong shape
+        FRAME_HEADER.pack(1 << 30),  # over the size limit
+    ):
+        with pytest.raises(PluginError) as rejected:
+            await worker_reading(frame).receive(timeout=1)
+        assert rejected.value.kind == "crash"
+
+    stalled = worker_reading(FRAME_HEADER.pack(10) + b"[1,")
+    with pytest.raises(asyncio.TimeoutError):
+        await stalled.receive(timeout=0.1)
+
+
+def test_untrusted_plugins_are_not_imported():
+    registry.register("third_party", "not_a_real_module:run", trusted=False)
+    loaded = registry.get("third_party")
+    assert loaded.sandboxed and loaded.func is None
+    assert "not_a_real_module:run" in registry.sandbox_targets()
+    assert registry.info("third_party")["trusted"] is False
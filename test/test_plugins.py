@@ -0,0 +1,104 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+
+import pytest
+
+from core.plugins import close_plugin_sandbox, parse_chain, plugin, registry, run_chain
+
+_seen_upstream = {}
+
+
+@plugin("nap")
+async def nap(data, upstream):
+    await asyncio.sleep(data["seconds"])
+    return {"slept": data["seconds"]}
+
+
+@plugin("inspect")
+async def inspect_upstream(data, upstream):
+    _seen_upstream.update(upstream)
+    return sorted(upstream)
+
+
+@plugin("boom")
+def boom(data, upstream):
+    raise RuntimeError("kaboom")
+
+
+registry.register("nap", f"{__name__}:nap")
+registry.register("inspect", f"{__name__}:inspect_upstream")
+registry.register("boom", f"{__name__}:boom")
+
+
+@plugin("lookup")
+def lookup(data, upstream):
+    return {}[data["key"]]
+
+
+registry.register("lookup", f"{__name__}:lookup")
+
+
+def test_linear_list_and_cycles():
+    steps = parse_chain([{"name": "echo"}, {"name": "echo"}])
+    assert [s.depends_on for s in steps] == [[], ["0"]]
+    with pytest.raises(ValueError):
+        parse_chain([
+            {"id": "a", "name": "echo", "depends_on": ["b"]},
+            {"id": "b", "name": "echo", "depends_on": ["a"]},
+        ])
+
+
+@pytest.mark.asyncio
+async def test_independent_branches_run_concurrently_and_share_results():
+    steps = parse_chain([
+        {"id": "left", "name": "nap", "input": {"seconds": 0.2}},
+        {"id": "right", "name": "nap", "input": {"seconds": 0.2}},
+        {"id": "join", "name": "inspect", "depends_on": ["left", "right"]},
+        {"id": "bad", "name": "boom", "depends_on": []},
+        {"id": "after_bad", "name": "echo", "depends_on": ["bad"]},
+    ])
+    results, meta = await run_chain(steps)
+    by_id = {r["id"]: r for r in results}
+
+    assert meta["total_ms"] < 350
+    assert by_id["join"]["result"] == ["left", "right"]
+    assert _seen_upstream["left"] is by_id["left"]["result"]
+    assert by_id["bad"]["status"] == "error"
+    assert by_id["after_bad"]["status"] == "skipped"
+    assert meta["slowest_step"]["plugin"] == "nap"
+    assert registry.timing("nap").calls >= 2
+
+
+@pytest.mark.asyncio
+async def test_cpu_plugin_runs_in_sandbox():
+    try:
+        results, _ = await run_chain(parse_chain([
+            {"name": "text_stats", "input": {"text": "Hello world. Hello again!"}},
+        ]))
+    finally:
+        await close_plugin_sandbox()
+    assert results[0]["result"]["words"] == 4
+    assert results[0]["result"]["sentences"] == 2
+    assert registry.get("text_stats").sandboxed
+
+
+def test_a_plugins_own_key_error_is_not_an_unknown_plugin():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from core.routes.plugins import router
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    failed = client.post("/plugins/execute", json={"name": "lookup", "input": {"key": "k"}})
+    assert failed.status_code == 200
+    assert failed.json()["status"] == "error" and failed.json()["error_kind"] == "plugin"
+    assert client.post("/plugins/execute", json={"name": "nope"}).status_code == 404
+
+    results, _ = asyncio.run(run_chain(parse_chain([{"name": "lookup", "input": {"key": "k"}}])))
+    assert results[0]["error"] == "'k'"
@@ -0,0 +1,62 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+from sqlalchemy import create_engine, text
+
+from db.query_log import QueryLog, fingerprint, install
+
+
+def test_fingerprint_folds_literals_and_in_lists():
+    folded = "SELECT * FROM t WHERE a = ? AND b IN (?+)"
+    assert fingerprint("SELECT * FROM t WHERE a = 'x' AND b IN (1, 2, 3)") == folded
+    assert fingerprint("SELECT * FROM t WHERE a = 'it''s'\n  AND b in (?, ?)") == folded
+    assert fingerprint("SELECT x::text FROM t WHERE id = :id") == "SELECT x::text FROM t WHERE id = ?"
+
+
+def test_ring_keeps_newest_entries_and_aggregates_all():
+    log = QueryLog(size=4)
+    for i in range(10):
+        log.record(f"SELECT * FROM users WHERE id = {i}", float(i), 1)
+    log.record("UPDATE users SET name = 'x'", 50.0, 3)
+
+    recent = log.recent(limit=10)
+    assert len(recent) == 4
+    assert recent[0]["fingerprint"] == "UPDATE users SET name = ?"
+    assert [r["duration_ms"] for r in recent[1:]] == [9.0, 8.0, 7.0]
+
+    by_count = log.aggregates(sort="count")
+    assert by_count[0]["fingerprint"] == "SELECT * FROM users WHERE id = ?"
+    assert by_count[0]["count"] == 10 and by_count[0]["p50_ms"] == 5.0 and by_count[0]["p99_ms"] == 9.0
+    assert log.aggregates(sort="max_ms")[0]["rows"] == 3
+
+
+def test_engine_hooks_record_executions():
+    engine = create_engine("sqlite://")
+    log = QueryLog(size=16)
+    install(engine, log)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER)"))
+        for i in range(3):
+            conn.execute(text("INSERT INTO t VALUES (:i)"), {"i": i})
+    stats = {s["fingerprint"]: s for s in log.aggregates()}
+    assert stats["INSERT INTO t VALUES (?)"]["count"] == 3
+    assert stats["INSERT INTO t VALUES (?)"]["rows"] == 3
+
+
+def test_failed_statements_leave_no_start_time_and_shapes_are_capped():
+    import pytest
+    from sqlalchemy.exc import OperationalError
+
+    engine = create_engine("sqlite://")
+    log = QueryLog(size=16, max_shapes=2)
+    install(engine, log)
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+        assert not conn.info["query_started"]
+        for table in ("a", "b", "c", "d"):
+            conn.execute(text(f"CREATE TABLE {table} (id INTEGER)"))
+    shapes = {s["fingerprint"]: s["count"] for s in log.aggregates()}
+    assert shapes == {"CREATE TABLE a (id INTEGER)": 1, "CREATE TABLE b (id INTEGER)": 1, QueryLog.OTHER: 2}
@@ -0,0 +1,65 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from core.cache import redis_cache
+from core.config.settings import settings
+from core.middleware import RateLimitMiddleware
+
+POLICIES = {
+    "/login": {"rate": 1, "per": 60, "burst": 3, "by": "ip"},
+    "/ask": {"rate": 1, "per": 60, "burst": 2, "by": "user"},
+}
+
+
+@pytest.fixture(params=["local", "redis"])
+def client(request, monkeypatch):
+    redis_client = None
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_cache, "redis", redis_client)
+
+    app = FastAPI()
+    app.state.handled = 0
+
+    @app.post("/login")
+    @app.post("/ask")
+    @app.post("/free")
+    async def endpoint():
+        app.state.handled += 1
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, policies=POLICIES)
+    return TestClient(app)
+
+
+def _token(user_id: int) -> dict:
+    token = jwt.encode({"sub": str(user_id)}, settings.JWT_SECRET, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_burst_then_reject_before_handler(client):
+    statuses = [client.post("/login").status_code for _ in range(5)]
+    assert statuses == [200, 200, 200, 429, 429]
+    assert client.app.state.handled == 3
+
+    rejected = client.post("/login")
+    assert int(rejected.headers["retry-after"]) > 0
+    assert rejected.headers["x-ratelimit-remaining"] == "0"
+    assert all(client.post("/free").status_code == 200 for _ in range(10))
+
+
+def test_user_policies_are_per_identity(client):
+    alice, bob = _token(1), _token(2)
+    assert [client.post("/ask", headers=alice).status_code for _ in range(3)] == [200, 200, 429]
+    assert client.post("/ask", headers=bob).status_code == 200
+    # anonymous callers share the per-IP bucket
+    assert client.post("/ask").status_code == 200
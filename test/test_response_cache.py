@@ -0,0 +1,77 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.cache.response_cache import ResponseCache
+
+
+def _counter():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return f"response {len(calls)}"
+
+    return calls, compute
+
+
+@pytest.mark.asyncio
+async def test_normalized_prompt_hits_and_context_separates():
+    cache = ResponseCache()
+    calls, compute = _counter()
+    job = {"prompt": "Market  summary?", "context": {"symbol": "AAPL"}}
+
+    first = await cache.get_or_compute("neuroweave", job, compute)
+    again = await cache.get_or_compute("neuroweave", {**job, "prompt": "market summary"}, compute)
+    other = await cache.get_or_compute(
+        "neuroweave", {**job, "context": {"symbol": "MSFT"}}, compute
+    )
+
+    assert first == again == "response 1"
+    assert other == "response 2"
+    stats = cache.stats()
+    assert stats["l1_hits"] == 1 and stats["misses"] == 2
+    assert stats["saved_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation():
+    cache = ResponseCache()
+    calls, compute = _counter()
+    job = {"prompt": "same question"}
+    results = await asyncio.gather(*(cache.get_or_compute("neuroweave", job, compute) for _ in range(5)))
+    assert results == ["response 1"] * 5
+    assert len(calls) == 1 and cache.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_similar_prompt_hits_when_threshold_configured():
+    cache = ResponseCache()
+    calls, compute = _counter()
+    await cache.get_or_compute("sporelink", {"prompt": "summarize the tech market today"}, compute)
+    hit = await cache.get("sporelink", {"prompt": "summarize the tech market today please"})
+    miss = await cache.get("sporelink", {"prompt": "weather forecast for tomorrow"})
+    assert hit == "response 1"
+    assert miss is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_consulted_after_l1():
+    client = MagicMock()
+    client.get = AsyncMock(return_value=json.dumps({"response": "from redis", "cost_ms": 12.5}))
+    client.set = AsyncMock()
+    with patch("core.cache.redis_cache.redis", client):
+        cache = ResponseCache()
+        assert await cache.get("rootbloom", {"prompt": "a poem"}) == "from redis"
+        assert await cache.get("rootbloom", {"prompt": "a poem"}) == "from redis"
+    client.get.assert_awaited_once()
+    assert cache.stats()["l2_hits"] == 1 and cache.stats()["l1_hits"] == 1
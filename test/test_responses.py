@@ -0,0 +1,46 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.schemas import UserRead, user_read_json
+from core.utils.responses import FastJSONResponse
+
+
+def _user(**overrides):
+    fields = dict(
+        id=7, username="alice", email="alice@example.com", pending_email=None,
+        is_verified=True, is_active=True, avatar=None,
+        created_at=datetime(2025, 7, 14, 20, 0, 0, 123456),
+    )
+    return SimpleNamespace(**{**fields, **overrides})
+
+
+def test_user_serializer_matches_pydantic():
+    users = [_user(), _user(id=8, created_at=datetime(2025, 1, 1, tzinfo=timezone.utc), avatar="a.png")]
+    expected = [json.loads(UserRead.model_validate(u).model_dump_json()) for u in users]
+    assert json.loads(user_read_json.many(users)) == expected
+    assert json.loads(user_read_json.one(users[1])) == expected[1]
+
+
+def test_fast_response_encodes_what_fastapi_would():
+    body = FastJSONResponse({
+        "when": datetime(2025, 1, 1, 12, 30),
+        "price": Decimal("1.5"),
+        "series": np.arange(3),
+        "model": UserRead.model_validate(_user()),
+        1: "non-string key",
+    }).body
+    decoded = json.loads(body)
+    assert decoded["when"] == "2025-01-01T12:30:00"
+    assert decoded["price"] == 1.5
+    assert decoded["series"] == [0, 1, 2]
+    assert decoded["model"]["verified"] is True
+    assert decoded["1"] == "non-string key"
@@ -0,0 +1,103 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import base64
+
+import pytest
+
+from core.cache import redis_cache
+from core.cache.attempts import AttemptGuard
+from core.utils import totp
+
+
+def test_totp_matches_rfc6238_vector():
+    secret = base64.b32encode(b"12345678901234567890").decode()
+    assert totp.code_at(secret, 59 // totp.STEP) == "287082"
+    assert totp.match(secret, "287082", now=59) == 1
+    assert totp.match(secret, "287082", now=59 + 3 * totp.STEP) is None
+    assert base64.b64decode(totp.qr_png_base64("otpauth://totp/x")).startswith(b"\x89PNG")
+
+
+@pytest.fixture(params=["local", "redis"])
+def guard(request, monkeypatch):
+    client = None
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_cache, "redis", client)
+    return AttemptGuard(max_failures=3, window=60, lockout=60)
+
+
+@pytest.mark.asyncio
+async def test_lockout_after_failures_in_window(guard):
+    assert await guard.record_failure("u1") == (False, 2)
+    assert await guard.record_failure("u1") == (False, 1)
+    await guard.record_success("u1")  # resets the window
+    assert await guard.record_failure("u1") == (False, 2)
+    assert await guard.record_failure("u1") == (False, 1)
+    assert await guard.record_failure("u1") == (True, 0)
+
+    assert await guard.locked_for("u1") > 50
+    assert await guard.locked_for("u2") == 0
+    assert await guard.stats() == {"success_count": 1, "failure_count": 5, "locked_users": 1}
+
+
+@pytest.mark.asyncio
+async def test_used_codes_cannot_be_replayed(guard):
+    assert await guard.claim("u1", 1000, ttl=90)
+    assert not await guard.claim("u1", 1000, ttl=90)
+    assert await guard.claim("u1", 1001, ttl=90)
+    assert await guard.claim("u2", 1000, ttl=90)
+
+
+@pytest.mark.asyncio
+async def test_attempts_are_reserved_before_checking(guard):
+    import asyncio
+
+    reserved = await asyncio.gather(*(guard.reserve("u1") for _ in range(5)))
+    attempts = [attempt for attempt, _ in reserved if attempt]
+    assert len(attempts) == 3 and all(wait > 0 for attempt, wait in reserved if not attempt)
+
+    await guard.record_success("u1")  # clears the count
+    first, _ = await guard.reserve("u1")
+    assert await guard.record_failure("u1", first) == (False, 2)  # settled, not counted twice
+    second, _ = await guard.reserve("u1")
+    third, _ = await guard.reserve("u1")
+    # the attempt still in flight counts too
+    assert await guard.record_failure("u1", second) == (True, 0)
+    await guard.record_failure("u1", third)
+    attempt, wait = await guard.reserve("u1")
+    assert attempt is None and wait > 50
+
+
+@pytest.mark.asyncio
+async def test_setup_hands_out_the_secret_once(monkeypatch):
+    from fastapi import HTTPException
+
+    from core.cache.attempts import verify_guard
+    from core.routes.verify import verify_setup
+    from db.models import User
+
+    monkeypatch.setattr(redis_cache, "redis", None)
+    monkeypatch.setattr(verify_guard, "_local", type(verify_guard._local)())
+
+    class _Session:
+        async def commit(self):
+            pass
+
+    user = User(id=7, username="u7")
+    first = await verify_setup(None, user=user, db=_Session())
+    assert first["secret"] == user.totp_secret
+
+    with pytest.raises(HTTPException) as exc:
+        await verify_setup(None, user=user, db=_Session())
+    assert exc.value.status_code == 409
+    refused = await verify_setup({"rotate": True, "code": "000000"}, user=user, db=_Session())
+    assert refused["success"] is False and user.totp_secret == first["secret"]
+
+    code = totp.code_at(user.totp_secret, int(__import__("time").time()) // totp.STEP)
+    rotated = await verify_setup({"rotate": True, "code": code}, user=user, db=_Session())
+    assert rotated["secret"] == user.totp_secret != first["secret"]
@@ -0,0 +1,103 @@
+import os
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from core.websocket import protocol
+from core.websocket.websocket_manager import Connection, ConnectionManager
+
+
+def test_silent_sockets_are_pinged_then_reaped():
+    manager = ConnectionManager("test", heartbeat_interval=0.05, idle_timeout=0.3)
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def endpoint(websocket: WebSocket):
+        await manager.serve(await manager.connect(websocket, user_id=1))
+
+    with TestClient(app).websocket_connect("/ws") as ws:
+        assert ws.receive_json() == {"type": "ping"}
+        ws.send_json({"type": "pong"})
+        assert manager.stats()["connections"] == 1
+        messages = []
+        while (message := ws.receive())["type"] != "websocket.close":
+            messages.append(message)
+    assert message["code"] == 1001
+    assert messages  # kept pinging until the timeout
+    stats = manager.stats()
+    assert (stats["connections"], stats["users"], stats["reaped"]) == (0, 0, 1)
+
+
+class _Socket:
+    scope = {}
+
+    def __init__(self, fails: bool = False):
+        self.fails = fails
+        self.sent = []
+        self.closed = None
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        if self.fails:
+            raise ConnectionResetError
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_drops_sockets_that_fail():
+    manager = ConnectionManager("test", heartbeat_interval=60)
+    good, dead = _Socket(), _Socket(fails=True)
+    await manager.connect(good, user_id=1)
+    await manager.connect(dead, user_id=1)
+    await manager.send_to_user(1, {"n": 1})
+    await manager.broadcast({"n": 2})
+
+    assert good.sent == ['{"n":1}', '{"n":2}']
+    assert dead.closed == 1001
+    assert list(manager.connections) == [good]
+    assert manager.stats()["bytes_per_connection"] < 100
+    assert not hasattr(Connection(None, None, 0.0), "__dict__")
+    await manager.close()
+
+
+def test_msgpack_is_negotiated_per_connection():
+    pytest.importorskip("msgpack")
+    manager = ConnectionManager("test", heartbeat_interval=60)
+    app = FastAPI()
+    sent = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    @app.websocket("/ws")
+    async def endpoint(websocket: WebSocket):
+        connection = await manager.connect(websocket, user_id=1)
+        if len(manager.connections) == 2:
+            await manager.send_to_user(1, {"type": "tick", "timestamp": sent, "payload": {"odd": 1}})
+        await manager.serve(connection)
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws") as text_ws:
+        with client.websocket_connect("/ws", subprotocols=[protocol.MSGPACK]) as binary_ws:
+            assert binary_ws.accepted_subprotocol == protocol.MSGPACK
+            frame = binary_ws.receive_bytes()
+            assert protocol.unpackb(frame) == {"type": "tick", "timestamp": 1767323045000, "payload": {"odd": 1}}
+            text = text_ws.receive_text()
+            assert len(frame) < len(text)
+            assert '"timestamp":"2026-01-02T03:04:05Z"' in text
+
+
+def test_frames_encode_once_per_format():
+    pytest.importorskip("msgpack")
+    frame = protocol.Frame({"type": "ping", "data": {"cpu_usage": 1.5}})
+    assert frame.text is frame.text
+    assert frame.binary is frame.binary
+    assert protocol.unpackb(frame.binary) == frame.data